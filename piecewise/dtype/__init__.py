@@ -2,7 +2,11 @@ from .classifier import Classifier, LinearPredictionClassifier
 from .genotype import Genotype
 from .classifier_set.classifier_set import ClassifierSet
 from .classifier_set.population import Population
-from .condition import Condition
+from .classifier_set.columnar_population import ColumnarPopulation
+from .classifier_set.classifier_params import gather_params, scatter_params
+from .classifier_set.condition_matrix import ConditionMatrix
+from .classifier_set.interval_grid_index import IntervalGridIndex
+from .condition import Condition, calc_generalities
 from .data_space import DataSpaceBuilder
 from .dimension import Dimension
 from .rule import Rule
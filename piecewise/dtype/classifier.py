@@ -5,14 +5,82 @@ import numpy as np
 
 from piecewise.constants import TIME_STEP_MIN
 from piecewise.error.classifier_error import AttrUpdateError
+from piecewise.validation import (checks_attr_values, checks_consistency,
+                                  register_checked_attr)
 
 from .config import classifier_attr_rel_tol
 from .formatting import as_truncated_str
+from .slots import copy_attr_state
 
 TIME_STAMP_MIN = TIME_STEP_MIN
 EXPERIENCE_MIN = 0
 ACTION_SET_SIZE_MIN = 1
 NUMEROSITY_MIN = 1
+# attrs only set while a classifier is a row view of a ClassifierColumns obj
+_VIEW_ATTR_NAMES = ("_columns", "_row")
+
+
+class AttrUpdateCounts:
+    """Counts of updates made to the attrs of a group of classifiers, for
+    those attrs that classifier sets maintain aggregates of (see
+    ClassifierSet). Lets a set tell whether its aggregates have gone stale
+    since it last computed them without having to be notified of each
+    update.
+
+    Each population has its own counts, which its members record their
+    updates in (see assign_attr_update_counts()), so that updates to the
+    members of one population do not invalidate the aggregates of sets of
+    members of another. Classifiers not in any population share a single
+    module level counts obj."""
+    __slots__ = ("error", "fitness", "time_stamp", "numerosity")
+
+    def __init__(self):
+        self.error = 0
+        self.fitness = 0
+        self.time_stamp = 0
+        self.numerosity = 0
+
+    def record(self, attr_name):
+        """Records an update to the given attr, if it is counted."""
+        if attr_name in self.__slots__:
+            setattr(self, attr_name, getattr(self, attr_name) + 1)
+
+    def record_all(self):
+        for attr_name in self.__slots__:
+            self.record(attr_name)
+
+    def get(self, attr_names):
+        """Returns tuple of the counts of the given attrs."""
+        return tuple([getattr(self, attr_name) for attr_name in attr_names])
+
+
+_unowned_attr_update_counts = AttrUpdateCounts()
+
+
+def assign_attr_update_counts(classifier, attr_update_counts=None):
+    """Makes the given classifier record updates to its attrs in the given
+    counts, or if None in the counts shared by classifiers not in any
+    population.
+
+    The counts the classifier recorded updates in before are bumped, so that
+    sets whose aggregates were validated against them recalculate (and pick
+    up the new counts)."""
+    if attr_update_counts is None:
+        attr_update_counts = _unowned_attr_update_counts
+    classifier.attr_update_counts.record_all()
+    classifier._update_counts = attr_update_counts
+
+
+def record_bulk_attr_update(classifiers, attr_name):
+    """Records an update to the given attr of the given classifiers made
+    without going through their properties, e.g. by writing to the columns
+    of a ColumnarPopulation."""
+    unique_attr_update_counts = {
+        id(classifier.attr_update_counts): classifier.attr_update_counts
+        for classifier in classifiers
+    }
+    for attr_update_counts in unique_attr_update_counts.values():
+        attr_update_counts.record(attr_name)
 
 
 def check_attr_value(*, min_val, expected_type=None):
@@ -39,11 +107,27 @@ def check_attr_value(*, min_val, expected_type=None):
 
             return method(self, value, *args, **kwargs)
 
+        # kept so the check can be swapped out, see register_checked_setters()
+        _check_attr_value.unchecked_method = method
         return _check_attr_value
 
     return decorator
 
 
+def register_checked_setters(cls):
+    """Registers the properties defined by the given cls whose setters are
+    wrapped by check_attr_value, so that their checks are swapped out when
+    the validation level does not check attr values (see
+    piecewise.validation)."""
+    for (attr_name, attr) in list(vars(cls).items()):
+        is_checked_property = isinstance(attr, property) and \
+            hasattr(attr.fset, "unchecked_method")
+        if is_checked_property:
+            unchecked_property = attr.setter(attr.fset.unchecked_method)
+            register_checked_attr(cls, attr_name, attr, unchecked_property,
+                                  checks_attr_values)
+
+
 def _value_is_correct_type(value, expected_type):
     if expected_type is None:
         # don't check if no type is given
@@ -58,7 +142,20 @@ class ClassifierABC(metaclass=abc.ABCMeta):
     A classifier contains a rule (mapping from condition to action), as well as
     other attributes relating to its usage in the system (see properties
     exposed below).
+
+    Classifiers store their attrs in slots rather than an instance dict to
+    keep large populations compact; subclasses should declare __slots__ for
+    any attrs they add. The _columns and _row slots are only set while the
+    classifier is a row view of a ClassifierColumns obj.
+
+    Updates to the attrs that classifier sets aggregate are recorded in the
+    attr update counts of the population the classifier is in (see
+    AttrUpdateCounts).
     """
+    __slots__ = ("_rule", "_error", "_fitness", "_time_stamp", "_experience",
+                 "_action_set_size", "_numerosity", "_update_counts",
+                 "_columns", "_row")
+
     def __init__(self, rule, error, fitness, time_stamp):
         self._rule = rule
         self._error = error
@@ -68,6 +165,11 @@ class ClassifierABC(metaclass=abc.ABCMeta):
         self._experience = EXPERIENCE_MIN
         self._action_set_size = ACTION_SET_SIZE_MIN
         self._numerosity = NUMEROSITY_MIN
+        self._update_counts = _unowned_attr_update_counts
+
+    @property
+    def attr_update_counts(self):
+        return self._update_counts
 
     @property
     def rule(self):
@@ -96,6 +198,7 @@ class ClassifierABC(metaclass=abc.ABCMeta):
     @error.setter
     def error(self, value):
         self._error = value
+        self._update_counts.error += 1
 
     @property
     def fitness(self):
@@ -104,6 +207,7 @@ class ClassifierABC(metaclass=abc.ABCMeta):
     @fitness.setter
     def fitness(self, value):
         self._fitness = value
+        self._update_counts.fitness += 1
 
     @property
     def time_stamp(self):
@@ -113,6 +217,7 @@ class ClassifierABC(metaclass=abc.ABCMeta):
     @check_attr_value(min_val=TIME_STAMP_MIN, expected_type=int)
     def time_stamp(self, value):
         self._time_stamp = value
+        self._update_counts.time_stamp += 1
 
     @property
     def experience(self):
@@ -140,6 +245,69 @@ class ClassifierABC(metaclass=abc.ABCMeta):
     @check_attr_value(min_val=NUMEROSITY_MIN, expected_type=int)
     def numerosity(self, value):
         self._numerosity = value
+        self._update_counts.numerosity += 1
+
+    def clone(self):
+        """Returns a copy of this classifier for use as GA offspring.
+
+        Cheaper than deepcopy: the rule is cloned so it can be changed by
+        crossover and mutation independently of this classifier, params are
+        copied as is, except numerosity and experience which are reset to
+        their initial vals."""
+        clone = self._new_clone()
+        self._init_clone(clone)
+        return clone
+
+    def _new_clone(self):
+        clone = self.__class__.__new__(self.__class__)
+        copy_attr_state(self, clone, exclude=_VIEW_ATTR_NAMES)
+        return clone
+
+    def _init_clone(self, clone):
+        clone._rule = self._rule.clone()
+        # clones are not in any population (yet)
+        clone._update_counts = _unowned_attr_update_counts
+        clone._numerosity = NUMEROSITY_MIN
+        clone._experience = EXPERIENCE_MIN
+
+    def merge_params(self, others):
+        """Merges the params of the given classifiers, which must have rules
+        equal to this classifier's, into this classifier, so that it can
+        stand in for all of them (see Population.compact()).
+
+        Prediction, error and action set size estimates are averaged,
+        weighted by numerosity. Fitness is summed, as the fitness of a
+        macroclassifier is its share of the accuracy of its set, which
+        already scales with its numerosity. Experience and time stamp are
+        the max over all the classifiers. Numerosity itself is left for the
+        population to update."""
+        classifiers = [self] + list(others)
+        numerosities = [classifier.numerosity for classifier in classifiers]
+        total_numerosity = sum(numerosities)
+
+        def _calc_weighted_mean(values):
+            return sum([
+                numerosity * value
+                for (numerosity, value) in zip(numerosities, values)
+            ]) / total_numerosity
+
+        self.error = _calc_weighted_mean(
+            [classifier.error for classifier in classifiers])
+        self.action_set_size = float(
+            _calc_weighted_mean(
+                [classifier.action_set_size for classifier in classifiers]))
+        self.fitness = sum([classifier.fitness for classifier in classifiers])
+        self.experience = max(
+            [classifier.experience for classifier in classifiers])
+        self.time_stamp = max(
+            [classifier.time_stamp for classifier in classifiers])
+        self._merge_prediction_params(classifiers, _calc_weighted_mean)
+
+    @abc.abstractmethod
+    def _merge_prediction_params(self, classifiers, calc_weighted_mean):
+        """Merges the prediction params of the given classifiers (this
+        classifier first) into this classifier, see merge_params()."""
+        raise NotImplementedError
 
     @abc.abstractmethod
     def get_prediction(self, situation=None):
@@ -160,8 +328,13 @@ class ClassifierABC(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 
+register_checked_setters(ClassifierABC)
+
+
 class Classifier(ClassifierABC):
     """'Normal' classifier as in canonical XCS - constant prediction."""
+    __slots__ = ("_prediction", )
+
     def __init__(self, rule, prediction, error, fitness, time_stamp):
         super().__init__(rule, error, fitness, time_stamp)
         self._prediction = prediction
@@ -173,9 +346,18 @@ class Classifier(ClassifierABC):
     def set_prediction(self, value):
         self._prediction = value
 
+    def _merge_prediction_params(self, classifiers, calc_weighted_mean):
+        self.set_prediction(
+            calc_weighted_mean(
+                [classifier.get_prediction() for classifier in classifiers]))
+
+    @property
+    def prediction(self):
+        return self._prediction
+
     def __eq__(self, other):
         return self._rule == other.rule and \
-            math.isclose(self._prediction, other.prediction,
+            math.isclose(self._prediction, other.get_prediction(),
                          rel_tol=classifier_attr_rel_tol) and \
             math.isclose(self._error, other.error,
                          rel_tol=classifier_attr_rel_tol) and \
@@ -207,6 +389,8 @@ class Classifier(ClassifierABC):
 class LinearPredictionClassifier(ClassifierABC):
     """Classifier that uses weight vector to compute linear prediction, for
     use with XCSF."""
+    __slots__ = ("_weight_vec", "_x_nought", "_delta_rls", "_cov_mat",
+                 "_cov_mat_reset_stamp")
     _MIN_WEIGHT_VAL = 0.0
     _MAX_WEIGHT_VAL = 0.0
 
@@ -229,6 +413,10 @@ class LinearPredictionClassifier(ClassifierABC):
     def weight_vec(self):
         return self._weight_vec
 
+    @property
+    def x_nought(self):
+        return self._x_nought
+
     @property
     def cov_mat(self):
         return self._cov_mat
@@ -241,6 +429,20 @@ class LinearPredictionClassifier(ClassifierABC):
     def cov_mat_reset_stamp(self):
         return self._cov_mat_reset_stamp
 
+    def _init_clone(self, clone):
+        super()._init_clone(clone)
+        clone._weight_vec = list(self._weight_vec)
+        clone._cov_mat = self._cov_mat.copy()
+
+    def _merge_prediction_params(self, classifiers, calc_weighted_mean):
+        # covariance mat is kept as is: it is reset periodically anyway, and
+        # averaging would not give the covariance of the merged samples
+        self._weight_vec = list(
+            calc_weighted_mean([
+                np.asarray(classifier.weight_vec)
+                for classifier in classifiers
+            ]))
+
     def _reset_cov_mat(self, delta_rls):
         """Private, used once in init, explicit param to make temporal
         dependency obvious."""
@@ -253,8 +455,11 @@ class LinearPredictionClassifier(ClassifierABC):
         cached hyperparam val."""
         self._reset_cov_mat(self._delta_rls)
 
-    def get_prediction(self, situation):
+    def _get_checked_prediction(self, situation):
         assert len(self._weight_vec) == (len(situation) + 1)
+        return self._get_unchecked_prediction(situation)
+
+    def _get_unchecked_prediction(self, situation):
         w_nought = self._weight_vec[0]
         prediction = w_nought * self._x_nought
         for i in range(0, len(situation)):
@@ -263,6 +468,10 @@ class LinearPredictionClassifier(ClassifierABC):
             prediction += self._weight_vec[w_idx] * situation[s_idx]
         return prediction
 
+    # swapped for the unchecked version depending on the validation level,
+    # see register_checked_attr() call below
+    get_prediction = _get_checked_prediction
+
     def __eq__(self, other):
         return self._rule == other.rule and \
             self._weight_vec_is_close(other) and \
@@ -306,6 +515,12 @@ class LinearPredictionClassifier(ClassifierABC):
                 f"num: {self._numerosity} )")
 
 
+register_checked_attr(LinearPredictionClassifier, "get_prediction",
+                      LinearPredictionClassifier._get_checked_prediction,
+                      LinearPredictionClassifier._get_unchecked_prediction,
+                      checks_consistency)
+
+
 class NiceMinErrorMixin:
     # TODO make classes using this when necessary
     @property
@@ -0,0 +1,335 @@
+import numpy as np
+
+from piecewise.dtype.classifier import ClassifierABC
+from piecewise.dtype.slots import get_attr_state, set_attr_state
+
+from .population_observer import IPopulationObserver
+
+# private classifier attr -> dtype of the column storing it
+_COLUMN_DTYPES = {
+    "_prediction": np.float64,
+    "_error": np.float64,
+    "_fitness": np.float64,
+    "_time_stamp": np.int64,
+    "_experience": np.float64,
+    "_action_set_size": np.float64,
+    "_numerosity": np.int64
+}
+_COLUMN_FILL_VALS = {np.float64: np.nan, np.int64: 0}
+
+
+def _calc_column_to_python_funcs(classifier_cls):
+    to_python_funcs = {
+        attr_name: (float if dtype == np.float64 else int)
+        for (attr_name, dtype) in _COLUMN_DTYPES.items()
+    }
+    # experience is stored as a float to accommodate classifiers that override
+    # the experience property to make it fractional (e.g. fuzzy classifiers),
+    # but otherwise is an int
+    experience_is_int = \
+        classifier_cls.experience is ClassifierABC.experience
+    to_python_funcs["_experience"] = int if experience_is_int else float
+    return to_python_funcs
+
+
+def _make_column_property(attr_name, to_python_func):
+    def _get_attr(self):
+        return to_python_func(self._columns.arrays[attr_name][self._row])
+
+    def _set_attr(self, value):
+        columns = self._columns
+        columns.arrays[attr_name][self._row] = value
+        for changed_rows in columns._changed_rows_watches[attr_name]:
+            changed_rows.add(self._row)
+
+    return property(_get_attr, _set_attr)
+
+
+def _new_detached_classifier(classifier_cls):
+    return classifier_cls.__new__(classifier_cls)
+
+
+class _ClassifierRowView:
+    """Mixin that redirects the private param attrs of a classifier (the ones
+    its public, validated properties read and write) to a row of a
+    ClassifierColumns obj.
+
+    Copying or pickling a view gives a plain (detached) classifier of the
+    original class holding the current param values.
+
+    Declares no slots of its own (the _columns and _row attrs live in slots of
+    ClassifierABC) so that view clses have the same layout as the classifier
+    clses they derive from, which is required to switch the class of a
+    classifier in place."""
+    __slots__ = ()
+
+    def __reduce_ex__(self, protocol):
+        # (dict state, slot state) form is restored via setattr, so works
+        # whether the detached classifier uses slots or a dict
+        return (_new_detached_classifier, (self._detached_cls, ),
+                (None, self._calc_detached_state()))
+
+    def _new_clone(self):
+        # clones are detached
+        clone = _new_detached_classifier(self._detached_cls)
+        set_attr_state(clone, self._calc_detached_state())
+        return clone
+
+    def _calc_detached_state(self):
+        # column attrs are read through the view properties, so hold the
+        # current values from the columns
+        return get_attr_state(self, exclude=("_columns", "_row"))
+
+
+# (classifier cls, column attr names) -> view cls
+_view_clses = {}
+
+
+def _get_view_cls(classifier_cls, column_attr_names):
+    key = (classifier_cls, column_attr_names)
+    try:
+        return _view_clses[key]
+    except KeyError:
+        view_cls = _make_view_cls(classifier_cls, column_attr_names)
+        _view_clses[key] = view_cls
+        return view_cls
+
+
+def _make_view_cls(classifier_cls, column_attr_names):
+    to_python_funcs = _calc_column_to_python_funcs(classifier_cls)
+    namespace = {
+        attr_name: _make_column_property(attr_name,
+                                         to_python_funcs[attr_name])
+        for attr_name in column_attr_names
+    }
+    namespace["__slots__"] = ()
+    namespace["_detached_cls"] = classifier_cls
+    namespace["_column_attr_names"] = column_attr_names
+    namespace["__qualname__"] = classifier_cls.__qualname__
+    namespace["__module__"] = classifier_cls.__module__
+    return type(classifier_cls.__name__,
+                (_ClassifierRowView, classifier_cls), namespace)
+
+
+def find_shared_columns(classifiers):
+    """Returns the ClassifierColumns obj that all the given classifiers are
+    views of, or None if there is no such obj."""
+    shared_columns = None
+    for classifier in classifiers:
+        if not isinstance(classifier, _ClassifierRowView):
+            return None
+        if shared_columns is None:
+            shared_columns = classifier._columns
+        elif classifier._columns is not shared_columns:
+            return None
+    return shared_columns
+
+
+class ClassifierColumns(IPopulationObserver):
+    """Columnar (structure-of-arrays) store of the params of the
+    macroclassifiers in a population: one NumPy array per param with one row
+    per macroclassifier.
+
+    Registered as an observer of a population. When a classifier is added to
+    the population, its params are moved into a free row and the classifier
+    obj becomes a thin view of that row: its class is switched in place to a
+    subclass (with the same name) whose private param attrs are properties
+    backed by the columns. Classifier identity and public interface are thus
+    unchanged, so existing components keep working on the classifier objs,
+    while vectorised components can operate on the columns directly via the
+    rows of the classifiers (see row_of(), rows_of()). When the classifier is
+    removed, the params are copied back onto it and its class is restored.
+
+    Rows of removed classifiers are reused, and rows not currently in use hold
+    stale values.
+
+    Components that maintain derived data over the rows (e.g. deletion votes)
+    can watch for changes to some of the columns (see watch_changed_rows()),
+    rather than comparing the whole columns against a copy. Writes made
+    through the classifier objs are recorded automatically; writes made
+    directly to the arrays must be reported via mark_rows_changed() (as done
+    by scatter_params()).
+    """
+    _GROWTH_FACTOR = 2
+
+    def __init__(self, capacity):
+        assert capacity >= 1
+        self._capacity = capacity
+        self._arrays = {
+            attr_name: np.full(shape=capacity,
+                               fill_value=_COLUMN_FILL_VALS[dtype],
+                               dtype=dtype)
+            for (attr_name, dtype) in _COLUMN_DTYPES.items()
+        }
+        # pop from end so lowest rows used first
+        self._free_rows = list(reversed(range(capacity)))
+        self._row_idxs = {}
+        self._classifiers_by_row = [None] * capacity
+        self._is_row_used = np.zeros(shape=capacity, dtype=bool)
+        # column attr name -> sets of changed rows of watchers of that column
+        self._changed_rows_watches = {
+            attr_name: []
+            for attr_name in _COLUMN_DTYPES
+        }
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def arrays(self):
+        """Dict mapping private classifier attr names (e.g. '_fitness') to the
+        columns storing them."""
+        return self._arrays
+
+    @property
+    def is_row_used(self):
+        """Boolean array indicating which rows hold a classifier."""
+        return self._is_row_used
+
+    @property
+    def prediction(self):
+        return self._arrays["_prediction"]
+
+    @property
+    def error(self):
+        return self._arrays["_error"]
+
+    @property
+    def fitness(self):
+        return self._arrays["_fitness"]
+
+    @property
+    def time_stamp(self):
+        return self._arrays["_time_stamp"]
+
+    @property
+    def experience(self):
+        return self._arrays["_experience"]
+
+    @property
+    def action_set_size(self):
+        return self._arrays["_action_set_size"]
+
+    @property
+    def numerosity(self):
+        return self._arrays["_numerosity"]
+
+    def row_of(self, classifier):
+        return self._row_idxs[id(classifier)]
+
+    def classifier_at(self, row):
+        return self._classifiers_by_row[row]
+
+    def rows_of(self, classifiers):
+        """Returns array of the rows of the given classifiers, in the same
+        order as the classifiers are iterated over."""
+        return np.array(
+            [self._row_idxs[id(classifier)] for classifier in classifiers],
+            dtype=np.intp)
+
+    def watch_changed_rows(self, attr_names):
+        """Returns a set that the rows whose values in any of the columns
+        of the given private attr names (e.g. '_fitness') change are added to
+        from now on, as well as the rows that classifiers are added to or
+        removed from. The watcher is responsible for clearing the set once it
+        has processed the rows in it."""
+        changed_rows = set()
+        for attr_name in attr_names:
+            self._changed_rows_watches[attr_name].append(changed_rows)
+        return changed_rows
+
+    def unwatch_changed_rows(self, changed_rows):
+        for watches in self._changed_rows_watches.values():
+            watches[:] = [
+                watch for watch in watches if watch is not changed_rows
+            ]
+
+    def mark_rows_changed(self, attr_name, rows):
+        """Reports a direct write to the given rows of the column of the given
+        private attr name to the watchers of that column."""
+        watches = self._changed_rows_watches[attr_name]
+        if len(watches) > 0:
+            rows = rows.tolist()
+            for changed_rows in watches:
+                changed_rows.update(rows)
+
+    def on_classifier_added(self, classifier):
+        assert not isinstance(classifier, _ClassifierRowView)
+        row = self._alloc_row()
+        column_attr_names = tuple([
+            attr_name for attr_name in _COLUMN_DTYPES
+            if hasattr(classifier, attr_name)
+        ])
+        for attr_name in column_attr_names:
+            self._arrays[attr_name][row] = getattr(classifier, attr_name)
+            delattr(classifier, attr_name)
+        classifier.__class__ = _get_view_cls(type(classifier),
+                                             column_attr_names)
+        classifier._columns = self
+        classifier._row = row
+        self._row_idxs[id(classifier)] = row
+        self._classifiers_by_row[row] = classifier
+        self._is_row_used[row] = True
+        self._mark_row_changed(row)
+
+    def on_classifier_removed(self, classifier):
+        row = self._row_idxs.pop(id(classifier))
+        self._classifiers_by_row[row] = None
+        self._is_row_used[row] = False
+        detached_state = classifier._calc_detached_state()
+        classifier.__class__ = classifier._detached_cls
+        del classifier._columns
+        del classifier._row
+        set_attr_state(classifier, detached_state)
+        self._free_rows.append(row)
+        self._mark_row_changed(row)
+
+    def _mark_row_changed(self, row):
+        for watches in self._changed_rows_watches.values():
+            for changed_rows in watches:
+                changed_rows.add(row)
+
+    def on_classifier_changed(self, classifier):
+        # conditions are not stored in the columns
+        pass
+
+    def _alloc_row(self):
+        if len(self._free_rows) == 0:
+            self._grow()
+        return self._free_rows.pop()
+
+    def _grow(self):
+        new_capacity = self._capacity * self._GROWTH_FACTOR
+        for (attr_name, array) in self._arrays.items():
+            grown = np.full(shape=new_capacity,
+                            fill_value=_COLUMN_FILL_VALS[array.dtype.type],
+                            dtype=array.dtype)
+            grown[:self._capacity] = array
+            self._arrays[attr_name] = grown
+        self._classifiers_by_row.extend([None] *
+                                        (new_capacity - self._capacity))
+        self._is_row_used = np.concatenate(
+            (self._is_row_used,
+             np.zeros(shape=(new_capacity - self._capacity), dtype=bool)))
+        self._free_rows.extend(
+            reversed(range(self._capacity, new_capacity)))
+        self._capacity = new_capacity
+
+    def __getstate__(self):
+        # view classes are not copyable / picklable, so only store the
+        # attached classifiers (which copy / pickle as detached classifiers,
+        # see _ClassifierRowView) and re-attach them when restoring
+        attached_classifiers = [
+            classifier for classifier in self._classifiers_by_row
+            if classifier is not None
+        ]
+        return {
+            "capacity": self._capacity,
+            "classifiers": attached_classifiers
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state["capacity"])
+        for classifier in state["classifiers"]:
+            self.on_classifier_added(classifier)
@@ -0,0 +1,80 @@
+"""Bulk access to the params of a collection of classifiers as arrays, for
+use by vectorised components."""
+import numpy as np
+
+from piecewise.dtype.classifier import record_bulk_attr_update
+
+from .classifier_columns import find_shared_columns
+
+_PARAM_NAMES = ("prediction", "error", "fitness", "time_stamp", "experience",
+                "action_set_size", "numerosity")
+_INT_PARAM_NAMES = ("time_stamp", "numerosity")
+
+
+def gather_params(classifiers, param_names):
+    """Returns dict mapping each of the given param names to a float array of
+    the values of that param for the given classifiers, in iteration order.
+
+    If the classifiers are all in the same ColumnarPopulation the values are
+    read straight from its columns, otherwise from each classifier in turn."""
+    assert all(param_name in _PARAM_NAMES for param_name in param_names)
+    classifiers = list(classifiers)
+    columns = find_shared_columns(classifiers)
+    if columns is not None:
+        rows = columns.rows_of(classifiers)
+        return {
+            param_name:
+            columns.arrays["_" + param_name][rows].astype(np.float64)
+            for param_name in param_names
+        }
+    else:
+        return {
+            param_name: np.array([
+                _get_param(classifier, param_name)
+                for classifier in classifiers
+            ],
+                                 dtype=np.float64)
+            for param_name in param_names
+        }
+
+
+def scatter_params(classifiers, params):
+    """Writes back the param values in the given dict (as returned by
+    gather_params()) to the given classifiers.
+
+    If the classifiers are all in the same ColumnarPopulation the values are
+    written straight to its columns, bypassing the validation done by
+    classifier properties, otherwise via the properties of each classifier in
+    turn."""
+    assert all(param_name in _PARAM_NAMES for param_name in params)
+    classifiers = list(classifiers)
+    columns = find_shared_columns(classifiers)
+    if columns is not None:
+        rows = columns.rows_of(classifiers)
+        for (param_name, values) in params.items():
+            columns.arrays["_" + param_name][rows] = values
+            columns.mark_rows_changed("_" + param_name, rows)
+        # classifiers sharing columns are all in the same population, so
+        # share attr update counts
+        for param_name in params:
+            record_bulk_attr_update(classifiers[:1], param_name)
+    else:
+        for (param_name, values) in params.items():
+            for (classifier, value) in zip(classifiers, values.tolist()):
+                _set_param(classifier, param_name, value)
+
+
+def _get_param(classifier, param_name):
+    if param_name == "prediction":
+        return classifier.get_prediction()
+    else:
+        return getattr(classifier, param_name)
+
+
+def _set_param(classifier, param_name, value):
+    if param_name in _INT_PARAM_NAMES:
+        value = int(value)
+    if param_name == "prediction":
+        classifier.set_prediction(value)
+    else:
+        setattr(classifier, param_name, value)
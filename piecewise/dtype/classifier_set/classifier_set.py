@@ -1,29 +1,117 @@
+import math
+
 from .classifier_set_base import ClassifierSetBase, verify_membership
 
+# name: (classifier attrs the aggregate depends on, value for empty set,
+#        func to fold a classifier into the aggregate)
+_AGGREGATES = {
+    "num_micros": (("numerosity", ), 0,
+                   lambda total, classifier: total + classifier.numerosity),
+    "time_stamp_sum":
+    (("time_stamp", "numerosity"), 0, lambda total, classifier: total +
+     classifier.time_stamp * classifier.numerosity),
+    "fitness_sum": (("fitness", ), 0,
+                    lambda total, classifier: total + classifier.fitness),
+    "min_error":
+    (("error", ), math.inf,
+     lambda min_error, classifier: min(min_error, classifier.error))
+}
+
+
+def _is_up_to_date(watched_counts, attr_names):
+    for (attr_update_counts, counts) in watched_counts:
+        if attr_update_counts.get(attr_names) != counts:
+            return False
+    return True
+
+
+def _watch_counts(watched_counts, attr_update_counts, attr_names):
+    for (watched_attr_update_counts, _) in watched_counts:
+        if watched_attr_update_counts is attr_update_counts:
+            return watched_counts
+    return watched_counts + ((attr_update_counts,
+                              attr_update_counts.get(attr_names)), )
+
 
 class ClassifierSet(ClassifierSetBase):
     """Container used to store internal collections of classifiers, i.e.
     match set, action set, etc.
 
-    Notably the num_micros property for this class is calculated because
-    this class acts as a "view" into the population - meaning that it stores
+    This class acts as a "view" into the population - meaning that it stores
     refs to Classifier objs that are *most probably* also stored in the
-    population somewhere.
+    population somewhere, and these refs could be updated in some other scope
+    without the knowledge of this set.
 
-    This means that these refs could be updated in some other scope without
-    the knowledge of this set - thus keeping track of num_micros internally in
-    this set is impossible/futile.
+    Aggregates over the members (num_micros, time_stamp_sum, fitness_sum,
+    min_error) are therefore cached along with the update counts of the
+    classifier attrs they depend on, as recorded in the attr update counts
+    of the members (see AttrUpdateCounts: these are shared by the members of
+    a population), and recalculated only when one of those attrs has been
+    updated on a classifier sharing counts with a member since. Updates to
+    classifiers of other populations do not invalidate them. While the
+    cache is valid, adding a member folds it into the cached aggregates
+    rather than invalidating them. E.g. credit assignment reads num_micros
+    once per classifier but never updates numerosities, so it is only
+    summed once.
+
+    Aggregates are always folded in iteration order, so they are exactly equal
+    to summing over the set from scratch.
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *, compare_by_value=False):
+        super().__init__(compare_by_value=compare_by_value)
+        # aggregate name -> (value, watched counts), where watched counts is
+        # a tuple of (attr update counts, counts of the aggregate's attrs
+        # when calculated) for each distinct attr update counts of members
+        self._aggregates = {}
 
     @property
     def num_micros(self):
-        return sum([classifier.numerosity for classifier in self._members])
+        return self._get_aggregate("num_micros")
+
+    @property
+    def time_stamp_sum(self):
+        """Sum of time stamps of members weighted by numerosity."""
+        return self._get_aggregate("time_stamp_sum")
+
+    @property
+    def fitness_sum(self):
+        return self._get_aggregate("fitness_sum")
+
+    @property
+    def min_error(self):
+        """Minimum error of members, inf if the set is empty."""
+        return self._get_aggregate("min_error")
+
+    def _get_aggregate(self, name):
+        (attr_names, value, fold_func) = _AGGREGATES[name]
+        try:
+            (cached_value, watched_counts) = self._aggregates[name]
+            if _is_up_to_date(watched_counts, attr_names):
+                return cached_value
+        except KeyError:
+            pass
+        watched_counts = ()
+        for classifier in self:
+            value = fold_func(value, classifier)
+            watched_counts = _watch_counts(watched_counts,
+                                           classifier.attr_update_counts,
+                                           attr_names)
+        self._aggregates[name] = (value, watched_counts)
+        return value
 
     def add(self, classifier):
         """Adds the given classifier to the set."""
-        self._members.append(classifier)
+        self._add_member(classifier)
+        for (name, (value, watched_counts)) in list(self._aggregates.items()):
+            (attr_names, _, fold_func) = _AGGREGATES[name]
+            if _is_up_to_date(watched_counts, attr_names):
+                self._aggregates[name] = \
+                    (fold_func(value, classifier),
+                     _watch_counts(watched_counts,
+                                   classifier.attr_update_counts,
+                                   attr_names))
+            else:
+                del self._aggregates[name]
 
     @verify_membership
     def remove(self, classifier):
@@ -32,4 +120,11 @@ class ClassifierSet(ClassifierSetBase):
         Throws:
             MemberNotFoundError: if the classifier is not in the set.
         """
-        self._members.remove(classifier)
+        self._remove_member(classifier)
+        self._aggregates.clear()
+
+    def __getstate__(self):
+        # aggregates are recalculated on first read after restoring
+        state = super().__getstate__()
+        state["_aggregates"] = {}
+        return state
@@ -1,25 +1,26 @@
 import abc
 import functools
 
-from piecewise.dtype import Classifier
+from piecewise.dtype.classifier import ClassifierABC
 from piecewise.error.classifier_set_error import MemberNotFoundError
 
 
 def verify_membership(method):
     """Decorator to ensure classifiers in args (both positional and keyword) are
     contained in the classifier set before performing an operation on the set
-    with them."""
+    with them.
+
+    Classifier args are replaced by the members they refer to before calling
+    the method: these are the same objs unless the set compares members by
+    value, in which case the method operates on the stored members rather than
+    the (equal) args."""
     @functools.wraps(method)
     def _verify_membership(self, *args, **kwargs):
-        all_args = list(args)
-        for kwarg in kwargs.values():
-            all_args.append(kwarg)
-        classifier_args = [
-            arg for arg in all_args if isinstance(arg, Classifier)
-        ]
-        for classifier in classifier_args:
-            if classifier not in self._members:
-                raise MemberNotFoundError()
+        args = [self._resolve_if_classifier(arg) for arg in args]
+        kwargs = {
+            name: self._resolve_if_classifier(kwarg)
+            for (name, kwarg) in kwargs.items()
+        }
         return method(self, *args, **kwargs)
 
     return _verify_membership
@@ -37,17 +38,23 @@ class ClassifierSetBase:
     Instead of causing confusion, the two concepts are explicitly separated:
     see num_micros and num_macros properties.
 
-    Uses a list as the internal data structure to hold Classifier objs, because
-    Classifier objs are mutable and thus not hashable, so not suitable for use
-    in a hash-based data structure.
+    Classifier objs are mutable and thus not hashable, so members are held in
+    a dict keyed by their identity (id()), which preserves insertion order for
+    iteration while making membership checks and removals constant time. By
+    default membership is therefore identity based: a classifier is only in
+    the set if that exact obj was added to it. Membership based on value
+    equality (Classifier.__eq__), which costs a linear scan of deep
+    comparisons, can be opted into via the compare_by_value kwarg.
 
     num_micros is an abstract property because the two subclasses of this base
     (ClassifierSet and Population), handle calculation of this property
-    differently (namely it is actually calculated for the former but cached
-    and validated for the latter).
+    differently (namely it is a cached aggregate for the former, recalculated
+    only when member numerosities have been updated since it was cached, but
+    maintained incrementally and validated for the latter).
     """
-    def __init__(self):
-        self._members = []
+    def __init__(self, *, compare_by_value=False):
+        self._members = {}
+        self._compare_by_value = compare_by_value
 
     @property
     @abc.abstractmethod
@@ -58,21 +65,61 @@ class ClassifierSetBase:
     def num_macros(self):
         return len(self._members)
 
+    @property
+    def compare_by_value(self):
+        return self._compare_by_value
+
+    def _find_member(self, classifier):
+        """Returns the member the given classifier refers to, or None if it is
+        not in the set."""
+        if self._compare_by_value:
+            for member in self._members.values():
+                if member == classifier:
+                    return member
+            return None
+        else:
+            return self._members.get(id(classifier))
+
+    def _resolve_if_classifier(self, arg):
+        if not isinstance(arg, ClassifierABC):
+            return arg
+        member = self._find_member(arg)
+        if member is None:
+            raise MemberNotFoundError()
+        return member
+
+    def _add_member(self, classifier):
+        self._members[id(classifier)] = classifier
+
+    def _remove_member(self, member):
+        del self._members[id(member)]
+
     def __contains__(self, member):
-        return member in self._members
+        return self._find_member(member) is not None
 
     def __iter__(self):
-        return iter(self._members)
+        return iter(self._members.values())
+
+    def __getstate__(self):
+        # ids are not preserved by copying / pickling, so store members as a
+        # list and re-key them when restoring
+        state = self.__dict__.copy()
+        state["_members"] = list(self._members.values())
+        return state
+
+    def __setstate__(self, state):
+        members = state["_members"]
+        self.__dict__.update(state)
+        self._members = {id(member): member for member in members}
 
     def __repr__(self):
-        return f"{self.__class__.__name__}({self._members!r})"
+        return f"{self.__class__.__name__}({list(self)!r})"
 
     def __str__(self):
-        return "{ " + ",\n".join([str(member) for member in self._members]) \
-                + " }"
+        return "{ " + ",\n".join([str(member) for member in self]) + " }"
 
     def __eq__(self, other):
-        for (my_member, other_member) in zip(self._members, other._members):
+        for (my_member, other_member) in zip(self, other):
             if my_member != other_member:
                 return False
         return True
@@ -0,0 +1,43 @@
+from .classifier_columns import ClassifierColumns
+from .population import Population
+
+
+class ColumnarPopulation(Population):
+    """Population that stores the params of its classifiers in columns
+    (preallocated NumPy arrays, one per param, sized from max_micros) rather
+    than as attrs of the individual classifier objs.
+
+    The classifier objs in the population become thin views of rows in the
+    columns (see ClassifierColumns), so it can be used as a drop-in
+    replacement for Population by existing components, while vectorised
+    components can read and write the params of many classifiers at once by
+    indexing the columns with the rows of those classifiers, e.g.
+
+        rows = population.rows_of(action_set)
+        population.columns.fitness[rows] += ...
+        population.columns.mark_rows_changed("_fitness", rows)
+    """
+    def __init__(self, max_micros, *, compare_by_value=False):
+        super().__init__(max_micros, compare_by_value=compare_by_value)
+        # number of macros can only temporarily exceed max micros (before
+        # deletion), in which case the columns will grow
+        self._columns = ClassifierColumns(capacity=self._max_micros)
+        self.register_observer(self._columns)
+
+    @property
+    def columns(self):
+        return self._columns
+
+    def row_of(self, classifier):
+        return self._columns.row_of(classifier)
+
+    def rows_of(self, classifiers):
+        """Returns array of the rows of the given classifiers (which must be
+        in the population), in iteration order."""
+        return self._columns.rows_of(classifiers)
+
+    @property
+    def rows(self):
+        """Array of the rows of all classifiers in the population, in
+        iteration order."""
+        return self._columns.rows_of(self)
@@ -0,0 +1,218 @@
+import numpy as np
+
+from .population_observer import IPopulationObserver
+
+
+class ConditionMatrix(IPopulationObserver):
+    """Structure-of-arrays store of the encoded conditions of every
+    macroclassifier in a population.
+
+    Each condition is encoded by the rule representation as a tuple of 1-D
+    arrays (see IVectorisedRuleRepr); the store keeps one contiguous 2-D
+    matrix per element of that tuple, with one row per macroclassifier, so that
+    the rule representation can operate on the whole population at once.
+
+    Rows are removed by swapping the last row into the vacated slot, so row
+    order does not follow population order. Each row is therefore tagged with
+    an insertion sequence number, which is used to report classifiers back in
+    the same order that iterating over the population would give.
+
+    Registered as an observer of the population so that it stays in sync
+    with it as classifiers are added and removed.
+
+    Optionally maintains a row index (e.g. IntervalGridIndex) alongside the
+    matrices, which is used when matching to prune the rows that need to be
+    checked, and / or the generalities of the conditions (see
+    Condition.generality()), so that components operating on many rows at
+    once (e.g. subsumption) need not look them up per classifier.
+    """
+    _INIT_CAPACITY = 64
+    _GROWTH_FACTOR = 2
+
+    def __init__(self, rule_repr, row_index=None, *,
+                 stores_generalities=False):
+        self._rule_repr = rule_repr
+        self._row_index = row_index
+        self._stores_generalities = stores_generalities
+        self._matrices = None
+        self._seqs = np.empty(shape=0, dtype=np.int64)
+        self._generalities = np.empty(shape=0, dtype=np.float64)
+        self._classifiers = []
+        self._row_idxs = {}
+        self._num_rows = 0
+        self._next_seq = 0
+
+    @classmethod
+    def from_population(cls,
+                        rule_repr,
+                        population,
+                        row_index=None,
+                        *,
+                        stores_generalities=False):
+        """Creates a condition matrix containing all the classifiers currently
+        in the population, and registers it as an observer of the population
+        so that it remains in sync thereafter."""
+        condition_matrix = cls(rule_repr,
+                               row_index,
+                               stores_generalities=stores_generalities)
+        for classifier in population:
+            condition_matrix.on_classifier_added(classifier)
+        population.register_observer(condition_matrix)
+        return condition_matrix
+
+    @property
+    def num_rows(self):
+        return self._num_rows
+
+    @property
+    def matrices(self):
+        """Tuple of 2-D arrays containing the encoded conditions, restricted
+        to the rows currently in use."""
+        if self._matrices is None:
+            return None
+        return tuple(matrix[:self._num_rows] for matrix in self._matrices)
+
+    @property
+    def generalities(self):
+        """Array of the generalities of the conditions, restricted to the rows
+        currently in use (only if storing generalities)."""
+        assert self._stores_generalities
+        return self._generalities[:self._num_rows]
+
+    @property
+    def classifiers(self):
+        """Classifiers stored in the matrix, indexed by row."""
+        return self._classifiers
+
+    def row_of(self, classifier):
+        return self._row_idxs[id(classifier)]
+
+    def rows_of(self, classifiers):
+        """Returns array of the rows of the given classifiers, in the same
+        order as the classifiers are iterated over."""
+        return np.array(
+            [self._row_idxs[id(classifier)] for classifier in classifiers],
+            dtype=np.intp)
+
+    def on_classifier_added(self, classifier):
+        encoded_condition = \
+            self._rule_repr.encode_condition(classifier.condition)
+        self._ensure_capacity(encoded_condition, self._num_rows + 1)
+        row = self._num_rows
+        for (matrix, encoded_elem) in zip(self._matrices, encoded_condition):
+            matrix[row] = encoded_elem
+        self._seqs[row] = self._next_seq
+        self._next_seq += 1
+        self._set_generality(row, classifier)
+        if self._row_index is not None:
+            self._row_index.ensure_capacity(len(self._seqs))
+            self._row_index.set_row(row, encoded_condition)
+        self._classifiers.append(classifier)
+        self._row_idxs[id(classifier)] = row
+        self._num_rows += 1
+
+    def on_classifier_changed(self, classifier):
+        # re-encode in place to keep the row's seq
+        row = self._row_idxs[id(classifier)]
+        encoded_condition = \
+            self._rule_repr.encode_condition(classifier.condition)
+        for (matrix, encoded_elem) in zip(self._matrices, encoded_condition):
+            matrix[row] = encoded_elem
+        self._set_generality(row, classifier)
+        if self._row_index is not None:
+            self._row_index.set_row(row, encoded_condition)
+
+    def on_classifier_removed(self, classifier):
+        row = self._row_idxs.pop(id(classifier))
+        last_row = self._num_rows - 1
+        if row != last_row:
+            for matrix in self._matrices:
+                matrix[row] = matrix[last_row]
+            self._seqs[row] = self._seqs[last_row]
+            self._generalities[row] = self._generalities[last_row]
+            moved_classifier = self._classifiers[last_row]
+            self._classifiers[row] = moved_classifier
+            self._row_idxs[id(moved_classifier)] = row
+            if self._row_index is not None:
+                self._row_index.move_row(last_row, row)
+        elif self._row_index is not None:
+            self._row_index.clear_row(row)
+        self._classifiers.pop()
+        self._num_rows -= 1
+
+    def __setstate__(self, state):
+        # ids are not preserved by copying / pickling, so re-key rows
+        self.__dict__.update(state)
+        self._row_idxs = {
+            id(classifier): row
+            for (row, classifier) in enumerate(self._classifiers)
+        }
+
+    def _ensure_capacity(self, encoded_condition, num_rows_needed):
+        if self._matrices is None:
+            self._matrices = tuple(
+                np.empty(shape=(self._INIT_CAPACITY, len(encoded_elem)),
+                         dtype=np.asarray(encoded_elem).dtype)
+                for encoded_elem in encoded_condition)
+            self._seqs = np.empty(shape=self._INIT_CAPACITY, dtype=np.int64)
+            self._generalities = np.empty(shape=self._INIT_CAPACITY,
+                                          dtype=np.float64)
+        capacity = len(self._seqs)
+        if num_rows_needed > capacity:
+            new_capacity = capacity * self._GROWTH_FACTOR
+            self._matrices = tuple(
+                self._grow(matrix, new_capacity) for matrix in self._matrices)
+            self._seqs = self._grow(self._seqs, new_capacity)
+            self._generalities = self._grow(self._generalities, new_capacity)
+
+    def _set_generality(self, row, classifier):
+        if self._stores_generalities:
+            self._generalities[row] = \
+                classifier.condition.generality(self._rule_repr)
+
+    def _grow(self, array, new_capacity):
+        grown = np.empty(shape=((new_capacity, ) + array.shape[1:]),
+                         dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def classifiers_in_population_order(self, rows):
+        """Returns the classifiers at the given rows, ordered as they would be
+        when iterating over the population."""
+        rows = np.asarray(rows)
+        ordered_rows = rows[np.argsort(self._seqs[rows], kind="stable")]
+        return [self._classifiers[row] for row in ordered_rows]
+
+    def match(self, situation):
+        """Returns the classifiers whose conditions match the situation, in
+        population order."""
+        if self._num_rows == 0:
+            return []
+        if self._row_index is None:
+            match_mask = self._rule_repr.does_match_encoded(
+                self.matrices, situation)
+            matching_rows = np.flatnonzero(match_mask)
+        else:
+            candidate_rows = self._row_index.calc_candidate_rows(
+                situation, self._num_rows)
+            if len(candidate_rows) == 0:
+                return []
+            match_mask = self._rule_repr.does_match_encoded(
+                tuple(matrix[candidate_rows] for matrix in self._matrices),
+                situation)
+            matching_rows = candidate_rows[match_mask]
+        return self.classifiers_in_population_order(matching_rows)
+
+    def match_batch(self, situations):
+        """Returns (classifiers in population order, 2-D boolean array with
+        one row per situation indicating which of those classifiers match
+        that situation)."""
+        ordered_rows = np.argsort(self._seqs[:self._num_rows], kind="stable")
+        classifiers = [self._classifiers[row] for row in ordered_rows]
+        if self._num_rows == 0:
+            return (classifiers,
+                    np.zeros(shape=(len(situations), 0), dtype=bool))
+        match_masks = self._rule_repr.does_match_encoded_batch(
+            tuple(matrix[ordered_rows] for matrix in self.matrices),
+            situations)
+        return (classifiers, match_masks)
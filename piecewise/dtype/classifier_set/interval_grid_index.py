@@ -0,0 +1,100 @@
+import numpy as np
+
+_WORD_NUM_BITS = 64
+
+
+def _calc_word_and_bit_mask(row):
+    (word, bit) = divmod(row, _WORD_NUM_BITS)
+    return (word, np.uint64(1) << np.uint64(bit))
+
+
+class IntervalGridIndex:
+    """Spatial index over the rows of a ConditionMatrix whose conditions are
+    hyperrectangles, i.e. encoded as (lower bounds, upper bounds) (see
+    MinSpanRuleReprABC.encode_condition()), used to prune the rows that need to
+    be checked when matching.
+
+    Each dimension of the situation space is split into a fixed number of
+    equal width bins, and for each (dimension, bin) pair a bitmap records
+    which rows have an interval overlapping that bin. The candidate rows for
+    a situation are then the AND over dimensions of the bitmaps of the bins
+    containing the situation elements. Values outside the situation space are
+    clamped into the first / last bin; since binning is monotone, any row
+    whose intervals contain the situation is always a candidate, so
+    candidates are a superset of the matching rows and still need to be
+    checked exactly.
+    """
+    def __init__(self, situation_space, num_bins):
+        assert num_bins >= 1
+        self._dim_lowers = np.array(
+            [dimension.lower for dimension in situation_space],
+            dtype=np.float64)
+        dim_uppers = np.array(
+            [dimension.upper for dimension in situation_space],
+            dtype=np.float64)
+        bin_widths = (dim_uppers - self._dim_lowers) / num_bins
+        # degenerate dimensions: any positive width keeps binning monotone
+        bin_widths[bin_widths <= 0] = 1.0
+        self._bin_widths = bin_widths
+        self._num_bins = num_bins
+        self._bin_idxs = np.arange(num_bins)
+        # (dimension, bin, word): bit i of word w set iff row 64w+i overlaps
+        self._bitmaps = np.zeros(shape=(len(self._dim_lowers), num_bins, 0),
+                                 dtype=np.uint64)
+
+    @property
+    def num_bins(self):
+        return self._num_bins
+
+    def _calc_bins(self, vals):
+        bins = np.floor(
+            (np.asarray(vals, dtype=np.float64) - self._dim_lowers) /
+            self._bin_widths)
+        return np.clip(bins, 0, self._num_bins - 1).astype(np.intp)
+
+    def ensure_capacity(self, num_rows):
+        num_words = -(-num_rows // _WORD_NUM_BITS)
+        curr_num_words = self._bitmaps.shape[2]
+        if num_words > curr_num_words:
+            new_num_words = max(num_words, 2 * curr_num_words)
+            grown = np.zeros(shape=(self._bitmaps.shape[:2] +
+                                    (new_num_words, )),
+                             dtype=np.uint64)
+            grown[:, :, :curr_num_words] = self._bitmaps
+            self._bitmaps = grown
+
+    def set_row(self, row, encoded_condition):
+        (lowers, uppers) = encoded_condition
+        lower_bins = self._calc_bins(lowers)
+        upper_bins = self._calc_bins(uppers)
+        overlaps = (self._bin_idxs >= lower_bins[:, np.newaxis]) & \
+            (self._bin_idxs <= upper_bins[:, np.newaxis])
+        self._write_row(row, overlaps)
+
+    def move_row(self, src_row, dst_row):
+        (src_word, src_bit_mask) = _calc_word_and_bit_mask(src_row)
+        overlaps = (self._bitmaps[:, :, src_word] & src_bit_mask) != 0
+        self._write_row(dst_row, overlaps)
+        self.clear_row(src_row)
+
+    def clear_row(self, row):
+        (word, bit_mask) = _calc_word_and_bit_mask(row)
+        self._bitmaps[:, :, word] &= ~bit_mask
+
+    def _write_row(self, row, overlaps):
+        (word, bit_mask) = _calc_word_and_bit_mask(row)
+        words = self._bitmaps[:, :, word]
+        self._bitmaps[:, :, word] = np.where(overlaps, words | bit_mask,
+                                             words & ~bit_mask)
+
+    def calc_candidate_rows(self, situation, num_rows):
+        """Returns sorted array of the rows (out of the first num_rows) that
+        could match the given situation."""
+        bins = self._calc_bins(situation)
+        num_words = -(-num_rows // _WORD_NUM_BITS)
+        dim_idxs = np.arange(len(bins))
+        candidate_words = np.bitwise_and.reduce(
+            self._bitmaps[dim_idxs, bins, :num_words], axis=0)
+        candidate_bits = np.unpackbits(
+            candidate_words.astype("<u8").view(np.uint8), bitorder="little")
+        return np.flatnonzero(candidate_bits[:num_rows])
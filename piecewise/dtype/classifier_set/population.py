@@ -1,9 +1,13 @@
 import functools
 
+from piecewise.dtype.classifier import (AttrUpdateCounts,
+                                        assign_attr_update_counts)
 from piecewise.error.population_error import InvalidSizeError
 
 from .classifier_set_base import ClassifierSetBase, verify_membership
+from .population_observer import IPopulationObserver
 from .population_operation_recorder import PopulationOperationRecorder
+from .rule_index import RuleIndex
 
 
 def record_operation(atomic_method):
@@ -39,13 +43,32 @@ class Population(ClassifierSetBase):
     accurate state) because all mutations of classifier numerosities is done
     by calling public methods on the population, which internally take care
     of numerosity incermenting/decrementing.
+
+    The population also has a version, which is incremented whenever the set
+    of macroclassifiers or their conditions change (but not their
+    numerosities), and records the version each member was added at. This
+    allows data derived from the population (e.g. cached match sets) to be
+    validated and brought up to date by only looking at the members added
+    since (see members_added_since()).
+
+    Members record updates to their attrs in the population's own attr
+    update counts (see AttrUpdateCounts), so that the cached aggregates of
+    classifier sets are only invalidated by updates to the members of the
+    populations they draw from.
     """
-    def __init__(self, max_micros):
+    def __init__(self, max_micros, *, compare_by_value=False):
         self._max_micros = self._validate_and_return_max_micros(max_micros)
         self._num_micros = 0
         self._operation_recorder = \
             PopulationOperationRecorder()
-        super().__init__()
+        self._observers = []
+        self._version = 0
+        self._last_genotype_change_version = 0
+        self._member_versions = {}
+        self._attr_update_counts = AttrUpdateCounts()
+        self._rule_index = RuleIndex()
+        self.register_observer(self._rule_index)
+        super().__init__(compare_by_value=compare_by_value)
 
     def _validate_and_return_max_micros(self, max_micros):
         max_micros = int(max_micros)
@@ -66,6 +89,61 @@ class Population(ClassifierSetBase):
     def operations_record(self):
         return self._operation_recorder
 
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def last_genotype_change_version(self):
+        """Version at which the genotype of a member was last changed in place
+        (see notify_genotype_changed()), 0 if never."""
+        return self._last_genotype_change_version
+
+    def version_added(self, classifier):
+        """Returns the version at which the given classifier was added to the
+        population, or None if it is not in the population."""
+        return self._member_versions.get(id(classifier))
+
+    def members_added_since(self, version):
+        """Returns the members added after the given version, in iteration
+        order."""
+        added = []
+        for member in reversed(self._members.values()):
+            if self._member_versions[id(member)] <= version:
+                break
+            added.append(member)
+        added.reverse()
+        return added
+
+    def _add_member(self, classifier):
+        super()._add_member(classifier)
+        self._version += 1
+        self._member_versions[id(classifier)] = self._version
+        assign_attr_update_counts(classifier, self._attr_update_counts)
+
+    def _remove_member(self, member):
+        super()._remove_member(member)
+        self._version += 1
+        del self._member_versions[id(member)]
+        assign_attr_update_counts(member)
+
+    def register_observer(self, observer):
+        """Registers the given observer to be notified of macroclassifiers
+        being added to / removed from the population."""
+        assert isinstance(observer, IPopulationObserver)
+        self._observers.append(observer)
+
+    def deregister_observer(self, observer):
+        self._observers.remove(observer)
+
+    def _notify_added(self, classifier):
+        for observer in self._observers:
+            observer.on_classifier_added(classifier)
+
+    def _notify_removed(self, classifier):
+        for observer in self._observers:
+            observer.on_classifier_removed(classifier)
+
     def _inc_num_micros(self, added_numerosity):
         self._num_micros += added_numerosity
 
@@ -97,10 +175,10 @@ class Population(ClassifierSetBase):
             self._atomic_add_new(classifier, operation_label=operation_label)
 
     def _try_to_absorb(self, classifier):
-        for member in self._members:
-            if member.rule == classifier.rule:
-                self._absorb(absorbee=classifier, absorber=member)
-                return True
+        absorber = self._rule_index.find_equal(classifier.rule)
+        if absorber is not None:
+            self._absorb(absorbee=classifier, absorber=absorber)
+            return True
         return False
 
     def _absorb(self, absorbee, absorber):
@@ -143,6 +221,71 @@ class Population(ClassifierSetBase):
                                    num_replacer_copies,
                                    operation_label=operation_label)
 
+    @verify_membership
+    def replace_many(self, replacees, replacer, *, operation_label=None):
+        """Batched equivalent of calling replace() with each of the given
+        classifiers (replacees) in turn and the same replacer: all copies of
+        the replacees are removed and the numerosity of the replacer is
+        incremented by the total number of copies removed, in one go.
+
+        Replacees that are not (or no longer) in the population are skipped,
+        rather than throwing as replace() would. Returns list of the replacees
+        that were replaced.
+
+        Throws:
+            MemberNotFoundError: if the replacer is not in the population.
+        """
+        replaced = []
+        num_replacer_copies = 0
+        for replacee in replacees:
+            member = self._find_member(replacee)
+            if member is None:
+                continue
+            assert member is not replacer
+            num_replacer_copies += member.numerosity
+            self._atomic_remove_whole(member)
+            replaced.append(member)
+        if num_replacer_copies > 0:
+            self._atomic_copy_existing(replacer,
+                                       num_replacer_copies,
+                                       operation_label=operation_label)
+        return replaced
+
+    def compact(self, *, operation_label="compaction"):
+        """Merges macroclassifiers with equal rules (e.g. added by covering,
+        or made equal by mutation) into one macroclassifier each. Returns the
+        number of macroclassifiers removed.
+
+        Members are grouped via the rule index, so equal rules are found as
+        by insert(). The earliest added member of each group is kept: the
+        params of the others are merged into it (see
+        ClassifierABC.merge_params()), then they are replaced by it (see
+        replace_many()), so the number of micros is unchanged."""
+        groups = self._find_equal_rule_groups()
+        for (keeper, duplicates) in groups:
+            keeper.merge_params(duplicates)
+            self.replace_many(duplicates,
+                              keeper,
+                              operation_label=operation_label)
+        return sum([len(duplicates) for (_, duplicates) in groups])
+
+    def _find_equal_rule_groups(self):
+        """Returns list of (keeper, duplicates) tuples, one for each group of
+        members with equal rules that has more than one member."""
+        keepers = {}
+        groups = {}
+        for member in self:
+            equal_member = self._rule_index.find_equal(member.rule)
+            if equal_member is member:
+                continue
+            # float alleles are equal within a tolerance, so equality is not
+            # transitive: if the equal member is itself a duplicate, join its
+            # group rather than starting a new one
+            keeper = keepers.get(id(equal_member), equal_member)
+            keepers[id(member)] = keeper
+            groups.setdefault(id(keeper), (keeper, []))[1].append(member)
+        return list(groups.values())
+
     @verify_membership
     def delete(self, classifier):
         """Deletes (removes a single copy) of the given classifier in the
@@ -163,12 +306,41 @@ class Population(ClassifierSetBase):
         """
         self._atomic_remove_whole(classifier, operation_label=operation_label)
 
+    @verify_membership
+    def notify_genotype_changed(self, classifier):
+        """Must be called after mutating the genotype of a classifier in the
+        population in place, so that the population version and the
+        observers can account for its new condition.
+
+        Throws:
+            MemberNotFoundError: if the classifier is not in the population.
+        """
+        self._version += 1
+        self._last_genotype_change_version = self._version
+        for observer in self._observers:
+            observer.on_classifier_changed(classifier)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["_member_versions"] = [
+            self._member_versions[id(member)] for member in self
+        ]
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._member_versions = {
+            id(member): version
+            for (member, version) in zip(self, state["_member_versions"])
+        }
+
     # Atomic operations - wrapped with operation recording
 
     @record_operation
     def _atomic_add_new(self, new_classifier, *, operation_label=None):
-        self._members.append(new_classifier)
+        self._add_member(new_classifier)
         self._inc_num_micros(new_classifier.numerosity)
+        self._notify_added(new_classifier)
 
     @record_operation
     def _atomic_copy_existing(self,
@@ -182,8 +354,9 @@ class Population(ClassifierSetBase):
 
     @record_operation
     def _atomic_remove_whole(self, classifier, *, operation_label=None):
-        self._members.remove(classifier)
+        self._remove_member(classifier)
         self._dec_num_micros(classifier.numerosity)
+        self._notify_removed(classifier)
 
     @record_operation
     def _atomic_remove_single_copy(self,
@@ -197,5 +370,6 @@ class Population(ClassifierSetBase):
             existing_classifier.numerosity -= 1
         else:
             # can't have 0 numerosity, so remove completely
-            self._members.remove(existing_classifier)
+            self._remove_member(existing_classifier)
+            self._notify_removed(existing_classifier)
         self._dec_num_micros(1)
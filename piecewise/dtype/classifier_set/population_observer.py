@@ -0,0 +1,29 @@
+import abc
+
+
+class IPopulationObserver(metaclass=abc.ABCMeta):
+    """Interface for objects that shadow the membership of a population, e.g.
+    to maintain auxiliary data structures over its classifiers.
+
+    Observers are only notified of changes to the set of macroclassifiers in
+    the population and to their conditions, not of changes to their
+    numerosities or other params."""
+    @abc.abstractmethod
+    def on_classifier_added(self, classifier):
+        """Called after a new macroclassifier is added to the population."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def on_classifier_removed(self, classifier):
+        """Called after a macroclassifier is removed from the population."""
+        raise NotImplementedError
+
+    def on_classifier_changed(self, classifier):
+        """Called after the condition of a macroclassifier in the population
+        has been mutated in place (see Population.notify_genotype_changed()).
+
+        By default treated as removing and re-adding the classifier;
+        observers that track the order classifiers were added in should
+        override this to update the classifier in place."""
+        self.on_classifier_removed(classifier)
+        self.on_classifier_added(classifier)
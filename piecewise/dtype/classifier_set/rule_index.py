@@ -0,0 +1,107 @@
+from piecewise.dtype.genotype import Genotype
+
+from .population_observer import IPopulationObserver
+
+
+def _calc_genotype_index_key(genotype):
+    if isinstance(genotype, Genotype):
+        return genotype.index_key()
+    else:
+        # plain sequence of alleles, compared exactly
+        return tuple(genotype)
+
+
+def _calc_genotype_probe_index_keys(genotype):
+    if isinstance(genotype, Genotype):
+        return genotype.probe_index_keys()
+    else:
+        return (tuple(genotype), )
+
+
+class RuleIndex(IPopulationObserver):
+    """Hash index over the rules of the classifiers in a population, used to
+    find a classifier with a given rule without scanning the whole
+    population.
+
+    Classifiers are bucketed by their action plus the index key of their
+    condition genotype (see Genotype.index_key()). Lookups probe every bucket
+    an equal rule could be in, then confirm candidates with Rule.__eq__, so
+    results are the same as a linear scan using Rule.__eq__ (including
+    tolerance for float alleles): when several classifiers have an equal
+    rule, the one that was added to the index first is returned.
+    """
+    def __init__(self):
+        self._buckets = {}
+        self._entries = {}
+        self._next_seq = 0
+
+    def _calc_key(self, rule, genotype_key):
+        return (rule.action, genotype_key)
+
+    def on_classifier_added(self, classifier):
+        entry = (self._next_seq, classifier)
+        self._next_seq += 1
+        self._add_entry(entry)
+
+    def on_classifier_removed(self, classifier):
+        self._remove_entry(classifier)
+
+    def on_classifier_changed(self, classifier):
+        # re-bucket under the new key but keep the seq
+        entry = self._remove_entry(classifier)
+        self._add_entry(entry)
+
+    def _add_entry(self, entry):
+        (_, classifier) = entry
+        rule = classifier.rule
+        key = self._calc_key(
+            rule, _calc_genotype_index_key(rule.condition.genotype))
+        self._buckets.setdefault(key, []).append(entry)
+        self._entries[id(classifier)] = (key, entry)
+
+    def _remove_entry(self, classifier):
+        (key, entry) = self._entries.pop(id(classifier))
+        bucket = self._buckets[key]
+        bucket.remove(entry)
+        if len(bucket) == 0:
+            del self._buckets[key]
+        return entry
+
+    def __setstate__(self, state):
+        # ids are not preserved by copying / pickling, so re-key entries
+        self.__dict__.update(state)
+        self._entries = {
+            id(entry[1]): (key, entry)
+            for (key, bucket) in self._buckets.items() for entry in bucket
+        }
+
+    def find_equal(self, rule):
+        """Returns the (earliest added) classifier whose rule is equal to the
+        given rule, or None if there is no such classifier."""
+        probe_genotype_keys = \
+            _calc_genotype_probe_index_keys(rule.condition.genotype)
+        if probe_genotype_keys is None:
+            candidate_entries = self._iter_all_entries()
+        else:
+            candidate_entries = self._iter_entries_for_keys([
+                self._calc_key(rule, genotype_key)
+                for genotype_key in probe_genotype_keys
+            ])
+        equal_entries = [(seq, classifier)
+                         for (seq, classifier) in candidate_entries
+                         if classifier.rule == rule]
+        if len(equal_entries) == 0:
+            return None
+        else:
+            (_, earliest_classifier) = min(equal_entries,
+                                           key=lambda entry: entry[0])
+            return earliest_classifier
+
+    def _iter_entries_for_keys(self, keys):
+        for key in keys:
+            for entry in self._buckets.get(key, ()):
+                yield entry
+
+    def _iter_all_entries(self):
+        for (_, entry) in self._entries.values():
+            yield entry
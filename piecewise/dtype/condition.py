@@ -1,5 +1,45 @@
+import numpy as np
+
+from .slots import copy_attr_state
+
+# generalities are cached on genotypes alongside phenotypes, under keys of
+# (_GENERALITY_CACHE_TAG, rule repr)
+_GENERALITY_CACHE_TAG = "generality"
+
+
+def calc_generalities(conditions, rule_repr):
+    """Returns array of the generalities of the given conditions as
+    calculated by the given rule repr (see Condition.generality()).
+
+    Cached generalities are reused, and the rest are calculated in a single
+    batch by the rule repr (see IRuleRepr.calc_generality_batch()) and then
+    cached."""
+    conditions = list(conditions)
+    generalities = np.empty(len(conditions), dtype=np.float64)
+    cache_key = (_GENERALITY_CACHE_TAG, rule_repr)
+    uncached_idxs = []
+    for (idx, condition) in enumerate(conditions):
+        try:
+            generalities[idx] = \
+                condition.genotype.phenotype_cache[cache_key]
+        except KeyError:
+            uncached_idxs.append(idx)
+    if len(uncached_idxs) > 0:
+        uncached_conditions = [conditions[idx] for idx in uncached_idxs]
+        uncached_generalities = \
+            rule_repr.calc_generality_batch(uncached_conditions)
+        for (idx, condition, generality) in zip(uncached_idxs,
+                                                uncached_conditions,
+                                                uncached_generalities):
+            generalities[idx] = generality
+            condition.genotype.phenotype_cache[cache_key] = generality
+    return generalities
+
+
 class Condition:
     """Represents the 'IF' (antecedent) part of a classifier rule."""
+    __slots__ = ("_genotype", )
+
     def __init__(self, genotype):
         self._genotype = genotype
 
@@ -7,8 +47,41 @@ class Condition:
     def genotype(self):
         return self._genotype
 
+    def clone(self):
+        """Returns a copy of this condition with a cloned genotype."""
+        clone = self.__class__.__new__(self.__class__)
+        copy_attr_state(self, clone)
+        clone._genotype = self._genotype.clone()
+        return clone
+
     def phenotype(self, rule_repr):
-        return rule_repr.map_genotype_to_phenotype(self._genotype)
+        """Returns the genotype of the condition decoded into phenotype space
+        by the given rule repr.
+
+        Phenotypes are cached on the genotype until it is next mutated, so
+        repeated calls with the same rule repr are cheap."""
+        phenotype_cache = self._genotype.phenotype_cache
+        try:
+            return phenotype_cache[rule_repr]
+        except KeyError:
+            phenotype = rule_repr.map_genotype_to_phenotype(self._genotype)
+            phenotype_cache[rule_repr] = phenotype
+            return phenotype
+
+    def generality(self, rule_repr):
+        """Returns the generality of the condition as calculated by the given
+        rule repr.
+
+        Cached on the genotype alongside phenotypes (see phenotype()), so is
+        only recalculated after the genotype is next mutated."""
+        phenotype_cache = self._genotype.phenotype_cache
+        cache_key = (_GENERALITY_CACHE_TAG, rule_repr)
+        try:
+            return phenotype_cache[cache_key]
+        except KeyError:
+            generality = rule_repr.calc_generality(self)
+            phenotype_cache[cache_key] = generality
+            return generality
 
     def __eq__(self, other):
         return self._genotype == other._genotype
@@ -1,20 +1,119 @@
+import functools
+import itertools
+import math
+import numbers
+import operator
+
 import numpy as np
 
 from .config import float_allele_rel_tol
+from .slots import copy_attr_state, get_attr_state
+
+# np.isclose() default, used when comparing float alleles
+_FLOAT_ALLELE_ABS_TOL = 1e-8
+# bound on how many keys a genotype may need probing under in an index
+# before callers should fall back to a linear scan
+_MAX_NUM_PROBE_KEYS = 256
+
+
+def _calc_real_allele_bucket(allele):
+    """Quantises a real valued allele into a bucket index.
+
+    Values with magnitude below the float abs tol all fall into bucket 0,
+    otherwise buckets are powers of two wide in magnitude and signed. Bucket
+    idxs are non-decreasing in the allele value, and always wider than the
+    float allele rel tol, so alleles that are close to one another fall in the
+    same or adjacent buckets."""
+    if not math.isfinite(allele):
+        return float(allele)
+    abs_allele = abs(allele)
+    if abs_allele < _FLOAT_ALLELE_ABS_TOL:
+        return 0
+    bucket = 1 + math.floor(math.log2(abs_allele / _FLOAT_ALLELE_ABS_TOL))
+    return bucket if allele > 0 else -bucket
+
+
+def _calc_allele_index_key(allele):
+    if isinstance(allele, numbers.Real):
+        return _calc_real_allele_bucket(allele)
+    else:
+        return allele
+
+
+def _calc_allele_probe_keys(allele):
+    """Returns the keys that alleles considered equal to the given allele
+    (see Genotype._alleles_are_equal) could have."""
+    is_float = isinstance(allele, np.floating) and math.isfinite(allele)
+    if is_float:
+        tol = _FLOAT_ALLELE_ABS_TOL + float_allele_rel_tol * abs(allele)
+        lowest_bucket = _calc_real_allele_bucket(allele - tol)
+        highest_bucket = _calc_real_allele_bucket(allele + tol)
+        return range(lowest_bucket, highest_bucket + 1)
+    else:
+        return (_calc_allele_index_key(allele), )
 
 
 class Genotype:
-    """Mutable sequence type that represents a sequence of alleles."""
+    """Mutable sequence type that represents a sequence of alleles.
+
+    Also holds a cache of the phenotypes this genotype has been decoded into
+    (keyed by rule repr, see Condition.phenotype()) and of the generalities
+    calculated for it (see Condition.generality()), which is cleared whenever
+    the genotype is mutated through __setitem__."""
+    __slots__ = ("_alleles", "_phenotype_cache")
+
     def __init__(self, alleles):
         self._alleles = list(alleles)
+        self._phenotype_cache = {}
 
     @classmethod
     def from_allele_args(cls, *alleles):
         return cls(alleles)
 
+    @property
+    def phenotype_cache(self):
+        return self._phenotype_cache
+
+    def _invalidate_phenotype_cache(self):
+        if self._phenotype_cache:
+            self._phenotype_cache = {}
+
+    def clone(self):
+        """Returns a copy of this genotype that can be mutated independently
+        of it. Alleles are immutable so are shared; the phenotype cache is
+        not copied."""
+        clone = self.__class__.__new__(self.__class__)
+        copy_attr_state(self, clone)
+        clone._alleles = list(self._alleles)
+        clone._phenotype_cache = {}
+        return clone
+
     def count(self, allele_value):
         return self._alleles.count(allele_value)
 
+    def index_key(self):
+        """Returns a hashable key for storing this genotype in a hash-based
+        index (see RuleIndex).
+
+        Real valued alleles are quantised into buckets, so that genotypes that
+        are equal within float_allele_rel_tol can be found via
+        probe_index_keys()."""
+        return tuple(
+            [_calc_allele_index_key(allele) for allele in self._alleles])
+
+    def probe_index_keys(self):
+        """Returns an iterable of all the index keys that genotypes equal to
+        this genotype could be stored under, or None if there are too many to
+        be worth enumerating."""
+        allele_probe_keys = [
+            _calc_allele_probe_keys(allele) for allele in self._alleles
+        ]
+        num_probe_keys = functools.reduce(
+            operator.mul, [len(keys) for keys in allele_probe_keys], 1)
+        if num_probe_keys > _MAX_NUM_PROBE_KEYS:
+            return None
+        return itertools.product(*allele_probe_keys)
+
     def __eq__(self, other):
         for (my_allele, other_allele) in zip(self._alleles, other._alleles):
             if not self._alleles_are_equal(my_allele, other_allele):
@@ -34,6 +133,7 @@ class Genotype:
 
     def __setitem__(self, idx, value):
         self._alleles[idx] = value
+        self._invalidate_phenotype_cache()
 
     def __getitem__(self, key):
         if isinstance(key, slice):
@@ -51,6 +151,13 @@ class Genotype:
     def __iter__(self):
         return iter(self._alleles)
 
+    def __getstate__(self):
+        # cache is keyed by rule repr objs, so don't drag them along when
+        # copying / pickling
+        state = get_attr_state(self)
+        state["_phenotype_cache"] = {}
+        return (None, state)
+
     def __repr__(self):
         return f"{self.__class__.__name__}(" f"{self._alleles!r})"
 
@@ -1,10 +1,22 @@
+from .slots import copy_attr_state
+
+
 class Rule:
     """Represents a rule (condition to action mapping) for a classifier."""
+    __slots__ = ("_condition", "_action", "_num_features")
+
     def __init__(self, condition, action, num_features):
         self._condition = condition
         self._action = action
         self._num_features = num_features
 
+    def clone(self):
+        """Returns a copy of this rule with a cloned condition."""
+        clone = self.__class__.__new__(self.__class__)
+        copy_attr_state(self, clone)
+        clone._condition = self._condition.clone()
+        return clone
+
     @property
     def condition(self):
         return self._condition
@@ -0,0 +1,69 @@
+import functools
+
+_NON_ATTR_SLOT_NAMES = ("__dict__", "__weakref__")
+
+
+@functools.lru_cache(maxsize=None)
+def calc_slot_names(cls):
+    """Returns tuple of the names of the instance attr slots declared by the
+    given cls and its bases, base cls slots first."""
+    slot_names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots, )
+        for slot_name in slots:
+            if slot_name not in _NON_ATTR_SLOT_NAMES and \
+                    slot_name not in slot_names:
+                slot_names.append(slot_name)
+    return tuple(slot_names)
+
+
+def get_attr_state(obj, exclude=()):
+    """Returns dict of the instance attrs of the given obj, whether stored in
+    slots or in its __dict__ (if it has one), excluding any given names.
+    Unset slots are skipped."""
+    state = {}
+    for slot_name in calc_slot_names(type(obj)):
+        if slot_name not in exclude:
+            try:
+                state[slot_name] = getattr(obj, slot_name)
+            except AttributeError:
+                pass
+    for (attr_name, value) in getattr(obj, "__dict__", {}).items():
+        if attr_name not in exclude:
+            state[attr_name] = value
+    return state
+
+
+def set_attr_state(obj, state):
+    for (attr_name, value) in state.items():
+        setattr(obj, attr_name, value)
+
+
+@functools.lru_cache(maxsize=None)
+def _calc_copy_spec(cls, exclude):
+    copied_slot_names = tuple([
+        slot_name for slot_name in calc_slot_names(cls)
+        if slot_name not in exclude
+    ])
+    has_dict = cls.__dictoffset__ != 0
+    return (copied_slot_names, has_dict)
+
+
+def copy_attr_state(src, dst, exclude=()):
+    """Copies the instance attrs of src onto dst (shallow), excluding any
+    given names. Slots expected to be unset should be excluded, as skipping
+    them is comparatively slow."""
+    (copied_slot_names, has_dict) = _calc_copy_spec(type(src), exclude)
+    for slot_name in copied_slot_names:
+        try:
+            setattr(dst, slot_name, getattr(src, slot_name))
+        except AttributeError:
+            pass
+    if has_dict:
+        dst.__dict__.update({
+            attr_name: value
+            for (attr_name, value) in src.__dict__.items()
+            if attr_name not in exclude
+        })
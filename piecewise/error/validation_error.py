@@ -0,0 +1,7 @@
+from .core_errors import PiecewiseError
+
+
+class ValidationLevelError(PiecewiseError):
+    """Error indicating that the validation level was changed while an LCS
+    made at a different level is in use."""
+    pass
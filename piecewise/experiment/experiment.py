@@ -6,7 +6,6 @@ from pathlib import Path
 
 import __main__
 from piecewise.error.experiment_error import ExperimentError
-from piecewise.lcs.hyperparams import get_registry
 
 from .trainer import Trainer
 
@@ -21,10 +20,12 @@ class Experiment:
                  lcs_monitor_freq=1,
                  use_loop_monitor=False,
                  logging_level=logging.INFO,
-                 var_args=None):
+                 var_args=None,
+                 compaction_freq=None):
         self._trainer = Trainer(env, lcs, num_training_samples,
                                 use_lcs_monitor, lcs_monitor_freq,
-                                use_loop_monitor)
+                                use_loop_monitor, compaction_freq)
+        self._lcs = lcs
         self._save_path = self._setup_save_path(name)
         self._setup_logging(logging_level, self._save_path)
         self._var_args = var_args
@@ -64,7 +65,9 @@ class Experiment:
         shutil.copyfile(run_script_path, self._save_path / "run_script.py")
 
     def _save_lcs_hyperparams(self):
-        hyperparams = get_registry()
+        # the hyperparams the lcs was made with, whether its own or a view of
+        # the global registry
+        hyperparams = self._lcs.hyperparams.as_dict()
         with open(self._save_path / "lcs_hyperparams.txt", "w") as fp:
             fp.write(str(hyperparams))
 
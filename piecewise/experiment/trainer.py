@@ -2,6 +2,7 @@ import logging
 from collections import namedtuple
 
 from piecewise.constants import EPOCH_NUM_MIN, TIME_STEP_MIN
+from piecewise.environment import EnvironmentStepTypes
 from piecewise.monitor import Monitor, NullMonitor
 
 LoopData = namedtuple("LoopData",
@@ -9,8 +10,14 @@ LoopData = namedtuple("LoopData",
 
 
 class Trainer:
-    def __init__(self, env, lcs, num_training_samples, use_lcs_monitor,
-                 lcs_monitor_freq, use_loop_monitor):
+    def __init__(self,
+                 env,
+                 lcs,
+                 num_training_samples,
+                 use_lcs_monitor,
+                 lcs_monitor_freq,
+                 use_loop_monitor,
+                 compaction_freq=None):
         self._env = env
         self._lcs = lcs
         self._num_training_samples = num_training_samples
@@ -18,6 +25,10 @@ class Trainer:
             self._init_lcs_monitor(use_lcs_monitor,
                                    lcs_monitor_freq)
         self._loop_monitor = self._init_loop_monitor(use_loop_monitor)
+        assert compaction_freq is None or compaction_freq > 0
+        self._compaction_freq = compaction_freq
+        self._last_compaction_time_step = TIME_STEP_MIN
+        self._compaction_history = {}
 
         self._time_step = TIME_STEP_MIN
         self._epoch_num = EPOCH_NUM_MIN
@@ -36,11 +47,18 @@ class Trainer:
         else:
             return NullMonitor()
 
+    @property
+    def compaction_history(self):
+        """Dict mapping each time step the population was compacted at to
+        the number of macroclassifiers removed."""
+        return self._compaction_history
+
     def train_lcs(self):
         logging.info("Starting training")
         while not self._is_finished_training():
             self._train_single_epoch()
             self._epoch_num += 1
+            self._try_compact_population()
         logging.info("Finished training")
         return self._lcs
 
@@ -67,11 +85,31 @@ class Trainer:
             situation = env_response.obs
             self._time_step += 1
             self._update_monitors()
+            if self._env.step_type == EnvironmentStepTypes.single_step:
+                self._try_compact_population()
 
     def _update_monitors(self):
         self._lcs_monitor.update(self._time_step, self._lcs)
         self._loop_monitor.update(self._time_step, self._loop_data)
 
+    def _try_compact_population(self):
+        """Compacts the population (see Population.compact()) if at least
+        compaction_freq time steps have passed since it was last compacted.
+
+        Checked after every step for single-step envs, where no action set is
+        held over between steps (and an epoch may be e.g. a whole pass over a
+        dataset), but only between epochs for multi-step envs, so that no
+        action set held over from the previous step contains removed
+        classifiers."""
+        if self._compaction_freq is not None and \
+                self._time_step - self._last_compaction_time_step >= \
+                self._compaction_freq:
+            num_removed = self._lcs.population.compact()
+            logging.info(f"Compacted population: removed {num_removed} "
+                         f"macroclassifiers")
+            self._compaction_history[self._time_step] = num_removed
+            self._last_compaction_time_step = self._time_step
+
     def _is_finished_training(self):
         return self._time_step == self._num_training_samples
 
@@ -4,12 +4,15 @@ import logging
 from piecewise.dtype.classifier import (EXPERIENCE_MIN,
                                         Classifier,
                                         LinearPredictionClassifier,
-                                        check_attr_value)
+                                        check_attr_value,
+                                        register_checked_setters)
 from piecewise.dtype.config import classifier_attr_rel_tol
 from piecewise.dtype.formatting import as_truncated_str
 
 
 class FuzzyMixin:
+    __slots__ = ()
+
     @property
     def experience(self):
         return self._experience
@@ -20,12 +23,21 @@ class FuzzyMixin:
         """Experience is now a float."""
         self._experience = float(value)
 
+    def _init_clone(self, clone):
+        super()._init_clone(clone)
+        clone._experience = float(clone._experience)
+
     def calc_matching_degree(self, rule_repr, situation):
         """Calculates matching degree of condition."""
         return rule_repr.eval_condition(self.condition, situation)
 
 
+register_checked_setters(FuzzyMixin)
+
+
 class FuzzyClassifier(FuzzyMixin, Classifier):
+    __slots__ = ()
+
     def __eq__(self, other):
         return self._rule == other.rule and \
             math.isclose(self._prediction, other.prediction,
@@ -53,6 +65,8 @@ class FuzzyClassifier(FuzzyMixin, Classifier):
 
 
 class FuzzyLinearPredictionClassifier(FuzzyMixin, LinearPredictionClassifier):
+    __slots__ = ()
+
     def __eq__(self, other):
         return self._rule == other.rule and \
             self._weight_vec_is_close(other) and \
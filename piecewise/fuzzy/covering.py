@@ -4,25 +4,30 @@ import logging
 from piecewise.dtype import Rule
 from piecewise.dtype.config import classifier_attr_rel_tol
 from piecewise.lcs.component.covering import RuleReprCoveringABC
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.lcs.rng import get_rng
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.lcs.rng import resolve_rng
 
 from .classifier import FuzzyClassifier, FuzzyLinearPredictionClassifier
 
 
-def make_fuzzy_classifier(rule, time_step):
-    return FuzzyClassifier(rule, get_hyperparam("prediction_I"),
-            get_hyperparam("epsilon_I"), get_hyperparam("fitness_I"),
-            time_step)
+def make_fuzzy_classifier(rule, time_step, hyperparams=None):
+    hyperparams = resolve_hyperparams(hyperparams)
+    return FuzzyClassifier(rule, hyperparams.prediction_I,
+                           hyperparams.epsilon_I, hyperparams.fitness_I,
+                           time_step)
 
 
-def make_fuzzy_linear_prediction_classifier(rule, time_step):
-    return FuzzyLinearPredictionClassifier(rule, get_hyperparam("epsilon_I"),
-                                           get_hyperparam("fitness_I"),
+def make_fuzzy_linear_prediction_classifier(rule,
+                                            time_step,
+                                            hyperparams=None,
+                                            rng=None):
+    hyperparams = resolve_hyperparams(hyperparams)
+    return FuzzyLinearPredictionClassifier(rule, hyperparams.epsilon_I,
+                                           hyperparams.fitness_I,
                                            time_step,
-                                           get_hyperparam("x_nought"),
-                                           get_hyperparam("delta_rls"),
-                                           get_rng())
+                                           hyperparams.x_nought,
+                                           hyperparams.delta_rls,
+                                           resolve_rng(rng))
 
 
 class FuzzyRuleReprCovering(RuleReprCoveringABC):
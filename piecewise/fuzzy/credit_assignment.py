@@ -1,12 +1,13 @@
 import numpy as np
 import logging
 
-from piecewise.lcs.hyperparams import get_hyperparam
+from piecewise.lcs.hyperparams import resolve_hyperparams
 
 
 class FuzzyXCSCreditAssignment:
-    def __init__(self, rule_repr):
+    def __init__(self, rule_repr, hyperparams=None):
         self._rule_repr = rule_repr
+        self._hyperparams = resolve_hyperparams(hyperparams)
 
     def __call__(self, action_set, payoff, situation):
         matching_degrees = [
@@ -32,32 +33,33 @@ class FuzzyXCSCreditAssignment:
     def _update_prediction(self, classifier, payoff_diff, situation,
             credit_weight):
         prediction = classifier.get_prediction(situation)
-        if classifier.experience < (1 / get_hyperparam("beta")):
+        if classifier.experience < (1 / self._hyperparams.beta):
             classifier.set_prediction(prediction +
                 (credit_weight * (1 / classifier.experience) * payoff_diff))
         else:
             classifier.set_prediction(prediction +
-                (credit_weight * get_hyperparam("beta") * payoff_diff))
+                (credit_weight * self._hyperparams.beta * payoff_diff))
 
     def _update_prediction_error(self, classifier, payoff_diff, credit_weight):
         error_diff = abs(payoff_diff) - classifier.error
-        if classifier.experience < (1 / get_hyperparam("beta")):
+        if classifier.experience < (1 / self._hyperparams.beta):
             classifier.error += \
                 (credit_weight * (1 / classifier.experience) * error_diff)
         else:
             classifier.error += \
-                (credit_weight * get_hyperparam("beta") * error_diff)
+                (credit_weight * self._hyperparams.beta * error_diff)
 
     def _update_action_set_size(self, classifier, action_set):
         action_set_size_diff = action_set.num_micros \
             - classifier.action_set_size
         classifier.action_set_size += \
-            get_hyperparam("beta") * action_set_size_diff
+            self._hyperparams.beta * action_set_size_diff
 
 
 class FuzzyXCSFLinearPredictionCreditAssignment:
-    def __init__(self, rule_repr):
+    def __init__(self, rule_repr, hyperparams=None):
         self._rule_repr = rule_repr
+        self._hyperparams = resolve_hyperparams(hyperparams)
 
     def __call__(self, action_set, payoff, situation):
         matching_degrees = [
@@ -109,31 +111,31 @@ class FuzzyXCSFLinearPredictionCreditAssignment:
 
     def _prepend_threshold_to_situation(self, situation):
         # return 1x(d+1) row vector
-        res = np.insert(situation, 0, get_hyperparam("x_nought"))
+        res = np.insert(situation, 0, self._hyperparams.x_nought)
         res = np.reshape(res, (1, len(res)))
         return res
 
     def _try_reset_classifier_cov_mat(self, classifier):
-        cov_mat_resets_allowed = get_hyperparam("do_classifier_cov_mat_resets")
+        cov_mat_resets_allowed = self._hyperparams.do_classifier_cov_mat_resets
         if cov_mat_resets_allowed:
             should_reset_cov_mat = \
                 (classifier.experience - classifier.cov_mat_reset_stamp) \
-                    >= get_hyperparam("tau_rls")
+                    >= self._hyperparams.tau_rls
             if should_reset_cov_mat:
                 logging.debug("Resetting clfr cov mat")
                 classifier.reset_cov_mat()
 
     def _update_prediction_error(self, classifier, payoff_diff, credit_weight):
         error_diff = abs(payoff_diff) - classifier.error
-        if classifier.experience < (1 / get_hyperparam("beta")):
+        if classifier.experience < (1 / self._hyperparams.beta):
             classifier.error += \
                 (credit_weight * (1 / classifier.experience) * error_diff)
         else:
             classifier.error += \
-                (credit_weight * get_hyperparam("beta") * error_diff)
+                (credit_weight * self._hyperparams.beta * error_diff)
 
     def _update_action_set_size(self, classifier, action_set):
         action_set_size_diff = action_set.num_micros \
             - classifier.action_set_size
         classifier.action_set_size += \
-            get_hyperparam("beta") * action_set_size_diff
+            self._hyperparams.beta * action_set_size_diff
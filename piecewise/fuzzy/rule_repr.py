@@ -9,8 +9,8 @@ from piecewise.dtype import (Condition, DataSpaceBuilder, Dimension, Genotype,
                             Population, Rule)
 from piecewise.dtype.config import float_bounds_tol
 from piecewise.error.core_errors import InternalError
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.lcs.rng import get_rng
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.lcs.rng import resolve_rng
 from piecewise.rule_repr import DiscereteMinSpanRuleRepr, IRuleRepr
 from piecewise.util import truncate_val
 from piecewise.constants import TIME_STEP_MIN
@@ -21,8 +21,10 @@ MAX_MATCHING_DEGREE = 1.0
 
 
 class FuzzyRuleReprABC(IRuleRepr, metaclass=abc.ABCMeta):
-    def __init__(self, ling_vars):
+    def __init__(self, ling_vars, hyperparams=None, rng=None):
         self._ling_vars = tuple(ling_vars)
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
 
     def does_match(self, condition, situation):
         """Matching needs to compute the truth degree of the condition given
@@ -82,13 +84,19 @@ class FuzzyRuleReprABC(IRuleRepr, metaclass=abc.ABCMeta):
 class FuzzyMinSpanRuleRepr(FuzzyRuleReprABC):
     """Pretty much the main diff between this and MSR is that there is no
     situation space, only ling vars with their corresponding fuzzy sets."""
-    def __init__(self, ling_vars, logical_or_strat, logical_and_strat):
-        super().__init__(ling_vars)
+    def __init__(self,
+                 ling_vars,
+                 logical_or_strat,
+                 logical_and_strat,
+                 hyperparams=None,
+                 rng=None):
+        super().__init__(ling_vars, hyperparams, rng)
         self._logical_or_strat = logical_or_strat
         self._logical_and_strat = logical_and_strat
         situation_space = \
             self._build_wrapped_situation_space_from_ling_vars(ling_vars)
-        self._wrapped_msr = DiscereteMinSpanRuleRepr(situation_space)
+        self._wrapped_msr = DiscereteMinSpanRuleRepr(situation_space,
+                                                     hyperparams, rng)
 
     def _build_wrapped_situation_space_from_ling_vars(self, ling_vars):
         situation_space_builder = DataSpaceBuilder()
@@ -100,7 +108,7 @@ class FuzzyMinSpanRuleRepr(FuzzyRuleReprABC):
 
     def _eval_condition(self, condition, situation):
         assert len(situation) == len(self._ling_vars)
-        phenotype = self.map_genotype_to_phenotype(condition.genotype)
+        phenotype = condition.phenotype(self)
         ling_var_ress = []
         for (situation_elem, phenotype_interval, ling_var) in \
                 zip(situation, phenotype, self._ling_vars):
@@ -166,8 +174,12 @@ class FuzzyMinSpanRuleRepr(FuzzyRuleReprABC):
 
 
 class FuzzyConjunctiveRuleRepr(FuzzyRuleReprABC):
-    def __init__(self, ling_vars, logical_and_strat):
-        super().__init__(ling_vars)
+    def __init__(self,
+                 ling_vars,
+                 logical_and_strat,
+                 hyperparams=None,
+                 rng=None):
+        super().__init__(ling_vars, hyperparams, rng)
         self._logical_and_strat = logical_and_strat
 
     def _eval_condition(self, condition, situation):
@@ -204,14 +216,14 @@ class FuzzyConjunctiveRuleRepr(FuzzyRuleReprABC):
     def mutate_condition(self, condition, situation=None):
         genotype = condition.genotype
         for allele_idx in range(0, len(genotype)):
-            should_mutate = get_rng().rand() < get_hyperparam("mu")
+            should_mutate = self._rng.rand() < self._hyperparams.mu
             if should_mutate:
                 # mutation draws from +-[0, m_nought]
-                m_nought = get_hyperparam("m_nought")
+                m_nought = self._hyperparams.m_nought
                 assert m_nought > 0
                 mut_choices = range(0, m_nought + 1)
-                mutation_magnitude = get_rng().choice(mut_choices)
-                mutation_sign = get_rng().choice([1, -1])
+                mutation_magnitude = self._rng.choice(mut_choices)
+                mutation_sign = self._rng.choice([1, -1])
                 mutation_amount = mutation_magnitude * mutation_sign
                 genotype[allele_idx] += mutation_amount
         self._enforce_genotype_maps_to_valid_phenotype(genotype)
@@ -273,14 +285,19 @@ class FuzzyConjunctiveRuleRepr(FuzzyRuleReprABC):
 
 
 class FuzzyCNFRuleRepr(FuzzyRuleReprABC):
-    def __init__(self, ling_vars, logical_or_strat, logical_and_strat):
-        super().__init__(ling_vars)
+    def __init__(self,
+                 ling_vars,
+                 logical_or_strat,
+                 logical_and_strat,
+                 hyperparams=None,
+                 rng=None):
+        super().__init__(ling_vars, hyperparams, rng)
         self._logical_or_strat = logical_or_strat
         self._logical_and_strat = logical_and_strat
 
     def _eval_condition(self, condition, situation):
         assert len(situation) == len(self._ling_vars)
-        phenotype = self.map_genotype_to_phenotype(condition.genotype)
+        phenotype = condition.phenotype(self)
         ling_var_ress = []
         for (situation_elem, phenotype_elem, ling_var) in \
                 zip(situation, phenotype, self._ling_vars):
@@ -346,7 +363,7 @@ class FuzzyCNFRuleRepr(FuzzyRuleReprABC):
                     if genotype_before[idx] == 1
                 ]
                 assert len(one_allele_idxs_before) >= 1
-                idx_for_one = get_rng().choice(one_allele_idxs_before)
+                idx_for_one = self._rng.choice(one_allele_idxs_before)
                 genotype_after[idx_for_one] = 1
 
     def _get_ling_var_genotype_ranges(self):
@@ -369,14 +386,14 @@ class FuzzyCNFRuleRepr(FuzzyRuleReprABC):
             assert has_ones, f"{ling_var_alleles}"
 
     def mutate_condition(self, condition, situation=None):
-        should_do_mutation = get_rng().rand() < get_hyperparam("mu")
+        should_do_mutation = self._rng.rand() < self._hyperparams.mu
         if should_do_mutation:
             self._mutate_condition(condition)
             self._assert_genotype_is_valid(condition.genotype)
 
     def _mutate_condition(self, condition):
         ling_var_genotype_ranges = self._get_ling_var_genotype_ranges()
-        ling_var_idx_to_mut = get_rng().choice(range(len(self._ling_vars)))
+        ling_var_idx_to_mut = self._rng.choice(range(len(self._ling_vars)))
         ling_var_genotype_range = ling_var_genotype_ranges[ling_var_idx_to_mut]
 
         mut_strat = self._choose_mut_strat_for_ling_var(
@@ -410,7 +427,7 @@ class FuzzyCNFRuleRepr(FuzzyRuleReprABC):
         if could_contract:
             possible_strats.append("contract")
 
-        mut_strat = get_rng().choice(possible_strats)
+        mut_strat = self._rng.choice(possible_strats)
         return mut_strat
 
     def _get_ling_var_alleles(self, genotype, ling_var_genotype_range):
@@ -427,7 +444,7 @@ class FuzzyCNFRuleRepr(FuzzyRuleReprABC):
             if genotype[idx] == 0
         ]
         assert len(zero_allele_idxs) >= 1
-        idx_to_flip = get_rng().choice(zero_allele_idxs)
+        idx_to_flip = self._rng.choice(zero_allele_idxs)
         genotype[idx_to_flip] = 1
 
     def _mut_contract(self, genotype, ling_var_genotype_range):
@@ -440,7 +457,7 @@ class FuzzyCNFRuleRepr(FuzzyRuleReprABC):
             if genotype[idx] == 1
         ]
         assert len(one_allele_idxs) >= 2
-        idx_to_flip = get_rng().choice(one_allele_idxs)
+        idx_to_flip = self._rng.choice(one_allele_idxs)
         genotype[idx_to_flip] = 0
 
     def _mut_shift(self, genotype, ling_var_genotype_range):
@@ -455,7 +472,7 @@ class FuzzyCNFRuleRepr(FuzzyRuleReprABC):
             if genotype[idx] == 1
         ]
         assert len(one_allele_idxs) >= 1
-        idx_to_flip = get_rng().choice(one_allele_idxs)
+        idx_to_flip = self._rng.choice(one_allele_idxs)
         genotype[idx_to_flip] = 0
 
         # get info about adjacent alleles of the ling var
@@ -476,7 +493,7 @@ class FuzzyCNFRuleRepr(FuzzyRuleReprABC):
             # nominal case, allele flipped to zero originally not at
             # boundaries, pick either prev or next allele at random to set to
             # one
-            idx_for_one = get_rng().choice([prev_idx, next_idx])
+            idx_for_one = self._rng.choice([prev_idx, next_idx])
         genotype[idx_for_one] = 1
 
     def calc_generality(self, condition):
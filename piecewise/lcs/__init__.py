@@ -3,3 +3,7 @@ from .xcs import (make_canonical_xcs, make_custom_xcs,
                   make_canonical_xcsf,
                   make_custom_xcsf_from_canonical_base)
 from .lcs import setup_meta_params
+from .hyperparams import Hyperparams
+from .rng import BufferedRNG
+from .inference_policy import InferencePolicy, export_inference_policy
+from piecewise.validation import ValidationLevels, set_validation_level
@@ -3,11 +3,17 @@ from .action_selection import (ExpDecayEpsilonGreedy, FixedEpsilonGreedy,
 from .covering import (RuleReprCovering, make_classifier,
                        make_linear_prediction_classifier,
                        NullCovering)
-from .credit_assignment import (XCSCreditAssignment,
+from .credit_assignment import (VectorisedXCSCreditAssignment,
+                                XCSCreditAssignment,
                                 XCSFLinearPredictionCreditAssignment)
-from .deletion import XCSRouletteWheelDeletion, NullDeletion
-from .fitness_update import XCSAccuracyFitnessUpdate, NullFitnessUpdate
-from .matching import RuleReprMatching
+from .deletion import (XCSBatchRouletteWheelDeletion,
+                       XCSRouletteWheelDeletion,
+                       XCSSumTreeRouletteWheelDeletion, NullDeletion)
+from .fitness_update import (VectorisedXCSAccuracyFitnessUpdate,
+                             XCSAccuracyFitnessUpdate, NullFitnessUpdate)
+from .matching import (CachedMatching, IntervalGridIndexedMatching,
+                       RuleReprMatching, VectorisedRuleReprMatching,
+                       make_rule_repr_matching)
 from .prediction import FitnessWeightedAvgPrediction
 from .rule_discovery.rule_discovery import NullRuleDiscovery
 from .rule_discovery.ga.xcs_genetic_algorithm import (make_canonical_xcs_ga,
@@ -1,81 +1,89 @@
 import logging
 from collections import namedtuple
 
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.lcs.rng import get_rng
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.lcs.rng import resolve_rng
 
 ActionSelectResponse = namedtuple("ActionSelectResponse",
                                   ["action", "did_explore"])
 
 
 class FixedEpsilonGreedy:
+    def __init__(self, hyperparams=None, rng=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
+
     def __call__(self, prediction_array, time_step=None):
         """SELECT ACTION function from 'An Algorithmic
         Description of XCS' (Butz and Wilson, 2002)."""
-        epsilon = get_hyperparam("p_explore")
-        return _epsilon_greedy(prediction_array, epsilon)
+        epsilon = self._hyperparams.p_explore
+        return _epsilon_greedy(prediction_array, epsilon, self._rng)
 
 
 class LinearDecayEpsilonGreedy:
-    def __init__(self):
+    def __init__(self, hyperparams=None, rng=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
         self._epsilon_max = 1.0
         self._epsilon = self._epsilon_max
 
     def __call__(self, prediction_array, time_step):
         self._decay_epsilon(time_step)
-        return _epsilon_greedy(prediction_array, self._epsilon)
+        return _epsilon_greedy(prediction_array, self._epsilon, self._rng)
 
     def _decay_epsilon(self, time_step):
         decayed_val = self._epsilon_max - \
-            get_hyperparam("e_greedy_decay_factor")*time_step
+            self._hyperparams.e_greedy_decay_factor*time_step
         self._epsilon = max(decayed_val,
-                            get_hyperparam("e_greedy_min_epsilon"))
+                            self._hyperparams.e_greedy_min_epsilon)
 
 
 class ExpDecayEpsilonGreedy:
-    def __init__(self):
+    def __init__(self, hyperparams=None, rng=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
         self._epsilon_max = 1.0
         self._epsilon = self._epsilon_max
 
     def __call__(self, prediction_array, time_step):
         self._decay_epsilon(time_step)
-        return _epsilon_greedy(prediction_array, self._epsilon)
+        return _epsilon_greedy(prediction_array, self._epsilon, self._rng)
 
     def _decay_epsilon(self, time_step):
-        self._epsilon *= get_hyperparam("e_greedy_decay_factor")
+        self._epsilon *= self._hyperparams.e_greedy_decay_factor
         assert self._epsilon >= 0.0
 
 
-def _epsilon_greedy(prediction_array, epsilon):
+def _epsilon_greedy(prediction_array, epsilon, rng):
     logging.debug(f"Epsilon = {epsilon}")
     assert 0.0 <= epsilon <= 1.0
-    should_explore = get_rng().rand() <= epsilon
+    should_explore = rng.rand() <= epsilon
     if should_explore:
         action = \
-            _select_random_action_with_valid_prediction(prediction_array)
+            _select_random_action_with_valid_prediction(prediction_array, rng)
     else:
-        action = select_greedy_action(prediction_array)
+        action = select_greedy_action(prediction_array, rng)
     return ActionSelectResponse(action=action, did_explore=should_explore)
 
 
-def _select_random_action_with_valid_prediction(prediction_array):
+def _select_random_action_with_valid_prediction(prediction_array, rng):
     if len(prediction_array) != 0:
         possible_actions = prediction_array.keys()
-        return get_rng().choice(list(possible_actions))
+        return rng.choice(list(possible_actions))
     else:
         return _fallback_to_random_selection_from_action_set(
-            prediction_array.env_action_set)
+            prediction_array.env_action_set, rng)
 
 
-def select_greedy_action(prediction_array):
+def select_greedy_action(prediction_array, rng=None):
     if len(prediction_array) != 0:
         return max(prediction_array, key=prediction_array.get)
     else:
         return _fallback_to_random_selection_from_action_set(
-            prediction_array.env_action_set)
+            prediction_array.env_action_set, resolve_rng(rng))
 
 
-def _fallback_to_random_selection_from_action_set(env_action_set):
+def _fallback_to_random_selection_from_action_set(env_action_set, rng):
     logging.warning("Falling back to random action selection due to empty "
                     "prediction array.")
-    return get_rng().choice(list(env_action_set))
+    return rng.choice(list(env_action_set))
@@ -1,24 +1,28 @@
 import abc
 
 from piecewise.dtype import Classifier, LinearPredictionClassifier, Rule
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.lcs.rng import get_rng
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.lcs.rng import resolve_rng
 from piecewise.util.classifier_set_stats import (get_unique_actions_set,
                                                  num_unique_actions)
 
 
 # Factories for specific classifier types
-def make_classifier(rule, time_step):
-    return Classifier(rule, get_hyperparam("prediction_I"),
-                      get_hyperparam("epsilon_I"), get_hyperparam("fitness_I"),
-                      time_step)
+def make_classifier(rule, time_step, hyperparams=None):
+    hyperparams = resolve_hyperparams(hyperparams)
+    return Classifier(rule, hyperparams.prediction_I, hyperparams.epsilon_I,
+                      hyperparams.fitness_I, time_step)
 
 
-def make_linear_prediction_classifier(rule, time_step):
-    return LinearPredictionClassifier(rule, get_hyperparam("epsilon_I"),
-                                      get_hyperparam("fitness_I"), time_step,
-                                      get_hyperparam("x_nought"), 
-                                      get_hyperparam("delta_rls"), get_rng())
+def make_linear_prediction_classifier(rule,
+                                      time_step,
+                                      hyperparams=None,
+                                      rng=None):
+    hyperparams = resolve_hyperparams(hyperparams)
+    return LinearPredictionClassifier(rule, hyperparams.epsilon_I,
+                                      hyperparams.fitness_I, time_step,
+                                      hyperparams.x_nought,
+                                      hyperparams.delta_rls, resolve_rng(rng))
 
 
 class ICoveringStrategy(metaclass=abc.ABCMeta):
@@ -28,10 +32,17 @@ class ICoveringStrategy(metaclass=abc.ABCMeta):
 
 
 class RuleReprCoveringABC(ICoveringStrategy, metaclass=abc.ABCMeta):
-    def __init__(self, env_action_set, rule_repr, classifier_factory):
+    def __init__(self,
+                 env_action_set,
+                 rule_repr,
+                 classifier_factory,
+                 hyperparams=None,
+                 rng=None):
         self._env_action_set = env_action_set
         self._rule_repr = rule_repr
         self._classifier_factory = classifier_factory
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
 
     @abc.abstractmethod
     def __call__(self, population, match_set, situation, time_step):
@@ -53,7 +64,7 @@ class RuleReprCovering(RuleReprCoveringABC):
             match_set.add(covering_classifier)
 
     def _should_cover(self, match_set):
-        return num_unique_actions(match_set) < get_hyperparam("theta_mna")
+        return num_unique_actions(match_set) < self._hyperparams.theta_mna
 
     def _gen_covering_classifier(self, match_set, situation, time_step):
         """Remaining part of GENERATE COVERING CLASSIFIER function from
@@ -73,7 +84,7 @@ class RuleReprCovering(RuleReprCoveringABC):
         possible_covering_actions = \
             tuple(self._env_action_set - get_unique_actions_set(match_set))
         assert len(possible_covering_actions) > 0
-        return get_rng().choice(possible_covering_actions)
+        return self._rng.choice(possible_covering_actions)
 
 
 class NullCovering(ICoveringStrategy):
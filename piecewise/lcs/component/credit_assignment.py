@@ -1,22 +1,26 @@
 import numpy as np
 
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.util.classifier_set_stats import calc_summary_stat
+from piecewise.dtype import gather_params, scatter_params
+from piecewise.lcs.hyperparams import resolve_hyperparams
 
 
-def update_action_set_size(classifier, action_set):
+def update_action_set_size(classifier, action_set, hyperparams=None):
+    hyperparams = resolve_hyperparams(hyperparams)
     action_set_size_diff = action_set.num_micros \
             - classifier.action_set_size
 
-    if classifier.experience < (1 / get_hyperparam("beta")):
+    if classifier.experience < (1 / hyperparams.beta):
         classifier.action_set_size += action_set_size_diff / \
             classifier.experience
     else:
         classifier.action_set_size += \
-            get_hyperparam("beta") * action_set_size_diff
+            hyperparams.beta * action_set_size_diff
 
 
 class XCSCreditAssignment:
+    def __init__(self, hyperparams=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+
     def __call__(self, action_set, payoff, situation=None):
         """UPDATE SET function from 'An Algorithmic Description of XCS'
         (Butz and Wilson, 2002)."""
@@ -25,35 +29,86 @@ class XCSCreditAssignment:
             payoff_diff = payoff - classifier.get_prediction()
             self._update_prediction(classifier, payoff_diff)
             self._update_prediction_error(classifier, payoff_diff)
-            update_action_set_size(classifier, action_set)
+            update_action_set_size(classifier, action_set,
+                                   self._hyperparams)
 
     def _update_prediction(self, classifier, payoff_diff):
-        if classifier.experience < (1 / get_hyperparam("beta")):
+        if classifier.experience < (1 / self._hyperparams.beta):
             updated_prediction = classifier.get_prediction() +  \
                 payoff_diff/classifier.experience
         else:
             updated_prediction = classifier.get_prediction() + \
-                get_hyperparam("beta") * payoff_diff
+                self._hyperparams.beta * payoff_diff
         classifier.set_prediction(updated_prediction)
 
     def _update_prediction_error(self, classifier, payoff_diff):
         error_diff = abs(payoff_diff) - classifier.error
-        if classifier.experience < (1 / get_hyperparam("beta")):
+        if classifier.experience < (1 / self._hyperparams.beta):
             classifier.error += error_diff / classifier.experience
         else:
-            classifier.error += get_hyperparam("beta") * error_diff
+            classifier.error += self._hyperparams.beta * error_diff
+
+
+def _calc_mam_updated(values, targets, experience, beta):
+    """Vectorised moyenne adaptive modifiee (MAM) update of the given values
+    towards the given targets, as done per classifier by XCSCreditAssignment
+    and update_action_set_size."""
+    diffs = targets - values
+    return values + np.where(experience < (1 / beta), diffs / experience,
+                             beta * diffs)
+
+
+class VectorisedXCSCreditAssignment:
+    """Vectorised equivalent of XCSCreditAssignment.
+
+    Gathers the params of the whole action set into arrays, applies the
+    prediction, prediction error and action set size updates to all
+    classifiers at once, then writes the params back. Since each classifier's
+    update is independent of the others, this gives exactly the same results
+    as XCSCreditAssignment.
+
+    Works with any population, but is fastest with a ColumnarPopulation,
+    where gathering and writing back params is done by indexing its
+    columns."""
+    _PARAM_NAMES = ("prediction", "error", "experience", "action_set_size")
+
+    def __init__(self, hyperparams=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+
+    def __call__(self, action_set, payoff, situation=None):
+        params = gather_params(action_set, self._PARAM_NAMES)
+        beta = self._hyperparams.beta
+        experience = params["experience"] + 1
+        payoff_diffs = payoff - params["prediction"]
+        updated_params = {
+            "experience":
+            experience,
+            "prediction":
+            _calc_mam_updated(params["prediction"], payoff, experience, beta),
+            "error":
+            _calc_mam_updated(params["error"], np.abs(payoff_diffs),
+                              experience, beta),
+            "action_set_size":
+            _calc_mam_updated(params["action_set_size"],
+                              action_set.num_micros, experience, beta)
+        }
+        scatter_params(action_set, updated_params)
 
 
 class XCSFLinearPredictionCreditAssignment:
+    def __init__(self, hyperparams=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+
     def __call__(self, action_set, payoff, situation):
-        niche_min_error = calc_summary_stat(action_set, "min", "error")
+        niche_min_error = action_set.min_error
         for classifier in action_set:
             classifier.experience += 1
             payoff_diff = payoff - classifier.get_prediction(situation)
             self._update_weight_vec(classifier, payoff_diff, situation)
             self._update_niche_min_error(classifier, niche_min_error)
             self._update_prediction_error(classifier, payoff_diff)
-            update_action_set_size(classifier, action_set)
+            update_action_set_size(classifier, action_set,
+                                   self._hyperparams)
 
     def _update_weight_vec(self, classifier, payoff_diff, situation):
         weight_deltas = self._calc_weight_deltas(payoff_diff, situation)
@@ -66,13 +121,13 @@ class XCSFLinearPredictionCreditAssignment:
         normalisation_term = sum([elem**2 for elem in augmented_situation])
         weight_deltas = []
         for elem in augmented_situation:
-            delta = (get_hyperparam("eta") / normalisation_term) \
+            delta = (self._hyperparams.eta / normalisation_term) \
                 * payoff_diff * elem
             weight_deltas.append(delta)
         return weight_deltas
 
     def _prepend_threshold_to_situation(self, situation):
-        return np.insert(situation, 0, get_hyperparam("x_nought"))
+        return np.insert(situation, 0, self._hyperparams.x_nought)
 
     def _apply_weight_deltas(self, classifier, weight_deltas):
         for idx, delta in enumerate(weight_deltas):
@@ -81,12 +136,12 @@ class XCSFLinearPredictionCreditAssignment:
     def _update_niche_min_error(self, classifier, niche_min_error):
         # Use MAM for mu param
         niche_min_error_diff = niche_min_error - classifier.niche_min_error
-        if classifier.experience < (1 / get_hyperparam("beta_e")):
+        if classifier.experience < (1 / self._hyperparams.beta_e):
             classifier.niche_min_error += \
                 niche_min_error_diff / classifier.experience
         else:
             classifier.niche_min_error += \
-                get_hyperparam("beta_e") * niche_min_error_diff
+                self._hyperparams.beta_e * niche_min_error_diff
 
     def _update_prediction_error(self, classifier, payoff_diff):
 #        first_term = abs(payoff_diff) - classifier.niche_min_error
@@ -96,7 +151,7 @@ class XCSFLinearPredictionCreditAssignment:
         error_diff = abs(payoff_diff) - classifier.error
 
         # Use MAM for error
-        if classifier.experience < (1 / get_hyperparam("beta")):
+        if classifier.experience < (1 / self._hyperparams.beta):
             classifier.error += error_diff / classifier.experience
         else:
-            classifier.error += get_hyperparam("beta") * error_diff
+            classifier.error += self._hyperparams.beta * error_diff
@@ -1,9 +1,14 @@
 import abc
 import logging
-from piecewise.lcs.rng import get_rng
 
+import numpy as np
+
+from piecewise.dtype import ColumnarPopulation, gather_params
+from piecewise.lcs.rng import resolve_rng
 from piecewise.util.classifier_set_stats import calc_summary_stat
-from piecewise.lcs.hyperparams import get_hyperparam
+from piecewise.util.sum_tree import SumTree
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.validation import checks_consistency
 
 
 class IDeletionStrategy(metaclass=abc.ABCMeta):
@@ -13,18 +18,25 @@ class IDeletionStrategy(metaclass=abc.ABCMeta):
 
 
 class XCSRouletteWheelDeletion(IDeletionStrategy):
+    def __init__(self, hyperparams=None, rng=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
+        self._checks_consistency = checks_consistency()
+
     def __call__(self, population):
         """DELETE FROM POPULATION function from 'An Algorithmic Description of
         XCS' (Butz and Wilson, 2002)."""
         deletion_is_required = population.num_micros > population.max_micros
         if deletion_is_required:
             self._perform_deletions(population)
-        assert population.num_micros <= population.max_micros
+        if self._checks_consistency:
+            assert population.num_micros <= population.max_micros
 
     def _perform_deletions(self, population):
         num_deletions = population.num_micros - population.max_micros
         logging.debug(f"Performing {num_deletions} deletions.")
-        assert num_deletions >= 1
+        if self._checks_consistency:
+            assert num_deletions >= 1
         for _ in range(num_deletions):
             classifier_to_delete = self._select_for_deletion(population)
             population.delete(classifier_to_delete)
@@ -41,7 +53,7 @@ class XCSRouletteWheelDeletion(IDeletionStrategy):
             for classifier in population
         ]
         vote_sum = sum(votes)
-        choice_point = get_rng().rand() * vote_sum
+        choice_point = self._rng.rand() * vote_sum
 
         vote_sum = 0
         for (classifier, vote) in zip(population, votes):
@@ -56,15 +68,236 @@ class XCSRouletteWheelDeletion(IDeletionStrategy):
         fitness_numerosity_ratio = classifier.fitness / classifier.numerosity
 
         has_sufficient_experience = classifier.experience > \
-            get_hyperparam("theta_del")
+            self._hyperparams.theta_del
         has_low_fitness = fitness_numerosity_ratio < \
-            (get_hyperparam("delta") * mean_fitness_in_pop)
+            (self._hyperparams.delta * mean_fitness_in_pop)
         if has_sufficient_experience and has_low_fitness:
             vote *= mean_fitness_in_pop / fitness_numerosity_ratio
 
         return vote
 
 
+class XCSSumTreeRouletteWheelDeletion(XCSRouletteWheelDeletion):
+    """Roulette wheel deletion where the deletion votes are kept in a sum tree
+    (see SumTree) over the rows of a ColumnarPopulation, so that selecting a
+    classifier for deletion takes logarithmic rather than linear time.
+
+    The rows whose vote params (action set size, numerosity, fitness,
+    experience) have changed since the last selection are watched for (see
+    ClassifierColumns.watch_changed_rows()), and only their votes are
+    recalculated and updated in the tree. The fitness sum of the population
+    is likewise kept up to date incrementally over the changed rows.
+
+    Votes depend on the mean fitness of the population, which changes a
+    little at every step, and a change in it changes the votes of all rows.
+    By default (a tolerance of zero) the tree is therefore rebuilt whenever
+    the mean fitness has changed since it was last built, giving exactly the
+    same selection probabilities as XCSRouletteWheelDeletion. Given a
+    positive relative tolerance, votes are instead calculated using the mean
+    fitness as of the last rebuild, and the tree is only rebuilt when the
+    current mean fitness has drifted from that by more than the tolerance,
+    so that most selections take logarithmic time at the cost of slightly
+    different selection probabilities.
+
+    Falls back to XCSRouletteWheelDeletion for other types of population.
+    """
+    _VOTE_ATTR_NAMES = ("_action_set_size", "_numerosity", "_fitness",
+                        "_experience")
+
+    def __init__(self, mean_fitness_drift_tol=0, hyperparams=None, rng=None):
+        super().__init__(hyperparams, rng)
+        assert mean_fitness_drift_tol >= 0
+        self._mean_fitness_drift_tol = mean_fitness_drift_tol
+        self._init_tree_state()
+
+    def _init_tree_state(self):
+        self._columns = None
+        self._changed_rows = None
+        self._sum_tree = None
+        self._ref_mean_fitness = None
+        # fitness * numerosity of each row (0 for unused rows) and their sum
+        self._fitness_numerosities = None
+        self._fitness_sum = None
+
+    def __getstate__(self):
+        # watches on the columns do not survive copying, so the tree is
+        # rebuilt on demand instead
+        state = self.__dict__.copy()
+        for attr_name in ("_columns", "_changed_rows", "_sum_tree",
+                          "_ref_mean_fitness", "_fitness_numerosities",
+                          "_fitness_sum"):
+            state[attr_name] = None
+        return state
+
+    def _select_for_deletion(self, population):
+        if not isinstance(population, ColumnarPopulation):
+            return super()._select_for_deletion(population)
+        columns = population.columns
+        if columns is not self._columns or \
+                columns.capacity != self._sum_tree.size:
+            self._rebuild(columns, population)
+        else:
+            changed_rows = self._pop_changed_rows()
+            self._update_fitness_sum(columns, changed_rows)
+            mean_fitness_in_pop = self._fitness_sum / population.num_micros
+            if self._has_mean_fitness_drifted(mean_fitness_in_pop):
+                self._rebuild(columns, population)
+            else:
+                self._update_votes(columns, changed_rows)
+        choice_point = self._rng.rand() * self._sum_tree.total
+        row = self._sum_tree.find(choice_point)
+        return columns.classifier_at(row)
+
+    def _rebuild(self, columns, population):
+        if columns is not self._columns:
+            if self._columns is not None:
+                self._columns.unwatch_changed_rows(self._changed_rows)
+            self._changed_rows = \
+                columns.watch_changed_rows(self._VOTE_ATTR_NAMES)
+            self._columns = columns
+        self._changed_rows.clear()
+        is_row_used = columns.is_row_used
+        self._fitness_numerosities = np.where(
+            is_row_used, columns.fitness * columns.numerosity, 0.0)
+        self._fitness_sum = np.sum(self._fitness_numerosities)
+        self._ref_mean_fitness = self._fitness_sum / population.num_micros
+        votes = np.zeros(shape=columns.capacity, dtype=np.float64)
+        used_rows = np.flatnonzero(is_row_used)
+        votes[used_rows] = self._calc_deletion_votes(columns, used_rows)
+        self._sum_tree = SumTree(votes)
+
+    def _pop_changed_rows(self):
+        changed_rows = np.array(sorted(self._changed_rows), dtype=np.intp)
+        self._changed_rows.clear()
+        return changed_rows
+
+    def _update_fitness_sum(self, columns, changed_rows):
+        if len(changed_rows) == 0:
+            return
+        fitness_numerosities = np.where(
+            columns.is_row_used[changed_rows],
+            columns.fitness[changed_rows] * columns.numerosity[changed_rows],
+            0.0)
+        self._fitness_sum += np.sum(
+            fitness_numerosities - self._fitness_numerosities[changed_rows])
+        self._fitness_numerosities[changed_rows] = fitness_numerosities
+
+    def _has_mean_fitness_drifted(self, mean_fitness_in_pop):
+        mean_fitness_drift = abs(mean_fitness_in_pop - self._ref_mean_fitness)
+        if self._mean_fitness_drift_tol == 0:
+            return mean_fitness_drift != 0
+        return mean_fitness_drift > \
+            (self._mean_fitness_drift_tol * self._ref_mean_fitness)
+
+    def _update_votes(self, columns, changed_rows):
+        if len(changed_rows) == 0:
+            return
+        is_row_used = columns.is_row_used[changed_rows]
+        votes = np.zeros(shape=len(changed_rows), dtype=np.float64)
+        votes[is_row_used] = self._calc_deletion_votes(
+            columns, changed_rows[is_row_used])
+        for (row, vote) in zip(changed_rows.tolist(), votes.tolist()):
+            self._sum_tree.update(row, vote)
+
+    def _calc_deletion_votes(self, columns, rows):
+        return _calc_deletion_votes(columns.action_set_size[rows],
+                                    columns.numerosity[rows],
+                                    columns.fitness[rows],
+                                    columns.experience[rows],
+                                    self._ref_mean_fitness,
+                                    self._hyperparams)
+
+
+class XCSBatchRouletteWheelDeletion(XCSRouletteWheelDeletion):
+    """Roulette wheel deletion that lets the population overflow its max
+    micros by the given slack (in micros), and only once that is exceeded
+    deletes back down to max micros in one go.
+
+    All victims are chosen in a single vectorised weighted draw without
+    replacement over the microclassifiers of the population (using the
+    Efraimidis-Spirakis method): each microclassifier gets an equal share of
+    the deletion vote of its macroclassifier, with votes calculated once for
+    the whole batch. This amortises the cost of deletion over many steps,
+    at the cost of votes not being recalculated between deletions in the
+    same batch.
+    """
+    _VOTE_PARAM_NAMES = ("action_set_size", "numerosity", "fitness",
+                         "experience")
+
+    def __init__(self, slack, hyperparams=None, rng=None):
+        super().__init__(hyperparams, rng)
+        slack = int(slack)
+        assert slack >= 0
+        self._slack = slack
+
+    @property
+    def slack(self):
+        return self._slack
+
+    def __call__(self, population):
+        deletion_is_required = population.num_micros > \
+            (population.max_micros + self._slack)
+        if deletion_is_required:
+            self._perform_batch_deletion(population)
+        if self._checks_consistency:
+            assert population.num_micros <= \
+                (population.max_micros + self._slack)
+
+    def _perform_batch_deletion(self, population):
+        num_deletions = population.num_micros - population.max_micros
+        logging.debug(f"Performing batch of {num_deletions} deletions.")
+        classifiers = list(population)
+        params = gather_params(classifiers, self._VOTE_PARAM_NAMES)
+        numerosities = params["numerosity"]
+        mean_fitness_in_pop = np.sum(params["fitness"] * numerosities) / \
+            population.num_micros
+        votes = _calc_deletion_votes(params["action_set_size"],
+                                     numerosities, params["fitness"],
+                                     params["experience"],
+                                     mean_fitness_in_pop, self._hyperparams)
+        victim_counts = self._draw_victim_counts(votes, numerosities,
+                                                 num_deletions)
+        for (classifier, victim_count) in zip(classifiers,
+                                              victim_counts.tolist()):
+            for _ in range(victim_count):
+                population.delete(classifier)
+
+    def _draw_victim_counts(self, votes, numerosities, num_deletions):
+        """Draws num_deletions microclassifiers without replacement, where
+        each micro's weight is its macro's vote divided by its numerosity,
+        and returns the number of micros drawn from each macro."""
+        numerosities = numerosities.astype(np.int64)
+        macro_idxs = np.repeat(np.arange(len(votes)), numerosities)
+        micro_weights = np.repeat(votes / numerosities, numerosities)
+        # Efraimidis-Spirakis: take the num_deletions largest keys
+        # u^(1/w), compared in log space
+        uniforms = self._rng.rand(len(micro_weights))
+        keys = np.log(uniforms) / micro_weights
+        victim_micro_idxs = np.argpartition(-keys,
+                                            num_deletions - 1)[:num_deletions]
+        return np.bincount(macro_idxs[victim_micro_idxs],
+                           minlength=len(votes))
+
+
+def _calc_deletion_votes(action_set_sizes, numerosities, fitnesses,
+                         experiences, mean_fitness_in_pop, hyperparams):
+    """Vectorised version of XCSRouletteWheelDeletion._calc_deletion_vote()
+    over arrays of classifier params."""
+    votes = action_set_sizes * numerosities
+    fitness_numerosity_ratios = fitnesses / numerosities
+    has_sufficient_experience = experiences > hyperparams.theta_del
+    has_low_fitness = fitness_numerosity_ratios < \
+        (hyperparams.delta * mean_fitness_in_pop)
+    should_scale = has_sufficient_experience & has_low_fitness
+    votes[should_scale] *= \
+        mean_fitness_in_pop / fitness_numerosity_ratios[should_scale]
+    return votes
+
+
 class NullDeletion(IDeletionStrategy):
+    def __init__(self):
+        self._checks_consistency = checks_consistency()
+
     def __call__(self, population):
-        assert population.num_micros <= population.max_micros
+        if self._checks_consistency:
+            assert population.num_micros <= population.max_micros
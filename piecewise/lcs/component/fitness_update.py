@@ -1,5 +1,9 @@
 import abc
-from piecewise.lcs.hyperparams import get_hyperparam
+
+import numpy as np
+
+from piecewise.dtype import gather_params, scatter_params
+from piecewise.lcs.hyperparams import resolve_hyperparams
 
 
 class IFitnessUpdateStrategy(metaclass=abc.ABCMeta):
@@ -11,6 +15,9 @@ class IFitnessUpdateStrategy(metaclass=abc.ABCMeta):
 class XCSAccuracyFitnessUpdate(IFitnessUpdateStrategy):
     _MAX_ACCURACY = 1.0
 
+    def __init__(self, hyperparams=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+
     def __call__(self, action_set):
         """UPDATE FITNESS function from 'An Algorithmic Description of XCS'
         (Butz and Wilson, 2002).
@@ -24,7 +31,7 @@ class XCSAccuracyFitnessUpdate(IFitnessUpdateStrategy):
         accuracy_vec = []
         for classifier in action_set:
             is_below_error_threshold = classifier.error < \
-                get_hyperparam("epsilon_nought")
+                self._hyperparams.epsilon_nought
             if is_below_error_threshold:
                 accuracy = self._MAX_ACCURACY
             else:
@@ -34,16 +41,47 @@ class XCSAccuracyFitnessUpdate(IFitnessUpdateStrategy):
         return accuracy_vec, accuracy_sum
 
     def _calc_accuracy(self, classifier):
-        return get_hyperparam("alpha") * \
-                (classifier.error / get_hyperparam("epsilon_nought"))\
-                ** (-1 * get_hyperparam("nu"))
+        return self._hyperparams.alpha * \
+                (classifier.error / self._hyperparams.epsilon_nought)\
+                ** (-1 * self._hyperparams.nu)
 
     def _update_fitness_values(self, action_set, accuracy_vec, accuracy_sum):
         for (classifier, accuracy) in zip(action_set, accuracy_vec):
             adjustment = \
                 ((accuracy*classifier.numerosity/accuracy_sum) -
                  classifier.fitness)
-            classifier.fitness += get_hyperparam("beta") * adjustment
+            classifier.fitness += self._hyperparams.beta * adjustment
+
+
+class VectorisedXCSAccuracyFitnessUpdate(IFitnessUpdateStrategy):
+    """Vectorised equivalent of XCSAccuracyFitnessUpdate: computes accuracies
+    and updates fitnesses of the whole action set at once (see
+    VectorisedXCSCreditAssignment).
+
+    The accuracy sum is accumulated sequentially (via cumsum) in the same
+    order as XCSAccuracyFitnessUpdate, so results are exactly the same."""
+    _MAX_ACCURACY = 1.0
+    _PARAM_NAMES = ("error", "fitness", "numerosity")
+
+    def __init__(self, hyperparams=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+
+    def __call__(self, action_set):
+        params = gather_params(action_set, self._PARAM_NAMES)
+        errors = params["error"]
+        numerosities = params["numerosity"]
+        epsilon_nought = self._hyperparams.epsilon_nought
+        accuracies = np.full_like(errors, self._MAX_ACCURACY)
+        is_above_error_threshold = errors >= epsilon_nought
+        accuracies[is_above_error_threshold] = self._hyperparams.alpha * \
+            (errors[is_above_error_threshold] / epsilon_nought) \
+            ** (-1 * self._hyperparams.nu)
+        weighted_accuracies = accuracies * numerosities
+        accuracy_sum = np.cumsum(weighted_accuracies)[-1]
+        fitnesses = params["fitness"]
+        adjustments = (weighted_accuracies / accuracy_sum) - fitnesses
+        updated_fitnesses = fitnesses + self._hyperparams.beta * adjustments
+        scatter_params(action_set, {"fitness": updated_fitnesses})
 
 
 class NullFitnessUpdate(IFitnessUpdateStrategy):
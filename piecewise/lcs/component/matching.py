@@ -1,4 +1,23 @@
-from piecewise.dtype import ClassifierSet
+import collections
+
+import numpy as np
+
+from piecewise.dtype import (ClassifierSet, ConditionMatrix,
+                             IntervalGridIndex)
+from piecewise.dtype.classifier_set.population_observer import \
+    IPopulationObserver
+from piecewise.rule_repr.interval.min_percentage_rule_repr import \
+    MinSpanRuleReprABC
+from piecewise.rule_repr.rule_repr import IVectorisedRuleRepr
+
+
+def make_rule_repr_matching(rule_repr):
+    """Makes the fastest matching strategy supported by the given rule
+    repr."""
+    if isinstance(rule_repr, IVectorisedRuleRepr):
+        return VectorisedRuleReprMatching(rule_repr)
+    else:
+        return RuleReprMatching(rule_repr)
 
 
 class RuleReprMatching:
@@ -20,3 +39,211 @@ class RuleReprMatching:
             if self._rule_repr.does_match(classifier.condition, situation):
                 match_set.add(classifier)
         return match_set
+
+    def match_batch(self, population, situations):
+        """Returns (classifiers in population order, 2-D boolean array with
+        one row per situation indicating which of those classifiers match
+        that situation)."""
+        classifiers = list(population)
+        match_masks = np.empty(shape=(len(situations), len(classifiers)),
+                               dtype=bool)
+        for (situation_idx, situation) in enumerate(situations):
+            for (classifier_idx, classifier) in enumerate(classifiers):
+                match_masks[situation_idx, classifier_idx] = \
+                    self._rule_repr.does_match(classifier.condition,
+                                               situation)
+        return (classifiers, match_masks)
+
+
+class VectorisedRuleReprMatching:
+    """Rule representation dependent matching that matches the whole
+    population in a single vectorised operation.
+
+    The encoded conditions of the population are kept in a ConditionMatrix
+    that observes the population, so it is only built in full the first time
+    a given population is matched against; after that it is updated
+    incrementally as classifiers are added and removed.
+
+    Produces exactly the same match sets (including ordering) as
+    RuleReprMatching.
+    """
+    def __init__(self, rule_repr):
+        assert isinstance(rule_repr, IVectorisedRuleRepr)
+        self._rule_repr = rule_repr
+        self._population = None
+        self._condition_matrix = None
+
+    def __call__(self, population, situation):
+        condition_matrix = self._get_condition_matrix(population)
+        match_set = ClassifierSet()
+        for classifier in condition_matrix.match(situation):
+            match_set.add(classifier)
+        return match_set
+
+    def match_batch(self, population, situations):
+        """Matches the whole population against all the situations at once,
+        see RuleReprMatching.match_batch()."""
+        condition_matrix = self._get_condition_matrix(population)
+        return condition_matrix.match_batch(situations)
+
+    def _get_condition_matrix(self, population):
+        if population is not self._population:
+            self._bind_to_population(population)
+        return self._condition_matrix
+
+    def _bind_to_population(self, population):
+        if self._population is not None:
+            self._population.deregister_observer(self._condition_matrix)
+        self._condition_matrix = ConditionMatrix.from_population(
+            self._rule_repr, population, self._make_row_index())
+        self._population = population
+
+    def _make_row_index(self):
+        return None
+
+
+class IntervalGridIndexedMatching(VectorisedRuleReprMatching):
+    """Vectorised matching for interval rule reprs that additionally keeps an
+    IntervalGridIndex over the condition matrix, so that only the
+    classifiers whose intervals overlap the grid cell containing the
+    situation are checked exactly.
+
+    The index is updated incrementally along with the condition matrix
+    (i.e. through covering, GA insertion, subsumption and deletion), and match
+    sets are exactly the same as those of RuleReprMatching. Pays off when
+    conditions are specific relative to the situation space, such that most
+    of the population does not match a given situation.
+    """
+    _DEFAULT_NUM_BINS = 16
+
+    def __init__(self, rule_repr, num_bins=_DEFAULT_NUM_BINS):
+        assert isinstance(rule_repr, MinSpanRuleReprABC)
+        super().__init__(rule_repr)
+        self._num_bins = num_bins
+
+    def _make_row_index(self):
+        return IntervalGridIndex(self._rule_repr.situation_space,
+                                 self._num_bins)
+
+
+def _calc_situation_key(situation):
+    return tuple(situation)
+
+
+class CachedMatching(IPopulationObserver):
+    """Matching that caches match sets keyed by situation, for environments
+    where the same situations recur (e.g. classification over a fixed
+    dataset).
+
+    Cached match sets are tagged with the population version they were
+    calculated at (see Population.version). On a cache hit for an outdated
+    version, the cached match set is brought up to date by only matching the
+    classifiers added since; a full rematch using the base matching strategy
+    is only done on a miss, or if member genotypes have been changed in place
+    since.
+
+    Observes the population so that classifiers are dropped from all cached
+    match sets as soon as they are removed from it, hence the cache never
+    keeps removed classifiers alive.
+
+    Produces exactly the same match sets (including ordering) as the base
+    matching strategy, which defaults to RuleReprMatching. The least recently
+    used match set is evicted when more than max_cache_size situations are
+    cached.
+    """
+    _DEFAULT_MAX_CACHE_SIZE = 4096
+
+    def __init__(self,
+                 rule_repr,
+                 base_matching=None,
+                 max_cache_size=_DEFAULT_MAX_CACHE_SIZE):
+        assert max_cache_size >= 1
+        self._rule_repr = rule_repr
+        self._base_matching = base_matching if base_matching is not None \
+            else RuleReprMatching(rule_repr)
+        self._max_cache_size = max_cache_size
+        self._population = None
+        self._clear_cache()
+
+    def __getstate__(self):
+        # cached match sets are keyed by classifier ids, which do not survive
+        # copying, so are rebuilt on demand instead
+        state = self.__dict__.copy()
+        state["_cache"] = collections.OrderedDict()
+        state["_keys_by_member"] = {}
+        return state
+
+    def __call__(self, population, situation):
+        if population is not self._population:
+            self._observe(population)
+        key = _calc_situation_key(situation)
+        cached = self._cache.get(key)
+        if cached is None:
+            matching = list(self._base_matching(population, situation))
+        else:
+            (version, matching) = cached
+            if version < population.last_genotype_change_version:
+                matching = list(self._base_matching(population, situation))
+            elif version < population.version:
+                matching = list(matching.values()) + \
+                    self._find_newly_matching(population, situation, version)
+            else:
+                matching = list(matching.values())
+        self._store(key, population.version, matching)
+        match_set = ClassifierSet()
+        for classifier in matching:
+            match_set.add(classifier)
+        return match_set
+
+    def match_batch(self, population, situations):
+        """Batches are not cached, see RuleReprMatching.match_batch()."""
+        return self._base_matching.match_batch(population, situations)
+
+    def on_classifier_added(self, classifier):
+        # picked up via Population.members_added_since() on the next hit
+        pass
+
+    def on_classifier_removed(self, classifier):
+        for key in self._keys_by_member.pop(id(classifier), ()):
+            del self._cache[key][1][id(classifier)]
+
+    def _observe(self, population):
+        if self._population is not None:
+            self._population.deregister_observer(self)
+        population.register_observer(self)
+        self._population = population
+        self._clear_cache()
+
+    def _clear_cache(self):
+        # situation key -> (population version, {id: matching classifier})
+        self._cache = collections.OrderedDict()
+        # classifier id -> keys of the cached match sets it is in
+        self._keys_by_member = {}
+
+    def _store(self, key, version, matching):
+        self._evict(key)
+        self._cache[key] = (version, {
+            id(classifier): classifier
+            for classifier in matching
+        })
+        for classifier in matching:
+            self._keys_by_member.setdefault(id(classifier), set()).add(key)
+        if len(self._cache) > self._max_cache_size:
+            self._evict(next(iter(self._cache)))
+
+    def _evict(self, key):
+        cached = self._cache.pop(key, None)
+        if cached is not None:
+            for member_id in cached[1]:
+                self._keys_by_member[member_id].discard(key)
+                if not self._keys_by_member[member_id]:
+                    del self._keys_by_member[member_id]
+
+    def _find_newly_matching(self, population, situation, version):
+        # classifiers removed since the version have already been dropped
+        # (see on_classifier_removed()), re-added ones are picked up here
+        return [
+            classifier
+            for classifier in population.members_added_since(version)
+            if self._rule_repr.does_match(classifier.condition, situation)
+        ]
@@ -1,23 +1,199 @@
 import logging
-from collections import UserDict
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from piecewise.dtype import Classifier, LinearPredictionClassifier
+
+
+def make_action_idxs(env_action_set):
+    """Maps each action in the env action set to a dense integer idx."""
+    return {action: idx for (idx, action) in enumerate(env_action_set)}
+
+
+def calc_fitness_weighted_avgs(action_idxs, num_actions, prediction_matrix,
+                               fitnesses, match_masks):
+    """Returns 2-D array of the fitness weighted avg prediction of each action
+    (column) over the classifiers that match each situation (row), 0.0 where
+    the fitness sum is 0.
+
+    Classifiers are given by their action idxs and fitnesses, and the
+    prediction matrix and match masks have one column per classifier. Sums
+    are accumulated sequentially over the classifiers, i.e. in the same order
+    as summing one classifier at a time."""
+    weighted_predictions = np.where(match_masks,
+                                    prediction_matrix * fitnesses, 0.0)
+    matching_fitnesses = np.where(match_masks, fitnesses, 0.0)
+    num_situations = len(match_masks)
+    prediction_sums = np.zeros(shape=(num_situations, num_actions),
+                               dtype=np.float64)
+    fitness_sums = np.zeros(shape=(num_situations, num_actions),
+                            dtype=np.float64)
+    for action_idx in range(num_actions):
+        advocates = (action_idxs == action_idx)
+        if np.any(advocates):
+            # cumsum accumulates sequentially, unlike sum
+            prediction_sums[:, action_idx] = np.cumsum(
+                weighted_predictions[:, advocates], axis=1)[:, -1]
+            fitness_sums[:, action_idx] = np.cumsum(
+                matching_fitnesses[:, advocates], axis=1)[:, -1]
+    np.divide(prediction_sums,
+              fitness_sums,
+              out=prediction_sums,
+              where=(fitness_sums != 0))
+    return prediction_sums
+
+
+def calc_linear_prediction_matrix(weight_vecs, x_noughts, situations):
+    """Returns 2-D array of the linear prediction of each classifier (column)
+    for each situation (row), given the stacked weight vecs (one row per
+    classifier) and x noughts of the classifiers.
+
+    Accumulates one feature at a time over the whole matrix, i.e. in the same
+    order as LinearPredictionClassifier.get_prediction(), so gives exactly the
+    same values as calling it for each (situation, classifier) pair (unlike a
+    single matrix product, whose summation order is up to BLAS)."""
+    situations = np.asarray(situations, dtype=np.float64)
+    prediction_matrix = np.tile(weight_vecs[:, 0] * x_noughts,
+                                (len(situations), 1))
+    for feature_idx in range(situations.shape[1]):
+        prediction_matrix += np.outer(situations[:, feature_idx],
+                                      weight_vecs[:, feature_idx + 1])
+    return prediction_matrix
 
 
 class FitnessWeightedAvgPrediction:
     def __init__(self, env_action_set):
         self._env_action_set = env_action_set
+        self._action_idxs = make_action_idxs(env_action_set)
 
     def __call__(self, match_set, situation):
         """GENERATE PREDICTION ARRAY function from 'An Algorithmic
         Description of XCS' (Butz and Wilson, 2002).
 
         Situation is optional as may or may not be needed depending on
-        whether classifiers have constant or computed predictions."""
+        whether classifiers have constant or computed predictions.
+
+        Per-action sums are computed with weighted bincounts over the match
+        set, which accumulate in match set order and so give exactly the same
+        values as summing one classifier at a time."""
         self._warn_if_match_set_is_empty(match_set)
-        prediction_array, fitness_sum_array = self._init_arrays()
-        self._populate_arrays(prediction_array, fitness_sum_array, match_set,
-                              situation)
-        self._normalise_prediction_array(prediction_array, fitness_sum_array)
-        return prediction_array
+        classifiers = list(match_set)
+        num_classifiers = len(classifiers)
+        action_idxs = np.fromiter(
+            (self._action_idxs[classifier.action]
+             for classifier in classifiers),
+            dtype=np.intp,
+            count=num_classifiers)
+        predictions = np.fromiter(
+            (classifier.get_prediction(situation)
+             for classifier in classifiers),
+            dtype=np.float64,
+            count=num_classifiers)
+        fitnesses = np.fromiter(
+            (classifier.fitness for classifier in classifiers),
+            dtype=np.float64,
+            count=num_classifiers)
+        num_actions = len(self._action_idxs)
+        # (bincount of nothing is int typed regardless of weights)
+        prediction_sums = np.bincount(action_idxs,
+                                      weights=(predictions * fitnesses),
+                                      minlength=num_actions).astype(
+                                          np.float64, copy=False)
+        fitness_sums = np.bincount(action_idxs,
+                                   weights=fitnesses,
+                                   minlength=num_actions)
+        np.divide(prediction_sums,
+                  fitness_sums,
+                  out=prediction_sums,
+                  where=(fitness_sums != 0))
+        # actions advocated by the match set, in order of first advocate
+        (_, first_occurrences) = np.unique(action_idxs, return_index=True)
+        advocated_action_idxs = action_idxs[np.sort(first_occurrences)]
+        return PredictionArray.from_dense(self._env_action_set,
+                                          self._action_idxs, prediction_sums,
+                                          advocated_action_idxs)
+
+    def predict_batch(self, classifiers, match_masks, situations):
+        """Batched equivalent of calling this prediction on the match set of
+        each situation, given the classifiers of the population and a 2-D
+        boolean array with one row per situation indicating which of them
+        match that situation (see RuleReprMatching.match_batch()).
+
+        Sums are accumulated in population order, so the prediction arrays
+        are exactly the same as those computed one situation at a time."""
+        num_classifiers = len(classifiers)
+        num_actions = len(self._action_idxs)
+        num_empty_match_sets = np.count_nonzero(~np.any(match_masks, axis=1))
+        if num_empty_match_sets > 0:
+            logging.warning(f"{num_empty_match_sets} match set(s) are empty "
+                            "when performing batch prediction.")
+        action_idxs = np.fromiter(
+            (self._action_idxs[classifier.action]
+             for classifier in classifiers),
+            dtype=np.intp,
+            count=num_classifiers)
+        fitnesses = np.fromiter(
+            (classifier.fitness for classifier in classifiers),
+            dtype=np.float64,
+            count=num_classifiers)
+        prediction_matrix = self._calc_prediction_matrix(
+            classifiers, match_masks, situations)
+        predictions = calc_fitness_weighted_avgs(action_idxs, num_actions,
+                                                 prediction_matrix, fitnesses,
+                                                 match_masks)
+        prediction_arrays = []
+        for situation_idx in range(len(situations)):
+            matching_action_idxs = action_idxs[match_masks[situation_idx]]
+            (_, first_occurrences) = np.unique(matching_action_idxs,
+                                               return_index=True)
+            prediction_arrays.append(
+                PredictionArray.from_dense(
+                    self._env_action_set, self._action_idxs,
+                    predictions[situation_idx],
+                    matching_action_idxs[np.sort(first_occurrences)]))
+        return prediction_arrays
+
+    def _calc_prediction_matrix(self, classifiers, match_masks, situations):
+        """Returns 2-D array of the prediction of each classifier (column) for
+        each situation (row) it matches.
+
+        Constant and linear predictions are computed for the whole matrix at
+        once, other computed predictions one matching pair at a time."""
+        if self._all_have_prediction_method(classifiers,
+                                            Classifier.get_prediction):
+            predictions = np.fromiter(
+                (classifier.get_prediction() for classifier in classifiers),
+                dtype=np.float64,
+                count=len(classifiers))
+            return np.broadcast_to(predictions, match_masks.shape)
+        elif self._all_have_prediction_method(
+                classifiers, LinearPredictionClassifier.get_prediction):
+            weight_vecs = np.array(
+                [classifier.weight_vec for classifier in classifiers],
+                dtype=np.float64)
+            x_noughts = np.array(
+                [classifier.x_nought for classifier in classifiers],
+                dtype=np.float64)
+            prediction_matrix = calc_linear_prediction_matrix(
+                weight_vecs, x_noughts, situations)
+            return np.where(match_masks, prediction_matrix, 0.0)
+        else:
+            prediction_matrix = np.zeros(shape=match_masks.shape,
+                                         dtype=np.float64)
+            for (situation_idx, classifier_idx) in \
+                    zip(*np.nonzero(match_masks)):
+                prediction_matrix[situation_idx, classifier_idx] = \
+                    classifiers[classifier_idx].get_prediction(
+                        situations[situation_idx])
+            return prediction_matrix
+
+    def _all_have_prediction_method(self, classifiers, get_prediction):
+        # (method attrs of classifier clses are swapped depending on the
+        # validation level, so compare against the current one)
+        return all(
+            getattr(type(classifier), "get_prediction", None) is
+            get_prediction for classifier in classifiers)
 
     def _warn_if_match_set_is_empty(self, match_set):
         match_set_is_empty = match_set.num_micros == 0
@@ -25,45 +201,81 @@ class FitnessWeightedAvgPrediction:
             logging.warning("Match set is empty when performing "
                             "prediction.")
 
-    def _init_arrays(self):
-        prediction_array = PredictionArray(self._env_action_set)
-        fitness_sum_array = {action: 0.0 for action in self._env_action_set}
-        return prediction_array, fitness_sum_array
-
-    def _populate_arrays(self, prediction_array, fitness_sum_array, match_set,
-                         situation):
-        for classifier in match_set:
-            action = classifier.action
-            prediction = classifier.get_prediction(situation)
-            prediction_array[action] += \
-                prediction * classifier.fitness
-            fitness_sum_array[action] += classifier.fitness
-
-    def _normalise_prediction_array(self, prediction_array, fitness_sum_array):
-        possible_actions = prediction_array.keys()
-        for action in possible_actions:
-            if fitness_sum_array[action] != 0:
-                prediction_array[action] /= fitness_sum_array[action]
-
-
-class PredictionArray(UserDict):
-    """Lazy dictionary structure to store predictions."""
-    def __init__(self, env_action_set):
+
+class PredictionArray(MutableMapping):
+    """Lazy dictionary structure to store predictions.
+
+    Only actions that have been assigned a prediction are keys (iterated in
+    order of assignment); reading the prediction of any other action gives
+    0.0. Predictions are stored in a dense NumPy array indexed by the idxs of
+    actions in the env action set (see make_action_idxs())."""
+    def __init__(self, env_action_set, action_idxs=None):
         self._env_action_set = env_action_set
-        super().__init__()
+        self._action_idxs = action_idxs if action_idxs is not None else \
+            make_action_idxs(env_action_set)
+        self._predictions = np.zeros(shape=len(self._action_idxs),
+                                     dtype=np.float64)
+        # ordered set of assigned actions
+        self._assigned_actions = {}
+
+    @classmethod
+    def from_dense(cls, env_action_set, action_idxs, predictions,
+                   assigned_action_idxs):
+        """Creates a prediction array from an array of predictions indexed by
+        action idx, with the actions at the given idxs assigned (in the given
+        order)."""
+        prediction_array = cls(env_action_set, action_idxs)
+        prediction_array._predictions = predictions
+        actions = list(action_idxs)
+        prediction_array._assigned_actions = {
+            actions[action_idx]: None
+            for action_idx in assigned_action_idxs
+        }
+        return prediction_array
 
     @property
     def env_action_set(self):
         return self._env_action_set
 
+    @property
+    def action_idxs(self):
+        return self._action_idxs
+
+    @property
+    def dense_predictions(self):
+        """Array of predictions indexed by action idx, 0.0 for unassigned
+        actions."""
+        return self._predictions
+
     def __getitem__(self, key):
         action = key
-        try:
-            return self.data[action]
-        except KeyError:
+        if action in self._assigned_actions:
+            return float(self._predictions[self._action_idxs[action]])
+        else:
             return 0.0
 
     def __setitem__(self, key, value):
         action = key
         prediction = value
-        self.data[action] = prediction
+        self._predictions[self._action_idxs[action]] = prediction
+        self._assigned_actions[action] = None
+
+    def __delitem__(self, key):
+        action = key
+        del self._assigned_actions[action]
+        self._predictions[self._action_idxs[action]] = 0.0
+
+    def __contains__(self, key):
+        return key in self._assigned_actions
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        return iter(self._assigned_actions)
+
+    def __len__(self):
+        return len(self._assigned_actions)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
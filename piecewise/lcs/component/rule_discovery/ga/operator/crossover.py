@@ -1,5 +1,6 @@
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.lcs.rng import get_rng
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.lcs.rng import resolve_rng
+from piecewise.validation import checks_consistency
 
 
 def _swap_vec_elems(first_vec, second_vec, swap_idx):
@@ -8,20 +9,26 @@ def _swap_vec_elems(first_vec, second_vec, swap_idx):
 
 
 class TwoPointCrossover:
+    def __init__(self, rng=None):
+        self._rng = resolve_rng(rng)
+        self._checks_consistency = checks_consistency()
+
     def __call__(self, first_vec, second_vec):
         """Based on APPLY CROSSOVER function from 'An Algorithmic Description
         of XCS' (Butz and Wilson, 2002)."""
-        assert len(first_vec) == len(second_vec)
+        if self._checks_consistency:
+            assert len(first_vec) == len(second_vec)
         (first_idx, second_idx) = \
             self._choose_random_crossover_idxs(len(first_vec))
         (first_idx,
          second_idx) = self._order_crossover_idxs(first_idx, second_idx)
-        assert first_idx <= second_idx
+        if self._checks_consistency:
+            assert first_idx <= second_idx
         self._crossover_vecs(first_vec, second_vec, first_idx, second_idx)
 
     def _choose_random_crossover_idxs(self, vec_len):
         num_idxs = 2
-        return tuple([get_rng().randint(0, vec_len) for _ in range(num_idxs)])
+        return tuple([self._rng.randint(0, vec_len) for _ in range(num_idxs)])
 
     def _order_crossover_idxs(self, first_idx, second_idx):
         return (min(first_idx, second_idx), max(first_idx, second_idx))
@@ -32,9 +39,15 @@ class TwoPointCrossover:
 
 
 class UniformCrossover:
+    def __init__(self, hyperparams=None, rng=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
+        self._checks_consistency = checks_consistency()
+
     def __call__(self, first_vec, second_vec):
-        assert len(first_vec) == len(second_vec)
+        if self._checks_consistency:
+            assert len(first_vec) == len(second_vec)
         for swap_idx in range(0, len(first_vec)):
-            should_swap = get_rng().rand() < get_hyperparam("upsilon")
+            should_swap = self._rng.rand() < self._hyperparams.upsilon
             if should_swap:
                 _swap_vec_elems(first_vec, second_vec, swap_idx)
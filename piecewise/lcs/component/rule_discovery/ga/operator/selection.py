@@ -1,15 +1,17 @@
 import math
 
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.lcs.rng import get_rng
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.lcs.rng import resolve_rng
 
 
 class RouletteWheelSelection:
+    def __init__(self, rng=None):
+        self._rng = resolve_rng(rng)
+
     def __call__(self, operating_set):
         """SELECT OFFSPRING function from 'An Algorithmic Description of XCS'
         (Butz and Wilson, 2002)."""
-        fitness_sum = sum([classifier.fitness for classifier in operating_set])
-        choice_point = get_rng().rand() * fitness_sum
+        choice_point = self._rng.rand() * operating_set.fitness_sum
 
         fitness_sum = 0
         for classifier in operating_set:
@@ -19,9 +21,13 @@ class RouletteWheelSelection:
 
 
 class TournamentSelection:
+    def __init__(self, hyperparams=None, rng=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
+
     def __call__(self, operating_set):
         tournament_size = math.ceil(
-            get_hyperparam("tau") * operating_set.num_macros)
+            self._hyperparams.tau * operating_set.num_macros)
         assert 1 <= tournament_size <= operating_set.num_macros
         best_classifier = \
             self._select_random_classifier_from_set(operating_set)
@@ -32,4 +38,4 @@ class TournamentSelection:
         return best_classifier
 
     def _select_random_classifier_from_set(self, operating_set):
-        return get_rng().choice(list(operating_set))
+        return self._rng.choice(list(operating_set))
@@ -1,10 +1,9 @@
-import copy
 import logging
 from collections import namedtuple
 
 from piecewise.error.classifier_set_error import MemberNotFoundError
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.lcs.rng import get_rng
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.lcs.rng import resolve_rng
 
 from .operator.crossover import TwoPointCrossover, UniformCrossover
 from .operator.mutation import RuleReprMutation
@@ -15,38 +14,60 @@ GAOperators = namedtuple("GAOperators", ["selection", "crossover", "mutation"])
 ClassifierPair = namedtuple("ClassifierPair", ["first", "second"])
 
 
-def make_canonical_xcs_ga(env_action_set, rule_repr, subsumption):
-    selection = RouletteWheelSelection()
-    crossover = TwoPointCrossover()
+def make_canonical_xcs_ga(env_action_set,
+                          rule_repr,
+                          subsumption,
+                          hyperparams=None,
+                          rng=None):
+    selection = RouletteWheelSelection(rng)
+    crossover = TwoPointCrossover(rng)
     mutation = RuleReprMutation(env_action_set, rule_repr)
     ga_operators = GAOperators(selection, crossover, mutation)
     return XCSGeneticAlgorithm(env_action_set, rule_repr, subsumption,
-                               ga_operators)
+                               ga_operators, hyperparams, rng)
 
 
-def make_improved_xcs_ga(env_action_set, rule_repr, subsumption):
-    selection = TournamentSelection()
-    crossover = UniformCrossover()
+def make_improved_xcs_ga(env_action_set,
+                         rule_repr,
+                         subsumption,
+                         hyperparams=None,
+                         rng=None):
+    selection = TournamentSelection(hyperparams, rng)
+    crossover = UniformCrossover(hyperparams, rng)
     mutation = RuleReprMutation(env_action_set, rule_repr)
     ga_operators = GAOperators(selection, crossover, mutation)
     return XCSGeneticAlgorithm(env_action_set, rule_repr, subsumption,
-                               ga_operators)
+                               ga_operators, hyperparams, rng)
 
 
-def make_custom_xcs_ga(env_action_set, rule_repr, subsumption, selection,
-                       crossover, mutation):
+def make_custom_xcs_ga(env_action_set,
+                       rule_repr,
+                       subsumption,
+                       selection,
+                       crossover,
+                       mutation,
+                       hyperparams=None,
+                       rng=None):
     ga_operators = GAOperators(selection, crossover, mutation)
     return XCSGeneticAlgorithm(env_action_set, rule_repr, subsumption,
-                               ga_operators)
+                               ga_operators, hyperparams, rng)
 
 
 class XCSGeneticAlgorithm(IRuleDiscoveryStrategy):
-    def __init__(self, env_action_set, rule_repr, subsumption, ga_operators):
+    def __init__(self,
+                 env_action_set,
+                 rule_repr,
+                 subsumption,
+                 ga_operators,
+                 hyperparams=None,
+                 rng=None):
         self._env_action_set = env_action_set
         self._rule_repr = rule_repr
         self._subsumption_strat = subsumption
         (self._selection_strat, self._crossover_strat,
          self._mutation_strat) = ga_operators
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
 
     def __call__(self, action_set, population, situation, time_step):
         """RUN GA function from 'An Algorithmic Description of
@@ -66,19 +87,16 @@ class XCSGeneticAlgorithm(IRuleDiscoveryStrategy):
     def _select_parents_and_init_children(self, action_set):
         parent_one = self._selection_strat(action_set)
         parent_two = self._selection_strat(action_set)
-        child_one = copy.deepcopy(parent_one)
-        child_two = copy.deepcopy(parent_two)
-        child_one.numerosity = 1
-        child_two.numerosity = 1
-        child_one.experience = 0
-        child_two.experience = 0
+        # clones have numerosity and experience reset
+        child_one = parent_one.clone()
+        child_two = parent_two.clone()
 
         parents = ClassifierPair(parent_one, parent_two)
         children = ClassifierPair(child_one, child_two)
         return parents, children
 
     def _perform_crossover(self, children, parents, situation):
-        should_do_crossover = get_rng().rand() < get_hyperparam("chi")
+        should_do_crossover = self._rng.rand() < self._hyperparams.chi
         if should_do_crossover:
             (child_one, child_two) = children
             logging.debug(f"Before crossover {child_one.condition}, "
@@ -129,7 +147,7 @@ class XCSGeneticAlgorithm(IRuleDiscoveryStrategy):
         logging.debug(f"After mutation: {child_one.rule}, {child_two.rule}")
 
     def _update_population(self, children, parents, population):
-        should_do_subsumption = get_hyperparam("do_ga_subsumption")
+        should_do_subsumption = self._hyperparams.do_ga_subsumption
         for child in children:
             if should_do_subsumption:
                 was_subsumed = self._try_subsume_with_parents(
@@ -1,6 +1,10 @@
 import abc
 
-from piecewise.lcs.hyperparams import get_hyperparam
+import numpy as np
+
+from piecewise.dtype import ConditionMatrix, calc_generalities, gather_params
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.rule_repr.rule_repr import IVectorisedRuleRepr
 
 
 class ISubsumptionStrategy(metaclass=abc.ABCMeta):
@@ -21,10 +25,61 @@ class ISubsumptionStrategy(metaclass=abc.ABCMeta):
         classifier."""
         raise NotImplementedError
 
+    def calc_generality(self, classifier):
+        """Returns the generality of the condition of the given classifier as
+        a fraction.
+
+        Only used by calc_generalities(), so is not abstract."""
+        raise NotImplementedError
+
+    def calc_generalities(self, classifier_set):
+        """Returns array of the generalities of the conditions of the
+        classifiers in the given set, in iteration order.
+
+        By default calculates the generality of each classifier in turn;
+        strategies can override this to calculate them all at once."""
+        return np.array([
+            self.calc_generality(classifier) for classifier in classifier_set
+        ],
+                        dtype=np.float64)
+
+    def find_subsumptions(self, classifier_set, population=None):
+        """Returns (subsumer, subsumees) tuple for the given classifier set
+        (e.g. an action set), where the subsumer is the most general
+        candidate subsumer in the set (or None if there are none) and the
+        subsumees are the classifiers in the set it is more general than, in
+        iteration order.
+
+        The population the set is drawn from can optionally be given, for
+        strategies that keep data structures in sync with it.
+
+        By default searches the set one classifier at a time using
+        could_subsume() and is_more_general(); strategies can override this
+        to search it all at once."""
+        return self._find_subsumptions_iteratively(list(classifier_set))
+
+    def _find_subsumptions_iteratively(self, classifiers):
+        subsumer = None
+        for classifier in classifiers:
+            if self.could_subsume(classifier):
+                if subsumer is None or \
+                        self.is_more_general(classifier, subsumer):
+                    subsumer = classifier
+        if subsumer is None:
+            return (None, [])
+        subsumees = [
+            classifier for classifier in classifiers
+            if self.is_more_general(subsumer, classifier)
+        ]
+        return (subsumer, subsumees)
+
 
 class XCSSubsumption(ISubsumptionStrategy):
-    def __init__(self, rule_repr):
+    def __init__(self, rule_repr, hyperparams=None):
         self._rule_repr = rule_repr
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._population = None
+        self._condition_matrix = None
 
     def does_subsume(self, subsumer, subsumee):
         """DOES SUBSUME function from 'An Algorithmic Description of XCS'
@@ -36,22 +91,114 @@ class XCSSubsumption(ISubsumptionStrategy):
     def could_subsume(self, classifier):
         """COULD SUBSUME function from 'An Algorithmic Description of XCS'
         (Butz and Wilson, 2002)."""
-        return classifier.experience > get_hyperparam("theta_sub") and \
-            classifier.error < get_hyperparam("epsilon_nought")
+        return classifier.experience > self._hyperparams.theta_sub and \
+            classifier.error < self._hyperparams.epsilon_nought
 
     def is_more_general(self, first_classifier, second_classifier):
         """IS MORE GENERAL function from
         'An Algorithmic Description of XCS'
         (Butz and Wilson, 2002), modified to be rule representation
-        agnostic."""
-        first_generality = \
-            self._rule_repr.calc_generality(first_classifier.condition)
-        second_generality = \
-            self._rule_repr.calc_generality(second_classifier.condition)
-        first_contains_second = self._subsumer_contains_subsumee(
-            subsumer=first_classifier, subsumee=second_classifier)
+        agnostic.
+
+        Generalities are cached on the conditions (see
+        Condition.generality()), and the containment check is only done if
+        the first classifier is strictly more general."""
+        first_generality = self.calc_generality(first_classifier)
+        second_generality = self.calc_generality(second_classifier)
         return (first_generality > second_generality) and \
-            first_contains_second
+            self._subsumer_contains_subsumee(subsumer=first_classifier,
+                                             subsumee=second_classifier)
+
+    def calc_generality(self, classifier):
+        return classifier.condition.generality(self._rule_repr)
+
+    def calc_generalities(self, classifier_set):
+        return calc_generalities(
+            [classifier.condition for classifier in classifier_set],
+            self._rule_repr)
+
+    def find_subsumptions(self, classifier_set, population=None):
+        """Search part of DO ACTION SET SUBSUMPTION function from
+        'An Algorithmic Description of XCS' (Butz and Wilson, 2002).
+
+        If the rule repr is vectorised (see IVectorisedRuleRepr), the search
+        is done on arrays of the params, generalities and encoded conditions
+        of the whole set, giving the same result as the per-classifier
+        search. If the population is also given, the generalities and
+        encoded conditions are read by row from a ConditionMatrix kept in
+        sync with it, rather than being looked up and encoded per classifier
+        on each call; along with a ColumnarPopulation (see gather_params())
+        this makes the number of Python-level operations independent of the
+        size of the set."""
+        classifiers = list(classifier_set)
+        if isinstance(self._rule_repr, IVectorisedRuleRepr) and \
+                len(classifiers) > 0:
+            return self._find_subsumptions_encoded(classifiers, population)
+        else:
+            return self._find_subsumptions_iteratively(classifiers)
+
+    def _find_subsumptions_encoded(self, classifiers, population):
+        params = gather_params(classifiers, ("experience", "error"))
+        candidate_idxs = np.flatnonzero(
+            (params["experience"] > self._hyperparams.theta_sub)
+            & (params["error"] < self._hyperparams.epsilon_nought))
+        if len(candidate_idxs) == 0:
+            return (None, [])
+        if population is not None:
+            condition_matrix = self._get_condition_matrix(population)
+            rows = condition_matrix.rows_of(classifiers)
+            generalities = condition_matrix.generalities[rows]
+            encoded_conditions = \
+                self._select_encoded_rows(condition_matrix.matrices, rows)
+        else:
+            generalities = self.calc_generalities(classifiers)
+            encoded_conditions = self._rule_repr.encode_conditions(
+                [classifier.condition for classifier in classifiers])
+        subsumer_idx = self._find_most_general_candidate_idx(
+            candidate_idxs, generalities, encoded_conditions)
+        subsumer_encoded_condition = \
+            self._select_encoded_rows(encoded_conditions, subsumer_idx)
+        subsumee_mask = \
+            (generalities < generalities[subsumer_idx]) & \
+            self._rule_repr.check_condition_subsumption_encoded(
+                subsumer_encoded_condition, encoded_conditions)
+        subsumees = [classifiers[idx] for idx in np.flatnonzero(subsumee_mask)]
+        return (classifiers[subsumer_idx], subsumees)
+
+    def _find_most_general_candidate_idx(self, candidate_idxs, generalities,
+                                         encoded_conditions):
+        """Finds the candidate the per-classifier search would end on: the
+        first candidate, replaced by each later candidate more general than
+        the current one. Rather than visiting every candidate, jumps straight
+        to the next replacement each time, so the number of iterations is the
+        number of replacements."""
+        most_general_idx = candidate_idxs[0]
+        while True:
+            later_idxs = candidate_idxs[candidate_idxs > most_general_idx]
+            later_idxs = later_idxs[
+                generalities[later_idxs] > generalities[most_general_idx]]
+            if len(later_idxs) == 0:
+                return most_general_idx
+            contains_mask = \
+                self._rule_repr.check_condition_subsumption_encoded(
+                    self._select_encoded_rows(encoded_conditions, later_idxs),
+                    self._select_encoded_rows(encoded_conditions,
+                                              most_general_idx))
+            if not np.any(contains_mask):
+                return most_general_idx
+            most_general_idx = later_idxs[np.argmax(contains_mask)]
+
+    def _get_condition_matrix(self, population):
+        if population is not self._population:
+            if self._population is not None:
+                self._population.deregister_observer(self._condition_matrix)
+            self._condition_matrix = ConditionMatrix.from_population(
+                self._rule_repr, population, stores_generalities=True)
+            self._population = population
+        return self._condition_matrix
+
+    def _select_encoded_rows(self, encoded_conditions, idxs):
+        return tuple([array[idxs] for array in encoded_conditions])
 
     def _subsumer_contains_subsumee(self, subsumer, subsumee):
         """Second part of IS MORE GENERAL function from
@@ -71,3 +218,9 @@ class NullSubsumption(ISubsumptionStrategy):
 
     def is_more_general(self, first_classifier, second_classifier):
         pass
+
+    def calc_generalities(self, classifier_set):
+        return np.empty(shape=0, dtype=np.float64)
+
+    def find_subsumptions(self, classifier_set, population=None):
+        return (None, [])
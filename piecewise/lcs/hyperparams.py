@@ -15,3 +15,58 @@ def get_hyperparam(name):
 
 def get_registry():
     return _hyperparams_registry
+
+
+class Hyperparams:
+    """Immutable set of hyperparams with attribute access, e.g.
+    hyperparams.beta.
+
+    Made per LCS instance and bound into its components at construction, so
+    that differently configured LCS instances can coexist in one process and
+    components avoid global registry lookups in their inner loops. Values are
+    stored as plain instance attrs, so reading one is as cheap as any attr
+    access."""
+    def __init__(self, hyperparams_dict):
+        for (name, value) in hyperparams_dict.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Hyperparams are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Hyperparams are immutable")
+
+    def __getitem__(self, name):
+        return self.__dict__[name]
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.__dict__!r})"
+
+
+class _RegistryHyperparams:
+    """Attribute access view of the global registry, for components not given
+    their own Hyperparams obj (see resolve_hyperparams()). Values are read
+    from the registry at access time, as with get_hyperparam()."""
+    def __getattr__(self, name):
+        try:
+            return _hyperparams_registry[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return _hyperparams_registry[name]
+
+    def as_dict(self):
+        return dict(_hyperparams_registry)
+
+
+_registry_hyperparams = _RegistryHyperparams()
+
+
+def resolve_hyperparams(hyperparams):
+    """Returns the given Hyperparams obj, or if None a view of the global
+    registry with the same interface."""
+    return hyperparams if hyperparams is not None else _registry_hyperparams
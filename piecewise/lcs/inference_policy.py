@@ -0,0 +1,224 @@
+import pickle
+
+import numpy as np
+
+from piecewise.dtype import Classifier, LinearPredictionClassifier
+from piecewise.rule_repr.rule_repr import IVectorisedRuleRepr
+
+from .component.prediction import (calc_fitness_weighted_avgs,
+                                   calc_linear_prediction_matrix)
+
+# max num situations matched at once
+_CHUNK_SIZE = 256
+
+
+def export_inference_policy(lcs, fallback_action=None):
+    """Exports the population of the given (trained) LCS as an
+    InferencePolicy.
+
+    The rule repr of the LCS must be vectorised (see IVectorisedRuleRepr), and
+    the classifiers must either all have constant predictions or all be
+    linear prediction classifiers."""
+    rule_repr = lcs.rule_repr
+    assert isinstance(rule_repr, IVectorisedRuleRepr)
+    classifiers = list(lcs.population)
+    assert len(classifiers) > 0
+    encoded_conditions = [
+        rule_repr.encode_condition(classifier.condition)
+        for classifier in classifiers
+    ]
+    condition_matrices = tuple(
+        np.stack(encoded_elems) for encoded_elems in zip(*encoded_conditions))
+    # actions in order of first appearance in the population
+    actions = tuple(dict.fromkeys(classifier.action
+                                  for classifier in classifiers))
+    action_idxs = {action: idx for (idx, action) in enumerate(actions)}
+    classifier_action_idxs = np.array(
+        [action_idxs[classifier.action] for classifier in classifiers],
+        dtype=np.intp)
+    fitnesses = np.array([classifier.fitness for classifier in classifiers],
+                         dtype=np.float64)
+    return InferencePolicy(rule_repr, condition_matrices, actions,
+                           classifier_action_idxs, fitnesses,
+                           _export_prediction_params(classifiers),
+                           fallback_action)
+
+
+def _export_prediction_params(classifiers):
+    if all(type(classifier).get_prediction is Classifier.get_prediction
+           for classifier in classifiers):
+        predictions = np.array(
+            [classifier.get_prediction() for classifier in classifiers],
+            dtype=np.float64)
+        return (predictions, )
+    else:
+        assert all(
+            isinstance(classifier, LinearPredictionClassifier)
+            for classifier in classifiers)
+        weight_vecs = np.stack([
+            np.asarray(classifier.weight_vec, dtype=np.float64)
+            for classifier in classifiers
+        ])
+        x_noughts = np.array(
+            [classifier.x_nought for classifier in classifiers],
+            dtype=np.float64)
+        return (weight_vecs, x_noughts)
+
+
+class InferencePolicy:
+    """Immutable, compact snapshot of a trained population used to make
+    greedy decisions, independent of the population, hyperparams, RNG and
+    components of the LCS it was exported from (see
+    export_inference_policy()).
+
+    Classifiers are stored as flat arrays in population order: the encoded
+    conditions of the rule repr, action idxs (into actions), fitnesses and
+    prediction params. Prediction params are either (predictions, ) for
+    classifiers with constant predictions or (weight vecs, x noughts) for
+    linear prediction classifiers.
+
+    Predictions are calculated the same way as by FitnessWeightedAvgPrediction
+    and greedy actions are selected the same way as select_greedy_action()
+    (ties going to the action advocated first in population order), except
+    that a fixed fallback action is used for situations that no classifier
+    matches."""
+    def __init__(self, rule_repr, condition_matrices, actions,
+                 classifier_action_idxs, fitnesses, prediction_params,
+                 fallback_action=None):
+        self._rule_repr = rule_repr
+        self._condition_matrices = tuple(
+            self._freeze(matrix) for matrix in condition_matrices)
+        self._actions = tuple(actions)
+        self._classifier_action_idxs = self._freeze(classifier_action_idxs)
+        self._fitnesses = self._freeze(fitnesses)
+        self._prediction_params = tuple(
+            self._freeze(param) for param in prediction_params)
+        self._fallback_action = fallback_action
+
+    def _freeze(self, array):
+        array = np.array(array)
+        array.flags.writeable = False
+        return array
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as fp:
+            policy = pickle.load(fp)
+        assert isinstance(policy, cls)
+        return policy
+
+    def save(self, path):
+        with open(path, "wb") as fp:
+            pickle.dump(self, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._condition_matrices = tuple(
+            self._freeze(matrix) for matrix in self._condition_matrices)
+        self._classifier_action_idxs = \
+            self._freeze(self._classifier_action_idxs)
+        self._fitnesses = self._freeze(self._fitnesses)
+        self._prediction_params = tuple(
+            self._freeze(param) for param in self._prediction_params)
+
+    @property
+    def rule_repr(self):
+        return self._rule_repr
+
+    @property
+    def actions(self):
+        """Actions advocated by the classifiers, indexing the columns of
+        predict_values()."""
+        return self._actions
+
+    @property
+    def num_classifiers(self):
+        return len(self._fitnesses)
+
+    @property
+    def fallback_action(self):
+        return self._fallback_action
+
+    def predict_values(self, situations):
+        """Returns 2-D array of the prediction of each action (column) for
+        each of the given situations (row), NaN for actions that no
+        classifier matching the situation advocates."""
+        situations = np.asarray(situations)
+        values_chunks = [
+            self._predict_values_chunk(situations_chunk)[0]
+            for situations_chunk in self._iter_chunks(situations)
+        ]
+        if len(values_chunks) == 0:
+            return np.empty(shape=(0, len(self._actions)), dtype=np.float64)
+        return np.concatenate(values_chunks)
+
+    def predict(self, situations):
+        """Returns list of the greedy actions for each of the given
+        situations.
+
+        Throws:
+            ValueError: if no classifier matches a situation and no fallback
+                action was given.
+        """
+        situations = np.asarray(situations)
+        actions = []
+        for situations_chunk in self._iter_chunks(situations):
+            (values, first_advocate_idxs) = \
+                self._predict_values_chunk(situations_chunk)
+            is_advocated = ~np.isnan(values)
+            max_values = np.max(np.where(is_advocated, values, -np.inf),
+                                axis=1,
+                                keepdims=True)
+            is_best = is_advocated & (values == max_values)
+            tie_breaks = np.where(is_best, first_advocate_idxs,
+                                  self.num_classifiers)
+            best_action_idxs = np.argmin(tie_breaks, axis=1)
+            has_advocates = np.any(is_best, axis=1)
+            for (action_idx, has_advocate) in zip(best_action_idxs,
+                                                  has_advocates):
+                actions.append(self._actions[action_idx] if has_advocate
+                               else self._get_fallback_action())
+        return actions
+
+    def _get_fallback_action(self):
+        if self._fallback_action is None:
+            raise ValueError("No classifiers match situation and no "
+                             "fallback action given.")
+        return self._fallback_action
+
+    def _iter_chunks(self, situations):
+        for chunk_start in range(0, len(situations), _CHUNK_SIZE):
+            yield situations[chunk_start:(chunk_start + _CHUNK_SIZE)]
+
+    def _predict_values_chunk(self, situations):
+        """Returns (values, idx of first advocate of each action, or
+        num_classifiers if none)."""
+        match_masks = self._rule_repr.does_match_encoded_batch(
+            self._condition_matrices, situations)
+        num_actions = len(self._actions)
+        values = calc_fitness_weighted_avgs(
+            self._classifier_action_idxs, num_actions,
+            self._calc_prediction_matrix(situations), self._fitnesses,
+            match_masks)
+        first_advocate_idxs = np.full(shape=values.shape,
+                                      fill_value=self.num_classifiers,
+                                      dtype=np.intp)
+        for action_idx in range(num_actions):
+            (advocate_idxs, ) = np.nonzero(
+                self._classifier_action_idxs == action_idx)
+            advocate_match_masks = match_masks[:, advocate_idxs]
+            has_advocate = np.any(advocate_match_masks, axis=1)
+            first_advocate_idxs[has_advocate, action_idx] = advocate_idxs[
+                np.argmax(advocate_match_masks[has_advocate], axis=1)]
+        values[first_advocate_idxs == self.num_classifiers] = np.nan
+        return (values, first_advocate_idxs)
+
+    def _calc_prediction_matrix(self, situations):
+        if len(self._prediction_params) == 1:
+            (predictions, ) = self._prediction_params
+            return np.broadcast_to(predictions,
+                                   (len(situations), self.num_classifiers))
+        else:
+            (weight_vecs, x_noughts) = self._prediction_params
+            return calc_linear_prediction_matrix(weight_vecs, x_noughts,
+                                                 situations)
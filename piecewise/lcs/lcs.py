@@ -2,27 +2,38 @@ import abc
 from collections import namedtuple
 
 from piecewise.dtype import Population
+from piecewise.error.validation_error import ValidationLevelError
+from piecewise.validation import get_validation_level, set_validation_level
 
-from .hyperparams import get_hyperparam, register_hyperparams
-from .rng import seed_rng
+from .hyperparams import register_hyperparams, resolve_hyperparams
+from .rng import resolve_rng, seed_rng
 
 LCSTrainResponse = namedtuple("LCSTrainResponse", ["action", "did_explore"])
 
 
-def setup_meta_params(hyperparams, seed):
+def setup_meta_params(hyperparams, seed, validation_level=None):
     register_hyperparams(hyperparams)
     seed_rng(seed)
+    if validation_level is not None:
+        set_validation_level(validation_level)
 
 
 class LCS(metaclass=abc.ABCMeta):
     """ABC for an LCS."""
-    def __init__(self, rule_repr, population=None):
+    def __init__(self,
+                 rule_repr,
+                 population=None,
+                 hyperparams=None,
+                 rng=None):
         self._rule_repr = rule_repr
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
         self._population = self._init_population(population)
+        self._validation_level = get_validation_level()
 
     def _init_population(self, population):
         if population is None:
-            return Population(max_micros=get_hyperparam("N"))
+            return Population(max_micros=self._hyperparams.N)
         else:
             return population
 
@@ -41,6 +52,25 @@ class LCS(metaclass=abc.ABCMeta):
         """Queries the algorithm for an action to perform during testing."""
         raise NotImplementedError
 
+    def test_query_batch(self, situations):
+        """Queries the algorithm for actions to perform during testing for
+        each of the given situations."""
+        return [self.test_query(situation) for situation in situations]
+
+    @property
+    def validation_level(self):
+        """Validation level the LCS was made at (see piecewise.validation)."""
+        return self._validation_level
+
+    def _check_validation_level(self):
+        """Classifier clses follow the current validation level whereas rule
+        reprs and components read it at construction, so the LCS would run at
+        mixed levels if the level was changed after it was made."""
+        if get_validation_level() is not self._validation_level:
+            raise ValidationLevelError(
+                f"Validation level changed to {get_validation_level().name} "
+                f"after LCS was made at {self._validation_level.name}.")
+
     @property
     def rule_repr(self):
         return self._rule_repr
@@ -48,3 +78,11 @@ class LCS(metaclass=abc.ABCMeta):
     @property
     def population(self):
         return self._population
+
+    @property
+    def hyperparams(self):
+        return self._hyperparams
+
+    @property
+    def rng(self):
+        return self._rng
@@ -5,6 +5,8 @@ import numpy as np
 _rng = np.random.RandomState()
 _has_been_seeded = False
 
+_DEFAULT_BLOCK_SIZE = 1024
+
 
 def seed_rng(seed):
     seed = int(seed)
@@ -19,3 +21,86 @@ def get_rng():
     # returning reference fine here since want callers to update shared state
     # of rng
     return _rng
+
+
+class BufferedRNG:
+    """Per-instance rng backed by its own NumPy Generator.
+
+    Single uniform draws (rand(), uniform()) and single integer draws
+    (randint(), choice()) are handed out from a block of uniforms that is
+    pre-generated by the Generator, and refilled when used up, so each such
+    draw costs a list index rather than a call into NumPy. Integers are
+    derived from the buffered uniforms by scaling, which for the small
+    ranges used by LCS components is unbiased to within floating point
+    precision. Draws of many values at once (size given) go straight to the
+    Generator.
+
+    Supports the subset of the RandomState interface used by the LCS
+    components, so it can be given to them in place of the global rng (see
+    get_rng()). Not thread safe: give each LCS its own instance."""
+    def __init__(self, seed=None, block_size=_DEFAULT_BLOCK_SIZE):
+        assert block_size >= 1
+        self._generator = np.random.default_rng(seed)
+        self._block_size = block_size
+        self._block = []
+        self._block_pos = 0
+
+    @property
+    def generator(self):
+        return self._generator
+
+    def _next_uniform(self):
+        if self._block_pos == len(self._block):
+            self._block = self._generator.random(self._block_size).tolist()
+            self._block_pos = 0
+        uniform = self._block[self._block_pos]
+        self._block_pos += 1
+        return uniform
+
+    def _next_int(self, num_choices):
+        assert num_choices >= 1
+        # guard against rounding up to num_choices for uniforms close to 1
+        return min(int(self._next_uniform() * num_choices), num_choices - 1)
+
+    def rand(self, *shape):
+        if len(shape) == 0:
+            return self._next_uniform()
+        else:
+            return self._generator.random(shape)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        if size is None:
+            return low + (high - low) * self._next_uniform()
+        else:
+            return self._generator.uniform(low, high, size)
+
+    def randint(self, low, high=None, size=None):
+        if high is None:
+            (low, high) = (0, low)
+        if size is None:
+            return low + self._next_int(high - low)
+        else:
+            return self._generator.integers(low, high, size)
+
+    def choice(self, seq):
+        """Returns a uniformly random elem of the given non-empty
+        sequence."""
+        return seq[self._next_int(len(seq))]
+
+
+class _GlobalRNG:
+    """View of the global rng, for components not given their own rng (see
+    resolve_rng()). Each draw is made from get_rng() at call time."""
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(get_rng(), name)
+
+
+_global_rng = _GlobalRNG()
+
+
+def resolve_rng(rng):
+    """Returns the given rng, or if None a view of the global rng with the
+    same interface."""
+    return rng if rng is not None else _global_rng
@@ -1,23 +1,24 @@
 import abc
-import copy
+import functools
 import logging
 from collections import namedtuple
 
+import numpy as np
+
 from piecewise.dtype import ClassifierSet
 from piecewise.environment import EnvironmentStepTypes
 from piecewise.error.classifier_set_error import MemberNotFoundError
 from piecewise.error.core_errors import InternalError
-from piecewise.util.classifier_set_stats import calc_summary_stat
 
 from .component import (FitnessWeightedAvgPrediction, FixedEpsilonGreedy,
-                        RuleReprCovering, RuleReprMatching,
+                        RuleReprCovering,
                         XCSAccuracyFitnessUpdate, XCSCreditAssignment,
                         XCSFLinearPredictionCreditAssignment,
                         XCSRouletteWheelDeletion, XCSSubsumption,
                         make_canonical_xcs_ga, make_classifier,
-                        make_linear_prediction_classifier)
+                        make_linear_prediction_classifier,
+                        make_rule_repr_matching)
 from .component.action_selection import select_greedy_action
-from .hyperparams import get_hyperparam
 from .lcs import LCS, LCSTrainResponse
 
 XCSComponents = namedtuple("XCSComponents", [
@@ -26,41 +27,69 @@ XCSComponents = namedtuple("XCSComponents", [
     "deletion"
 ])
 
+# max num situations matched at once in predict_array_batch()
+_BATCH_CHUNK_SIZE = 256
+
 
-def make_canonical_xcs(env, rule_repr, population=None):
+def make_canonical_xcs(env,
+                       rule_repr,
+                       population=None,
+                       hyperparams=None,
+                       rng=None):
     """Public factory function to make instance of 'Canonical XCS' for the
     given environment and rule repr, i.e. XCS with components as described in
-    'An Algorithmic Description of XCS' (Butz and Wilson, 2002)'."""
-    matching = RuleReprMatching(rule_repr)
+    'An Algorithmic Description of XCS' (Butz and Wilson, 2002)'.
+
+    If a Hyperparams obj is given it is bound into the XCS and all of its
+    components, otherwise they read the global hyperparams registry.
+    Likewise, if an rng (e.g. BufferedRNG) is given it is used for all random
+    draws made by the components, otherwise they use the global rng."""
+    matching = make_rule_repr_matching(rule_repr)
     covering = RuleReprCovering(env.action_set,
                                 rule_repr,
-                                classifier_factory=make_classifier)
+                                classifier_factory=functools.partial(
+                                    make_classifier, hyperparams=hyperparams),
+                                hyperparams=hyperparams,
+                                rng=rng)
     prediction = FitnessWeightedAvgPrediction(env.action_set)
-    action_selection = FixedEpsilonGreedy()
-    credit_assignment = XCSCreditAssignment()
-    fitness_update = XCSAccuracyFitnessUpdate()
-    subsumption = XCSSubsumption(rule_repr)
+    action_selection = FixedEpsilonGreedy(hyperparams, rng)
+    credit_assignment = XCSCreditAssignment(hyperparams)
+    fitness_update = XCSAccuracyFitnessUpdate(hyperparams)
+    subsumption = XCSSubsumption(rule_repr, hyperparams)
     rule_discovery = make_canonical_xcs_ga(env.action_set, rule_repr,
-                                           subsumption)
-    deletion = XCSRouletteWheelDeletion()
+                                           subsumption, hyperparams, rng)
+    deletion = XCSRouletteWheelDeletion(hyperparams, rng)
 
     components = XCSComponents(matching, covering, prediction,
                                action_selection, credit_assignment,
                                fitness_update, subsumption, rule_discovery,
                                deletion)
-    return _make_xcs(env.step_type, components, rule_repr, population)
-
-
-def make_custom_xcs(env, matching, covering, prediction, action_selection,
-                    credit_assignment, fitness_update, subsumption,
-                    rule_discovery, deletion, rule_repr, population=None):
+    return _make_xcs(env.step_type, components, rule_repr, population,
+                     hyperparams, rng)
+
+
+def make_custom_xcs(env,
+                    matching,
+                    covering,
+                    prediction,
+                    action_selection,
+                    credit_assignment,
+                    fitness_update,
+                    subsumption,
+                    rule_discovery,
+                    deletion,
+                    rule_repr,
+                    population=None,
+                    hyperparams=None,
+                    rng=None):
     """Public factory function to make instance of XCS with custom
     components."""
     components = XCSComponents(matching, covering, prediction,
                                action_selection, credit_assignment,
                                fitness_update, subsumption, rule_discovery,
                                deletion)
-    return _make_xcs(env.step_type, components, rule_repr, population)
+    return _make_xcs(env.step_type, components, rule_repr, population,
+                     hyperparams, rng)
 
 
 def make_custom_xcs_from_canonical_base(env,
@@ -74,59 +103,75 @@ def make_custom_xcs_from_canonical_base(env,
                                         fitness_update=None,
                                         subsumption=None,
                                         rule_discovery=None,
-                                        deletion=None):
+                                        deletion=None,
+                                        hyperparams=None,
+                                        rng=None):
     if matching is None:
-        matching = RuleReprMatching(rule_repr)
+        matching = make_rule_repr_matching(rule_repr)
     if covering is None:
         covering = RuleReprCovering(env.action_set,
                                     rule_repr,
-                                    classifier_factory=make_classifier)
+                                    classifier_factory=functools.partial(
+                                        make_classifier,
+                                        hyperparams=hyperparams),
+                                    hyperparams=hyperparams,
+                                    rng=rng)
     if prediction is None:
         prediction = FitnessWeightedAvgPrediction(env.action_set)
     if action_selection is None:
-        action_selection = FixedEpsilonGreedy()
+        action_selection = FixedEpsilonGreedy(hyperparams, rng)
     if credit_assignment is None:
-        credit_assignment = XCSCreditAssignment()
+        credit_assignment = XCSCreditAssignment(hyperparams)
     if fitness_update is None:
-        fitness_update = XCSAccuracyFitnessUpdate()
+        fitness_update = XCSAccuracyFitnessUpdate(hyperparams)
     if subsumption is None:
-        subsumption = XCSSubsumption(rule_repr)
+        subsumption = XCSSubsumption(rule_repr, hyperparams)
     if rule_discovery is None:
         rule_discovery = make_canonical_xcs_ga(env.action_set, rule_repr,
-                                               subsumption)
+                                               subsumption, hyperparams, rng)
     if deletion is None:
-        deletion = XCSRouletteWheelDeletion()
+        deletion = XCSRouletteWheelDeletion(hyperparams, rng)
 
     components = XCSComponents(matching, covering, prediction,
                                action_selection, credit_assignment,
                                fitness_update, subsumption, rule_discovery,
                                deletion)
-    return _make_xcs(env.step_type, components, rule_repr, population)
+    return _make_xcs(env.step_type, components, rule_repr, population,
+                     hyperparams, rng)
 
 
-def make_canonical_xcsf(env, rule_repr, population=None):
+def make_canonical_xcsf(env,
+                        rule_repr,
+                        population=None,
+                        hyperparams=None,
+                        rng=None):
     """Public factory function to make instance of 'Canonical XCS' for the
     given environment and rule repr, i.e. XCS with components as described in
     'An Algorithmic Description of XCS' (Butz and Wilson, 2002)'."""
-    matching = RuleReprMatching(rule_repr)
-    covering = RuleReprCovering(
-        env.action_set,
-        rule_repr,
-        classifier_factory=make_linear_prediction_classifier)
+    matching = make_rule_repr_matching(rule_repr)
+    covering = RuleReprCovering(env.action_set,
+                                rule_repr,
+                                classifier_factory=functools.partial(
+                                    make_linear_prediction_classifier,
+                                    hyperparams=hyperparams,
+                                    rng=rng),
+                                hyperparams=hyperparams,
+                                rng=rng)
     prediction = FitnessWeightedAvgPrediction(env.action_set)
-    action_selection = FixedEpsilonGreedy()
-    credit_assignment = XCSFLinearPredictionCreditAssignment()
-    fitness_update = XCSAccuracyFitnessUpdate()
-    subsumption = XCSSubsumption(rule_repr)
+    action_selection = FixedEpsilonGreedy(hyperparams, rng)
+    credit_assignment = XCSFLinearPredictionCreditAssignment(hyperparams)
+    fitness_update = XCSAccuracyFitnessUpdate(hyperparams)
+    subsumption = XCSSubsumption(rule_repr, hyperparams)
     rule_discovery = make_canonical_xcs_ga(env.action_set, rule_repr,
-                                           subsumption)
-    deletion = XCSRouletteWheelDeletion()
+                                           subsumption, hyperparams, rng)
+    deletion = XCSRouletteWheelDeletion(hyperparams, rng)
 
     components = XCSComponents(matching, covering, prediction,
                                action_selection, credit_assignment,
                                fitness_update, subsumption, rule_discovery,
                                deletion)
-    return _make_xcs(env.step_type, components, rule_repr, population)
+    return _make_xcs(env.step_type, components, rule_repr, population,
+                     hyperparams, rng)
 
 
 def make_custom_xcsf_from_canonical_base(env,
@@ -140,35 +185,42 @@ def make_custom_xcsf_from_canonical_base(env,
                                          fitness_update=None,
                                          subsumption=None,
                                          rule_discovery=None,
-                                         deletion=None):
+                                         deletion=None,
+                                         hyperparams=None,
+                                         rng=None):
     if matching is None:
-        matching = RuleReprMatching(rule_repr)
+        matching = make_rule_repr_matching(rule_repr)
     if covering is None:
-        covering = RuleReprCovering(
-            env.action_set,
-            rule_repr,
-            classifier_factory=make_linear_prediction_classifier)
+        covering = RuleReprCovering(env.action_set,
+                                    rule_repr,
+                                    classifier_factory=functools.partial(
+                                        make_linear_prediction_classifier,
+                                        hyperparams=hyperparams,
+                                        rng=rng),
+                                    hyperparams=hyperparams,
+                                    rng=rng)
     if prediction is None:
         prediction = FitnessWeightedAvgPrediction(env.action_set)
     if action_selection is None:
-        action_selection = FixedEpsilonGreedy()
+        action_selection = FixedEpsilonGreedy(hyperparams, rng)
     if credit_assignment is None:
-        credit_assignment = XCSFLinearPredictionCreditAssignment()
+        credit_assignment = XCSFLinearPredictionCreditAssignment(hyperparams)
     if fitness_update is None:
-        fitness_update = XCSAccuracyFitnessUpdate()
+        fitness_update = XCSAccuracyFitnessUpdate(hyperparams)
     if subsumption is None:
-        subsumption = XCSSubsumption(rule_repr)
+        subsumption = XCSSubsumption(rule_repr, hyperparams)
     if rule_discovery is None:
         rule_discovery = make_canonical_xcs_ga(env.action_set, rule_repr,
-                                               subsumption)
+                                               subsumption, hyperparams, rng)
     if deletion is None:
-        deletion = XCSRouletteWheelDeletion()
+        deletion = XCSRouletteWheelDeletion(hyperparams, rng)
 
     components = XCSComponents(matching, covering, prediction,
                                action_selection, credit_assignment,
                                fitness_update, subsumption, rule_discovery,
                                deletion)
-    return _make_xcs(env.step_type, components, rule_repr, population)
+    return _make_xcs(env.step_type, components, rule_repr, population,
+                     hyperparams, rng)
 
 
 def _make_xcs(env_step_type, *args, **kwargs):
@@ -185,8 +237,13 @@ def _make_xcs(env_step_type, *args, **kwargs):
 class XCSABC(LCS, metaclass=abc.ABCMeta):
     """Implementation of XCS, based on pseudocode given in 'An Algorithmic
     Description of XCS' (Butz and Wilson, 2002)."""
-    def __init__(self, components, rule_repr, population=None):
-        super().__init__(rule_repr, population)
+    def __init__(self,
+                 components,
+                 rule_repr,
+                 population=None,
+                 hyperparams=None,
+                 rng=None):
+        super().__init__(rule_repr, population, hyperparams, rng)
         self._init_component_strats(components)
         self._init_prev_step_tracking_attrs()
         self._init_curr_step_tracking_attrs()
@@ -221,6 +278,7 @@ class XCSABC(LCS, metaclass=abc.ABCMeta):
 
         Only represents a single iteration of the do-while loop in
         RUN EXPERIMENT, as the caller controls termination criteria."""
+        self._check_validation_level()
         self._situation = situation
         self._time_step = time_step
         self._match_set = self._gen_match_set(self._situation)
@@ -283,7 +341,7 @@ class XCSABC(LCS, metaclass=abc.ABCMeta):
         discovery step last."""
         self._do_credit_assignment(action_set, payoff, situation)
         self._update_fitness(action_set)
-        if get_hyperparam("do_as_subsumption"):
+        if self._hyperparams.do_as_subsumption:
             self._do_action_set_subsumption(action_set)
         if self._should_do_rule_discovery_in_action_set(action_set):
             self._discover_classifiers(action_set, self._population, situation,
@@ -292,61 +350,85 @@ class XCSABC(LCS, metaclass=abc.ABCMeta):
     def _do_action_set_subsumption(self, action_set):
         """DO ACTION SET SUBSUMPTION function from 'An Algorithmic Description
         of XCS' (Butz and Wilson, 2002).
+
+        The search for the most general classifier and its subsumees is done
+        by the subsumption strat (see ISubsumptionStrategy.find_subsumptions),
+        vectorised over the whole action set where the rule repr allows.
         """
-        most_general_classifier = \
-            self._find_most_general_classifier_in_action_set(action_set)
+        (most_general_classifier, subsumees) = \
+            self._subsumption_strat.find_subsumptions(action_set,
+                                                      self._population)
         self._perform_action_set_subsumptions(most_general_classifier,
-                                              action_set)
-
-    def _find_most_general_classifier_in_action_set(self, action_set):
-        most_general_classifier = None
-        for classifier in action_set:
-            if self._subsumption_strat.could_subsume(classifier):
-                if most_general_classifier is None or \
-                        self._subsumption_strat.is_more_general(
-                            classifier, most_general_classifier):
-                    most_general_classifier = classifier
-        return most_general_classifier
+                                              subsumees, action_set)
 
     def _perform_action_set_subsumptions(self, most_general_classifier,
-                                         action_set):
-        if most_general_classifier is not None:
-            # loop over copy of action set because possibly removing
-            # classifiers from it during loop
-            action_set_copy = copy.deepcopy(action_set)
-            for classifier in action_set_copy:
-                if self._subsumption_strat.is_more_general(
-                        most_general_classifier, classifier):
-                    logging.debug("Attempting to do an action set "
-                                  "subsumption.")
-                    logging.debug(f"Subsumer: {most_general_classifier}")
-                    logging.debug(f"Subsumee: {classifier}")
-                    action_set.remove(classifier)
-                    self._try_subsume_in_population(
-                        replacee=classifier, replacer=most_general_classifier)
-
-    def _try_subsume_in_population(self, replacee, replacer):
+                                         subsumees, action_set):
+        # subsumees are collected before removing any of them from the action
+        # set, then replaced in the population all at once
+        for subsumee in subsumees:
+            logging.debug("Attempting to do an action set subsumption.")
+            logging.debug(f"Subsumer: {most_general_classifier}")
+            logging.debug(f"Subsumee: {subsumee}")
+            action_set.remove(subsumee)
+        if len(subsumees) > 0:
+            self._try_subsume_in_population(
+                replacees=subsumees, replacer=most_general_classifier)
+
+    def _try_subsume_in_population(self, replacees, replacer):
         try:
-            self._population.replace(replacee,
-                                     replacer,
-                                     operation_label="as_subsumption")
+            replaced = self._population.replace_many(
+                replacees, replacer, operation_label="as_subsumption")
         except MemberNotFoundError:
             logging.debug("AS subsumption failure.")
         else:
-            logging.debug("AS subsumption success.")
+            num_failures = len(replacees) - len(replaced)
+            logging.debug(f"AS subsumption success ({len(replaced)} "
+                          f"replaced, {num_failures} failures).")
 
     def _should_do_rule_discovery_in_action_set(self, action_set):
-        mean_time_stamp_in_action_set = calc_summary_stat(
-            action_set, "mean", "time_stamp")
+        mean_time_stamp_in_action_set = \
+            action_set.time_stamp_sum / action_set.num_micros
         time_since_last_rule_discovery = self._time_step - \
             mean_time_stamp_in_action_set
         return time_since_last_rule_discovery > \
-            get_hyperparam("theta_ga") and self._did_explore
+            self._hyperparams.theta_ga and self._did_explore
 
     def test_query(self, situation):
+        self._check_validation_level()
         match_set = self._gen_match_set(situation)
         prediction_array = self._gen_prediction_array(match_set, situation)
-        return select_greedy_action(prediction_array)
+        return select_greedy_action(prediction_array, self._rng)
+
+    def test_query_batch(self, situations):
+        """Batched test_query() over the rows of the given 2-D array of
+        situations, see predict_array_batch()."""
+        return [
+            select_greedy_action(prediction_array, self._rng)
+            for prediction_array in self.predict_array_batch(situations)
+        ]
+
+    def predict_array_batch(self, situations):
+        """Returns the prediction arrays for the rows of the given 2-D array
+        of situations, matching the whole population against many situations
+        at once rather than building a match set per situation.
+
+        Requires the matching and prediction components to support batches
+        (i.e. have match_batch() / predict_batch() methods). Situations are
+        processed in chunks to bound the size of the intermediate
+        (situations x classifiers) arrays."""
+        self._check_validation_level()
+        situations = np.asarray(situations)
+        prediction_arrays = []
+        for chunk_start in range(0, len(situations), _BATCH_CHUNK_SIZE):
+            situations_chunk = \
+                situations[chunk_start:(chunk_start + _BATCH_CHUNK_SIZE)]
+            (classifiers, match_masks) = self._matching_strat.match_batch(
+                self._population, situations_chunk)
+            prediction_arrays.extend(
+                self._prediction_strat.predict_batch(classifiers,
+                                                     match_masks,
+                                                     situations_chunk))
+        return prediction_arrays
 
     # Private forwarding functions that do logging calls if needed
     def _gen_match_set(self, situation):
@@ -431,7 +513,8 @@ class MultiStepXCS(XCSABC):
 
     def _calc_discounted_payoff(self):
         max_prediction = max(self._prediction_array.values())
-        payoff = self._prev_reward + (get_hyperparam("gamma") * max_prediction)
+        payoff = self._prev_reward + \
+            (self._hyperparams.gamma * max_prediction)
         return payoff
 
     def _try_update_curr_action_set(self, env_response):
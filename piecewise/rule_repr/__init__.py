@@ -1,5 +1,7 @@
 from .discrete.discrete_rule_repr import DiscreteRuleRepr
+from .discrete.packed_binary_rule_repr import (PackedBinaryRuleRepr,
+                                               PackedTernaryGenotype)
 from .interval.min_percentage_rule_repr import (
     DiscereteMinSpanRuleRepr, make_continuous_min_percentage_rule_repr,
     make_discrete_min_span_rule_repr)
-from .rule_repr import IRuleRepr
+from .rule_repr import IRuleRepr, IVectorisedRuleRepr
@@ -1,15 +1,24 @@
+import numpy as np
+
 from piecewise.dtype import Condition, Genotype
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.lcs.rng import get_rng
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.lcs.rng import resolve_rng
+from piecewise.validation import checks_consistency
 
-from ..rule_repr import IRuleRepr
+from ..rule_repr import IRuleRepr, IVectorisedRuleRepr
 
 
-class DiscreteRuleRepr(IRuleRepr):
+class DiscreteRuleRepr(IRuleRepr, IVectorisedRuleRepr):
     """Rule representation that works with discrete (i.e. integer) inputs,
     storing a single discrete value for each allele in the condition genotype.
     """
     _WILDCARD_ALLELE = "#"
+    _ENCODED_WILDCARD_VAL = 0
+
+    def __init__(self, hyperparams=None, rng=None):
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
+        self._checks_consistency = checks_consistency()
 
     def does_match(self, condition, situation):
         """DOES MATCH function from 'An Algorithmic Description of XCS'
@@ -29,16 +38,19 @@ class DiscreteRuleRepr(IRuleRepr):
         """
         alleles = []
         for situation_elem in situation:
-            should_make_wildcard = get_rng().rand() < get_hyperparam(
-                "p_wildcard")
+            should_make_wildcard = \
+                self._rng.rand() < self._hyperparams.p_wildcard
             if should_make_wildcard:
                 alleles.append(self._WILDCARD_ALLELE)
             else:
                 # copy situation
                 alleles.append(situation_elem)
-        genotype = Genotype(alleles)
+        genotype = self._make_genotype(alleles)
         return Condition(genotype)
 
+    def _make_genotype(self, alleles):
+        return Genotype(alleles)
+
     def crossover_conditions(self, first_condition, second_condition,
                              crossover_strat):
         crossover_strat(first_condition.genotype, second_condition.genotype)
@@ -49,7 +61,7 @@ class DiscreteRuleRepr(IRuleRepr):
         genotype = condition.genotype
         for idx, (allele,
                   situation_elem) in enumerate(zip(genotype, situation)):
-            should_mutate_allele = get_rng().rand() < get_hyperparam("mu")
+            should_mutate_allele = self._rng.rand() < self._hyperparams.mu
             if should_mutate_allele:
                 if self._is_wildcard(allele):
                     genotype[idx] = situation_elem
@@ -64,7 +76,8 @@ class DiscreteRuleRepr(IRuleRepr):
             self._is_wildcard(allele) for allele in condition.genotype
         ].count(True)
         generality = num_wildcards / len(condition.genotype)
-        assert 0.0 <= generality <= 1.0
+        if self._checks_consistency:
+            assert 0.0 <= generality <= 1.0
         return generality
 
     def check_condition_subsumption(self, first_condition, second_condition):
@@ -77,3 +90,40 @@ class DiscreteRuleRepr(IRuleRepr):
 
     def map_genotype_to_phenotype(self, genotype):
         return tuple(genotype)
+
+    def encode_condition(self, condition):
+        """Encodes the condition as (values, care mask): wildcard alleles have
+        a False care mask entry (and a dummy value), all other alleles a True
+        entry and their value."""
+        genotype = condition.genotype
+        care_mask = np.array(
+            [not self._is_wildcard(allele) for allele in genotype],
+            dtype=bool)
+        values = np.array([
+            allele if care else self._ENCODED_WILDCARD_VAL
+            for (allele, care) in zip(genotype, care_mask)
+        ], dtype=np.int64)
+        return (values, care_mask)
+
+    def does_match_encoded(self, encoded_conditions, situation):
+        """Vectorised DOES MATCH: a condition matches if every allele it cares
+        about is equal to the corresponding situation element."""
+        (values, care_masks) = encoded_conditions
+        situation = np.asarray(situation)
+        return np.all((values == situation) | ~care_masks, axis=1)
+
+    def does_match_encoded_batch(self, encoded_conditions, situations):
+        (values, care_masks) = encoded_conditions
+        situations = np.asarray(situations)[:, np.newaxis, :]
+        return np.all((values == situations) | ~care_masks, axis=2)
+
+    def check_condition_subsumption_encoded(self, first_encoded_conditions,
+                                            second_encoded_conditions):
+        """Vectorised equivalent of check_condition_subsumption(): every
+        allele the first condition cares about must be cared about by the
+        second condition and have the same value."""
+        (first_values, first_care_masks) = first_encoded_conditions
+        (second_values, second_care_masks) = second_encoded_conditions
+        return np.all(~first_care_masks |
+                      (second_care_masks & (first_values == second_values)),
+                      axis=-1)
@@ -0,0 +1,260 @@
+import numpy as np
+
+from piecewise.dtype import Genotype
+from piecewise.dtype.slots import copy_attr_state
+from piecewise.validation import checks_consistency, register_checked_attr
+
+from .discrete_rule_repr import DiscreteRuleRepr
+
+_WORD_NUM_BITS = 64
+_WORD_MASK = (1 << _WORD_NUM_BITS) - 1
+
+
+def _popcount(mask):
+    return bin(mask).count("1")
+
+
+def _calc_num_words(num_bits):
+    return (num_bits + _WORD_NUM_BITS - 1) // _WORD_NUM_BITS
+
+
+class PackedTernaryGenotype(Genotype):
+    """Genotype of ternary (0, 1, #) alleles over binary inputs, stored as two
+    packed bitmasks rather than a list of alleles.
+
+    Bit i of the care mask is set iff allele i is not a wildcard, and bit i of
+    the value mask is set iff allele i is 1. Still behaves as a mutable
+    sequence of alleles, so crossover and mutation operators work on it
+    unchanged."""
+    __slots__ = ("_num_alleles", "_care_mask", "_value_mask")
+    WILDCARD_ALLELE = "#"
+
+    def __init__(self, alleles):
+        alleles = list(alleles)
+        self._num_alleles = len(alleles)
+        self._care_mask = 0
+        self._value_mask = 0
+        self._phenotype_cache = {}
+        for (idx, allele) in enumerate(alleles):
+            self._set_allele(idx, allele)
+
+    @property
+    def care_mask(self):
+        return self._care_mask
+
+    @property
+    def value_mask(self):
+        return self._value_mask
+
+    def clone(self):
+        # masks are ints, i.e. immutable, so nothing to copy other than attrs
+        clone = self.__class__.__new__(self.__class__)
+        copy_attr_state(self, clone, exclude=("_alleles", "_phenotype_cache"))
+        clone._phenotype_cache = {}
+        return clone
+
+    def _set_checked_allele(self, idx, allele):
+        assert allele == self.WILDCARD_ALLELE or allele == 0 or allele == 1
+        self._set_unchecked_allele(idx, allele)
+
+    def _set_unchecked_allele(self, idx, allele):
+        bit = 1 << idx
+        if allele == self.WILDCARD_ALLELE:
+            self._care_mask &= ~bit
+            self._value_mask &= ~bit
+        else:
+            self._care_mask |= bit
+            if allele == 1:
+                self._value_mask |= bit
+            else:
+                self._value_mask &= ~bit
+
+    # swapped for the unchecked version depending on the validation level,
+    # see register_checked_attr() call below
+    _set_allele = _set_checked_allele
+
+    def _get_allele(self, idx):
+        if not (self._care_mask >> idx) & 1:
+            return self.WILDCARD_ALLELE
+        else:
+            return (self._value_mask >> idx) & 1
+
+    def _normalise_idx(self, idx):
+        idx = int(idx)
+        if idx < 0:
+            idx += self._num_alleles
+        if not 0 <= idx < self._num_alleles:
+            raise IndexError("Genotype index out of range")
+        return idx
+
+    def count(self, allele_value):
+        num_cares = _popcount(self._care_mask)
+        if allele_value == self.WILDCARD_ALLELE:
+            return self._num_alleles - num_cares
+        elif allele_value == 1:
+            return _popcount(self._value_mask)
+        elif allele_value == 0:
+            return num_cares - _popcount(self._value_mask)
+        else:
+            return 0
+
+    def index_key(self):
+        return (self._num_alleles, self._care_mask, self._value_mask)
+
+    def probe_index_keys(self):
+        # equality is exact so only need to probe own key
+        return (self.index_key(), )
+
+    def __eq__(self, other):
+        if isinstance(other, PackedTernaryGenotype):
+            return self._care_mask == other._care_mask and \
+                self._value_mask == other._value_mask
+        else:
+            return all(my_allele == other_allele
+                       for (my_allele, other_allele) in zip(self, other))
+
+    def __setitem__(self, idx, value):
+        self._set_allele(self._normalise_idx(idx), value)
+        self._invalidate_phenotype_cache()
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            return tuple([self[i] for i in range(start, stop, step)])
+        else:
+            return self._get_allele(self._normalise_idx(key))
+
+    def __len__(self):
+        return self._num_alleles
+
+    def __iter__(self):
+        return (self._get_allele(idx) for idx in range(self._num_alleles))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(" f"{list(self)!r})"
+
+    def __str__(self):
+        return "(" + ", ".join([str(allele) for allele in self]) + ")"
+
+
+register_checked_attr(PackedTernaryGenotype, "_set_allele",
+                      PackedTernaryGenotype._set_checked_allele,
+                      PackedTernaryGenotype._set_unchecked_allele,
+                      checks_consistency)
+
+
+class PackedBinaryRuleRepr(DiscreteRuleRepr):
+    """Ternary rule representation specialised for binary inputs (e.g. the
+    discrete multiplexer), where conditions are stored as packed care / value
+    bitmasks (see PackedTernaryGenotype).
+
+    Matching, generality and subsumption become a handful of bitwise
+    operations on (arbitrary precision) ints rather than loops over alleles.
+    Covering, crossover and mutation are inherited unchanged from
+    DiscreteRuleRepr, so given the same rng state this repr evolves exactly
+    the same populations as DiscreteRuleRepr does.
+
+    For vectorised matching, conditions are encoded as arrays of uint64
+    words."""
+    def __init__(self, hyperparams=None, rng=None):
+        super().__init__(hyperparams, rng)
+        self._packed_situation_cache_key = None
+        self._packed_situation_cache_val = None
+
+    def _make_genotype(self, alleles):
+        return PackedTernaryGenotype(alleles)
+
+    def _situation_as_bits(self, situation):
+        bits = np.asarray(situation, dtype=np.uint8)
+        if self._checks_consistency:
+            assert np.all(bits <= 1)
+        return bits
+
+    def _pack_situation(self, situation):
+        """Packs the situation into an int with bit i set iff element i of the
+        situation is 1. The most recently packed situation is cached since
+        the same situation is matched against many conditions in a row."""
+        bits = self._situation_as_bits(situation)
+        cache_key = bits.tobytes()
+        if cache_key != self._packed_situation_cache_key:
+            packed_bytes = np.packbits(bits, bitorder="little").tobytes()
+            self._packed_situation_cache_val = \
+                int.from_bytes(packed_bytes, byteorder="little")
+            self._packed_situation_cache_key = cache_key
+        return self._packed_situation_cache_val
+
+    def does_match(self, condition, situation):
+        genotype = condition.genotype
+        situation_mask = self._pack_situation(situation)
+        return ((situation_mask ^ genotype.value_mask)
+                & genotype.care_mask) == 0
+
+    def calc_generality(self, condition):
+        genotype = condition.genotype
+        num_wildcards = len(genotype) - _popcount(genotype.care_mask)
+        generality = num_wildcards / len(genotype)
+        if self._checks_consistency:
+            assert 0.0 <= generality <= 1.0
+        return generality
+
+    def check_condition_subsumption(self, first_condition, second_condition):
+        first_genotype = first_condition.genotype
+        second_genotype = second_condition.genotype
+        first_cares_only_where_second_cares = \
+            (first_genotype.care_mask & ~second_genotype.care_mask) == 0
+        values_agree_where_first_cares = \
+            ((first_genotype.value_mask ^ second_genotype.value_mask)
+             & first_genotype.care_mask) == 0
+        return first_cares_only_where_second_cares and \
+            values_agree_where_first_cares
+
+    def encode_condition(self, condition):
+        """Encodes the condition as (value words, care words)."""
+        genotype = condition.genotype
+        num_words = _calc_num_words(len(genotype))
+        return (self._mask_to_words(genotype.value_mask, num_words),
+                self._mask_to_words(genotype.care_mask, num_words))
+
+    def _mask_to_words(self, mask, num_words):
+        return np.array([(mask >> (word_idx * _WORD_NUM_BITS)) & _WORD_MASK
+                         for word_idx in range(num_words)],
+                        dtype=np.uint64)
+
+    def does_match_encoded(self, encoded_conditions, situation):
+        (value_words, care_words) = encoded_conditions
+        situation_words = self._pack_situation_words(situation,
+                                                     value_words.shape[1])
+        return np.all(((situation_words ^ value_words) & care_words) == 0,
+                      axis=1)
+
+    def does_match_encoded_batch(self, encoded_conditions, situations):
+        (value_words, care_words) = encoded_conditions
+        num_words = value_words.shape[1]
+        situation_words = np.empty(shape=(len(situations), num_words),
+                                   dtype=np.uint64)
+        for (idx, situation) in enumerate(situations):
+            situation_words[idx] = \
+                self._pack_situation_words(situation, num_words)
+        situation_words = situation_words[:, np.newaxis, :]
+        return np.all(((situation_words ^ value_words) & care_words) == 0,
+                      axis=2)
+
+    def check_condition_subsumption_encoded(self, first_encoded_conditions,
+                                            second_encoded_conditions):
+        """Word-wise equivalent of check_condition_subsumption()."""
+        (first_value_words, first_care_words) = first_encoded_conditions
+        (second_value_words, second_care_words) = second_encoded_conditions
+        first_cares_only_where_second_cares = \
+            (first_care_words & ~second_care_words) == 0
+        values_agree_where_first_cares = \
+            ((first_value_words ^ second_value_words) & first_care_words) == 0
+        return np.all(first_cares_only_where_second_cares
+                      & values_agree_where_first_cares,
+                      axis=-1)
+
+    def _pack_situation_words(self, situation, num_words):
+        bits = self._situation_as_bits(situation)
+        padded_bits = np.zeros(shape=(num_words * _WORD_NUM_BITS),
+                               dtype=np.uint8)
+        padded_bits[:len(bits)] = bits
+        return np.packbits(padded_bits, bitorder="little").view("<u8")
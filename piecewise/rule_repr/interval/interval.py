@@ -1,12 +1,21 @@
 import abc
 
+from piecewise.validation import checks_consistency, register_checked_attr
+
 
 class IntervalABC(metaclass=abc.ABCMeta):
-    def __init__(self, lower, upper):
+    def _init_checked(self, lower, upper):
         assert lower <= upper
+        self._init_unchecked(lower, upper)
+
+    def _init_unchecked(self, lower, upper):
         self._lower = lower
         self._upper = upper
 
+    # swapped for the unchecked version depending on the validation level,
+    # see register_checked_attr() call below
+    __init__ = _init_checked
+
     @property
     def lower(self):
         return self._lower
@@ -30,13 +39,23 @@ class IntervalABC(metaclass=abc.ABCMeta):
         return f"[{self._lower}, {self._upper}]"
 
 
+register_checked_attr(IntervalABC, "__init__", IntervalABC._init_checked,
+                      IntervalABC._init_unchecked, checks_consistency)
+
+
 class DiscreteInterval(IntervalABC):
     def num_vals_covered(self):
         return (self._upper - self._lower) + 1
 
 
 class ContinuousInterval(IntervalABC):
-    def fraction_covered_by(self, other_interval):
+    def _calc_checked_fraction_covered_by(self, other_interval):
+        cover_fraction = \
+            self._calc_unchecked_fraction_covered_by(other_interval)
+        assert 0.0 <= cover_fraction <= 1.0
+        return cover_fraction
+
+    def _calc_unchecked_fraction_covered_by(self, other_interval):
         """Returns the fraction of *this* interval that is covered *by the
         other interval*.
 
@@ -48,7 +67,15 @@ class ContinuousInterval(IntervalABC):
         # (so that other interval falls within this interval)
         other_lower_trunc = max(other_interval._lower, self._lower)
         other_upper_trunc = min(other_interval._upper, self._upper)
-        cover_fraction = (other_upper_trunc - other_lower_trunc) / \
+        return (other_upper_trunc - other_lower_trunc) / \
             (self._upper - self._lower)
-        assert 0.0 <= cover_fraction <= 1.0
-        return cover_fraction
+
+    # swapped for the unchecked version depending on the validation level,
+    # see register_checked_attr() call below
+    fraction_covered_by = _calc_checked_fraction_covered_by
+
+
+register_checked_attr(ContinuousInterval, "fraction_covered_by",
+                      ContinuousInterval._calc_checked_fraction_covered_by,
+                      ContinuousInterval._calc_unchecked_fraction_covered_by,
+                      checks_consistency)
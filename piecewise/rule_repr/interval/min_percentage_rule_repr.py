@@ -1,29 +1,55 @@
 import abc
 
+import numpy as np
+
 from piecewise.dtype import Condition, Genotype
-from piecewise.lcs.hyperparams import get_hyperparam
-from piecewise.lcs.rng import get_rng
+from piecewise.lcs.hyperparams import resolve_hyperparams
+from piecewise.lcs.rng import resolve_rng
 from piecewise.util import truncate_val
+from piecewise.validation import checks_consistency
 
-from ..rule_repr import IRuleRepr
+from ..rule_repr import IRuleRepr, IVectorisedRuleRepr
 from .interval import ContinuousInterval, DiscreteInterval
 
 
-def make_continuous_min_percentage_rule_repr(env):
-    return ContinuousMinPercentageRuleRepr(situation_space=env.obs_space)
+def make_continuous_min_percentage_rule_repr(env, hyperparams=None, rng=None):
+    return ContinuousMinPercentageRuleRepr(situation_space=env.obs_space,
+                                           hyperparams=hyperparams,
+                                           rng=rng)
 
 
-def make_discrete_min_span_rule_repr(env):
-    return DiscereteMinSpanRuleRepr(situation_space=env.obs_space)
+def make_discrete_min_span_rule_repr(env, hyperparams=None, rng=None):
+    return DiscereteMinSpanRuleRepr(situation_space=env.obs_space,
+                                    hyperparams=hyperparams,
+                                    rng=rng)
 
 
-class MinSpanRuleReprABC(IRuleRepr, metaclass=abc.ABCMeta):
-    def __init__(self, situation_space, interval_cls):
+class MinSpanRuleReprABC(IRuleRepr,
+                         IVectorisedRuleRepr,
+                         metaclass=abc.ABCMeta):
+    def __init__(self,
+                 situation_space,
+                 interval_cls,
+                 hyperparams=None,
+                 rng=None):
         self._situation_space = situation_space
         self._interval_cls = interval_cls
+        self._hyperparams = resolve_hyperparams(hyperparams)
+        self._rng = resolve_rng(rng)
+        self._checks_consistency = checks_consistency()
         self._wildcard_intervals = \
             self._create_wildcard_intervals(self._situation_space,
                                             self._interval_cls)
+        self._wildcard_lowers = np.array(
+            [interval.lower for interval in self._wildcard_intervals],
+            dtype=np.float64)
+        self._wildcard_uppers = np.array(
+            [interval.upper for interval in self._wildcard_intervals],
+            dtype=np.float64)
+
+    @property
+    def situation_space(self):
+        return self._situation_space
 
     def _create_wildcard_intervals(self, situation_space, interval_cls):
         return tuple([
@@ -38,6 +64,42 @@ class MinSpanRuleReprABC(IRuleRepr, metaclass=abc.ABCMeta):
                 return False
         return True
 
+    def encode_condition(self, condition):
+        """Encodes the condition as the (lower bounds, upper bounds) of its
+        phenotype intervals."""
+        phenotype = condition.phenotype(self)
+        lowers = np.array([interval.lower for interval in phenotype],
+                          dtype=np.float64)
+        uppers = np.array([interval.upper for interval in phenotype],
+                          dtype=np.float64)
+        return (lowers, uppers)
+
+    def does_match_encoded(self, encoded_conditions, situation):
+        """Vectorised equivalent of does_match(): a condition matches if each
+        of its intervals contains the corresponding situation element."""
+        (lowers, uppers) = encoded_conditions
+        situation = np.asarray(situation)
+        return np.all((lowers <= situation) & (situation <= uppers), axis=1)
+
+    def does_match_encoded_batch(self, encoded_conditions, situations):
+        (lowers, uppers) = encoded_conditions
+        situations = np.asarray(situations)[:, np.newaxis, :]
+        return np.all((lowers <= situations) & (situations <= uppers),
+                      axis=2)
+
+    def check_condition_subsumption_encoded(self, first_encoded_conditions,
+                                            second_encoded_conditions):
+        """Vectorised equivalent of check_condition_subsumption(): each
+        interval of the first condition must either be a wildcard or contain
+        the corresponding interval of the second condition."""
+        (first_lowers, first_uppers) = first_encoded_conditions
+        (second_lowers, second_uppers) = second_encoded_conditions
+        first_is_wildcard = (first_lowers <= self._wildcard_lowers) & \
+            (first_uppers >= self._wildcard_uppers)
+        first_contains_second = (first_lowers <= second_lowers) & \
+            (first_uppers >= second_uppers)
+        return np.all(first_is_wildcard | first_contains_second, axis=-1)
+
     @abc.abstractmethod
     def gen_covering_condition(self, situation):
         raise NotImplementedError
@@ -93,16 +155,19 @@ class ContinuousMinPercentageRuleRepr(MinSpanRuleReprABC):
     _MIN_FRAC_TO_UPPER_VAL = 0.0
     _MAX_FRAC_TO_UPPER_VAL = 1.0
 
-    def __init__(self, situation_space):
-        super().__init__(situation_space, interval_cls=ContinuousInterval)
+    def __init__(self, situation_space, hyperparams=None, rng=None):
+        super().__init__(situation_space,
+                         interval_cls=ContinuousInterval,
+                         hyperparams=hyperparams,
+                         rng=rng)
 
     def gen_covering_condition(self, situation):
         alleles = []
         for (idx, situation_elem) in enumerate(situation):
-            lower = situation_elem - get_rng().uniform(
-                0, get_hyperparam("s_nought"))
-            upper = situation_elem + get_rng().uniform(
-                0, get_hyperparam("s_nought"))
+            lower = situation_elem - self._rng.uniform(
+                0, self._hyperparams.s_nought)
+            upper = situation_elem + self._rng.uniform(
+                0, self._hyperparams.s_nought)
             dimension = self._situation_space[idx]
             lower = truncate_val(lower,
                                  lower_bound=dimension.lower,
@@ -110,7 +175,8 @@ class ContinuousMinPercentageRuleRepr(MinSpanRuleReprABC):
             upper = truncate_val(upper,
                                  lower_bound=dimension.lower,
                                  upper_bound=dimension.upper)
-            assert lower <= upper
+            if self._checks_consistency:
+                assert lower <= upper
             frac_to_upper = self._calc_frac_to_upper(lower, upper,
                                                      dimension.upper)
             alleles.append(lower)
@@ -120,11 +186,13 @@ class ContinuousMinPercentageRuleRepr(MinSpanRuleReprABC):
 
     def _calc_frac_to_upper(self, lower, upper, dimension_upper):
         frac_to_upper = (upper - lower) / (dimension_upper - lower)
-        assert 0.0 <= frac_to_upper <= 1.0
+        if self._checks_consistency:
+            assert 0.0 <= frac_to_upper <= 1.0
         return frac_to_upper
 
     def _enforce_genotype_maps_to_valid_phenotype(self, genotype):
-        assert len(genotype) % 2 == 0
+        if self._checks_consistency:
+            assert len(genotype) % 2 == 0
         self._truncate_lower_alleles(genotype)
         self._truncate_frac_to_upper_alleles(genotype)
 
@@ -140,25 +208,48 @@ class ContinuousMinPercentageRuleRepr(MinSpanRuleReprABC):
     def mutate_condition(self, condition, situation=None):
         genotype = condition.genotype
         for allele_idx in range(len(genotype)):
-            should_mutate = get_rng().rand() < get_hyperparam("mu")
+            should_mutate = self._rng.rand() < self._hyperparams.mu
             if should_mutate:
-                mutation_magnitude = get_rng().uniform(0, get_hyperparam("m"))
-                mutation_sign = get_rng().choice([1, -1])
+                mutation_magnitude = self._rng.uniform(0, self._hyperparams.m)
+                mutation_sign = self._rng.choice([1, -1])
                 mutation_amount = mutation_magnitude * mutation_sign
                 genotype[allele_idx] += mutation_amount
         self._enforce_genotype_maps_to_valid_phenotype(genotype)
 
     def calc_generality(self, condition):
         phenotype = condition.phenotype(self)
-        assert len(phenotype) == len(self._wildcard_intervals)
+        if self._checks_consistency:
+            assert len(phenotype) == len(self._wildcard_intervals)
         cover_fractions = \
             [wildcard_interval.fraction_covered_by(phenotype_interval) for
                 (wildcard_interval, phenotype_interval) in
                 zip(self._wildcard_intervals, phenotype)]
         generality = sum(cover_fractions) / len(phenotype)
-        assert 0.0 <= generality <= 1.0
+        if self._checks_consistency:
+            assert 0.0 <= generality <= 1.0
         return generality
 
+    def calc_generality_batch(self, conditions):
+        """Vectorised calc_generality() over the encoded conditions. Cover
+        fractions are summed one dimension at a time, in the same order as
+        calc_generality() sums them, so the results are identical."""
+        num_dims = len(self._wildcard_intervals)
+        generalities = np.zeros(len(conditions), dtype=np.float64)
+        if len(conditions) == 0:
+            return generalities
+        (lowers, uppers) = self.encode_conditions(conditions)
+        dim_lowers = self._wildcard_lowers
+        dim_uppers = self._wildcard_uppers
+        cover_fractions = \
+            (np.minimum(uppers, dim_uppers) - np.maximum(lowers, dim_lowers)) \
+            / (dim_uppers - dim_lowers)
+        for dim_idx in range(num_dims):
+            generalities += cover_fractions[:, dim_idx]
+        generalities /= num_dims
+        if self._checks_consistency:
+            assert np.all((0.0 <= generalities) & (generalities <= 1.0))
+        return generalities
+
     def map_genotype_to_phenotype(self, genotype):
         phenotype = []
         for lower_allele_idx in range(0, len(genotype), 2):
@@ -169,8 +260,9 @@ class ContinuousMinPercentageRuleRepr(MinSpanRuleReprABC):
             dimension = self._situation_space[situation_space_idx]
             interval = self._make_phenotype_interval_from_alleles(
                 lower_allele, frac_to_upper_allele, dimension)
-            assert dimension.lower <= interval.lower <= dimension.upper
-            assert dimension.lower <= interval.upper <= dimension.upper
+            if self._checks_consistency:
+                assert dimension.lower <= interval.lower <= dimension.upper
+                assert dimension.lower <= interval.upper <= dimension.upper
             phenotype.append(interval)
         return tuple(phenotype)
 
@@ -192,18 +284,22 @@ class DiscereteMinSpanRuleRepr(MinSpanRuleReprABC):
     genotype in discrete space."""
     _MIN_SPAN_TO_UPPER_VAL = 0
 
-    def __init__(self, situation_space):
-        super().__init__(situation_space, interval_cls=DiscreteInterval)
+    def __init__(self, situation_space, hyperparams=None, rng=None):
+        super().__init__(situation_space,
+                         interval_cls=DiscreteInterval,
+                         hyperparams=hyperparams,
+                         rng=rng)
 
     def gen_covering_condition(self, situation):
         alleles = []
         for (idx, situation_elem) in enumerate(situation):
             # covering draws from [0, r_nought]
-            r_nought = get_hyperparam("r_nought")
-            assert r_nought >= 0
+            r_nought = self._hyperparams.r_nought
+            if self._checks_consistency:
+                assert r_nought >= 0
             cover_choices = range(0, (r_nought+1))
-            lower = situation_elem - get_rng().choice(cover_choices)
-            upper = situation_elem + get_rng().choice(cover_choices)
+            lower = situation_elem - self._rng.choice(cover_choices)
+            upper = situation_elem + self._rng.choice(cover_choices)
             dimension = self._situation_space[idx]
             lower = truncate_val(lower,
                                  lower_bound=dimension.lower,
@@ -211,7 +307,8 @@ class DiscereteMinSpanRuleRepr(MinSpanRuleReprABC):
             upper = truncate_val(upper,
                                  lower_bound=dimension.lower,
                                  upper_bound=dimension.upper)
-            assert lower <= upper
+            if self._checks_consistency:
+                assert lower <= upper
             span_to_upper = self._calc_span_to_upper(lower, upper, dimension)
             alleles.append(lower)
             alleles.append(span_to_upper)
@@ -223,12 +320,14 @@ class DiscereteMinSpanRuleRepr(MinSpanRuleReprABC):
         # NOT a fraction
         span_to_upper = upper - lower
         max_span_to_upper_val = dimension.upper - dimension.lower
-        assert self._MIN_SPAN_TO_UPPER_VAL <= span_to_upper <= \
-            max_span_to_upper_val
+        if self._checks_consistency:
+            assert self._MIN_SPAN_TO_UPPER_VAL <= span_to_upper <= \
+                max_span_to_upper_val
         return span_to_upper
 
     def _enforce_genotype_maps_to_valid_phenotype(self, genotype):
-        assert len(genotype) % 2 == 0
+        if self._checks_consistency:
+            assert len(genotype) % 2 == 0
         self._truncate_lower_alleles(genotype)
         self._truncate_span_to_upper_alleles(genotype)
 
@@ -250,21 +349,23 @@ class DiscereteMinSpanRuleRepr(MinSpanRuleReprABC):
     def mutate_condition(self, condition, situation=None):
         genotype = condition.genotype
         for allele_idx in range(len(genotype)):
-            should_mutate = get_rng().rand() < get_hyperparam("mu")
+            should_mutate = self._rng.rand() < self._hyperparams.mu
             if should_mutate:
                 # mutation draws from +-(0, m_nought]
-                m_nought = get_hyperparam("m_nought")
-                assert m_nought >= 1
+                m_nought = self._hyperparams.m_nought
+                if self._checks_consistency:
+                    assert m_nought >= 1
                 mut_choices = range(1, (m_nought+1))
-                mutation_magnitude = get_rng().choice(mut_choices)
-                mutation_sign = get_rng().choice([1, -1])
+                mutation_magnitude = self._rng.choice(mut_choices)
+                mutation_sign = self._rng.choice([1, -1])
                 mutation_amount = mutation_magnitude * mutation_sign
                 genotype[allele_idx] += mutation_amount
         self._enforce_genotype_maps_to_valid_phenotype(genotype)
 
     def calc_generality(self, condition):
         phenotype = condition.phenotype(self)
-        assert len(phenotype) == len(self._wildcard_intervals)
+        if self._checks_consistency:
+            assert len(phenotype) == len(self._wildcard_intervals)
         phenotype_interval_coverages = \
             [phenotype_interval.num_vals_covered() for phenotype_interval in
                 phenotype]
@@ -273,7 +374,8 @@ class DiscereteMinSpanRuleRepr(MinSpanRuleReprABC):
                 self._wildcard_intervals]
         generality = sum(phenotype_interval_coverages) / \
             sum(wildcard_interval_coverages)
-        assert 0.0 < generality <= 1.0
+        if self._checks_consistency:
+            assert 0.0 < generality <= 1.0
         return generality
 
     def map_genotype_to_phenotype(self, genotype):
@@ -286,8 +388,9 @@ class DiscereteMinSpanRuleRepr(MinSpanRuleReprABC):
             dimension = self._situation_space[situation_space_idx]
             interval = self._make_phenotype_interval_from_alleles(
                 lower_allele, span_to_upper_allele)
-            assert dimension.lower <= interval.lower <= dimension.upper
-            assert dimension.lower <= interval.upper <= dimension.upper
+            if self._checks_consistency:
+                assert dimension.lower <= interval.lower <= dimension.upper
+                assert dimension.lower <= interval.upper <= dimension.upper
             phenotype.append(interval)
         return tuple(phenotype)
 
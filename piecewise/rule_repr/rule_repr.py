@@ -1,5 +1,7 @@
 import abc
 
+import numpy as np
+
 
 class IRuleRepr(metaclass=abc.ABCMeta):
     """Interface for rule representations."""
@@ -34,6 +36,15 @@ class IRuleRepr(metaclass=abc.ABCMeta):
         """Returns the generality of the condition as a fraction."""
         raise NotImplementedError
 
+    def calc_generality_batch(self, conditions):
+        """Returns array of the generalities of the given conditions.
+
+        By default calculates the generality of each condition in turn; rule
+        reprs can override this to calculate them all at once."""
+        return np.array(
+            [self.calc_generality(condition) for condition in conditions],
+            dtype=np.float64)
+
     @abc.abstractmethod
     def check_condition_subsumption(self, first_condition, second_condition):
         """Determines if the first condition logically subsumes the
@@ -45,3 +56,61 @@ class IRuleRepr(metaclass=abc.ABCMeta):
         """Converts the given genotype to its
         representation in phenotype space."""
         raise NotImplementedError
+
+
+class IVectorisedRuleRepr(metaclass=abc.ABCMeta):
+    """Interface for rule representations whose conditions can be encoded as
+    fixed-width numeric rows, so that many conditions can be operated on at
+    once (see piecewise.dtype.ConditionMatrix)."""
+    @abc.abstractmethod
+    def encode_condition(self, condition):
+        """Returns a tuple of 1-D arrays encoding the given condition.
+
+        Every condition must be encoded as a tuple of the same length, with
+        each element having the same length and dtype across conditions."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def does_match_encoded(self, encoded_conditions, situation):
+        """Given a tuple of 2-D arrays (one row per condition, each array
+        formed by stacking the corresponding elements of encode_condition()
+        results), returns a boolean array indicating which conditions match
+        the situation."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def check_condition_subsumption_encoded(self, first_encoded_conditions,
+                                            second_encoded_conditions):
+        """Vectorised equivalent of check_condition_subsumption(): returns a
+        boolean array indicating whether each first condition subsumes the
+        corresponding second condition.
+
+        Each arg is either a single encoded condition (tuple of 1-D arrays,
+        as returned by encode_condition()) or many stacked encoded conditions
+        (tuple of 2-D arrays, see encode_conditions()); a single condition is
+        broadcast against many, so one candidate subsumer can be checked
+        against a whole classifier set at once (and vice versa)."""
+        raise NotImplementedError
+
+    def encode_conditions(self, conditions):
+        """Returns a tuple of 2-D arrays encoding the given conditions, one
+        row per condition, formed by stacking the corresponding elements of
+        encode_condition() results."""
+        encoded_conditions = \
+            [self.encode_condition(condition) for condition in conditions]
+        return tuple(
+            [np.stack(arrays) for arrays in zip(*encoded_conditions)])
+
+    def does_match_encoded_batch(self, encoded_conditions, situations):
+        """Batched does_match_encoded(): returns a 2-D boolean array with one
+        row per situation, indicating which conditions match that situation.
+
+        By default matches each situation in turn; rule reprs can override
+        this to match all situations at once."""
+        num_conditions = len(encoded_conditions[0])
+        match_masks = np.empty(shape=(len(situations), num_conditions),
+                               dtype=bool)
+        for (idx, situation) in enumerate(situations):
+            match_masks[idx] = \
+                self.does_match_encoded(encoded_conditions, situation)
+        return match_masks
@@ -0,0 +1,137 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from piecewise.dtype import (Classifier, Condition, Genotype, Population,
+                             Rule)
+from piecewise.lcs.component import (CachedMatching, RuleReprMatching,
+                                     VectorisedRuleReprMatching)
+from piecewise.rule_repr import DiscreteRuleRepr
+
+NUM_FEATURES = 4
+NUM_CLASSIFIERS = 30
+
+
+def _make_classifier(alleles, action=0):
+    condition = Condition(Genotype(alleles))
+    rule = Rule(condition, action, num_features=len(alleles))
+    return Classifier(rule, prediction=0.0, error=0.0, fitness=0.0,
+                      time_stamp=0)
+
+
+@pytest.fixture
+def rule_repr():
+    return DiscreteRuleRepr()
+
+
+@pytest.fixture
+def np_random():
+    return np.random.RandomState(0)
+
+
+@pytest.fixture
+def population(np_random):
+    population = Population(max_micros=NUM_CLASSIFIERS * 2)
+    for _ in range(NUM_CLASSIFIERS):
+        population.add(_make_classifier(_gen_alleles(np_random)))
+    return population
+
+
+def _gen_alleles(np_random):
+    alleles = ("#", 0, 1)
+    return [alleles[idx] for idx in np_random.randint(3, size=NUM_FEATURES)]
+
+
+def _all_situations():
+    return list(itertools.product(range(2), repeat=NUM_FEATURES))
+
+
+def _assert_same_match_sets(cached_matching, reference_matching,
+                            population):
+    for situation in _all_situations():
+        expected = list(reference_matching(population, situation))
+        actual = list(cached_matching(population, situation))
+        assert len(expected) == len(actual)
+        assert all(first is second
+                   for (first, second) in zip(expected, actual))
+
+
+class TestCachedMatching:
+    @pytest.mark.parametrize("use_vectorised_base", [False, True])
+    def test_stays_in_sync_with_population(self, rule_repr, population,
+                                           np_random, use_vectorised_base):
+        base_matching = VectorisedRuleReprMatching(rule_repr) \
+            if use_vectorised_base else None
+        cached_matching = CachedMatching(rule_repr, base_matching)
+        reference_matching = RuleReprMatching(rule_repr)
+        _assert_same_match_sets(cached_matching, reference_matching,
+                                population)
+
+        members = list(population)
+        for classifier in members[::3]:
+            population.remove(classifier)
+        for _ in range(5):
+            population.add(_make_classifier(_gen_alleles(np_random)))
+        # re-adding moves a classifier to the end of the population
+        population.add(members[0])
+        population.duplicate(members[1])
+        _assert_same_match_sets(cached_matching, reference_matching,
+                                population)
+
+    @pytest.mark.parametrize("use_vectorised_base", [False, True])
+    def test_genotype_change_forces_rematch(self, rule_repr, population,
+                                            use_vectorised_base):
+        base_matching = VectorisedRuleReprMatching(rule_repr) \
+            if use_vectorised_base else None
+        cached_matching = CachedMatching(rule_repr, base_matching)
+        reference_matching = RuleReprMatching(rule_repr)
+        _assert_same_match_sets(cached_matching, reference_matching,
+                                population)
+        classifier = list(population)[0]
+        for idx in range(NUM_FEATURES):
+            classifier.condition.genotype[idx] = "#"
+        population.notify_genotype_changed(classifier)
+        _assert_same_match_sets(cached_matching, reference_matching,
+                                population)
+
+    def test_only_new_members_matched_on_hit(self, rule_repr, population,
+                                             mocker):
+        cached_matching = CachedMatching(rule_repr)
+        situation = (0, ) * NUM_FEATURES
+        cached_matching(population, situation)
+        population.add(_make_classifier(["#"] * NUM_FEATURES))
+        spy = mocker.spy(rule_repr, "does_match")
+        match_set = cached_matching(population, situation)
+        assert spy.call_count == 1
+        assert list(match_set)[-1] is list(population)[-1]
+
+    def test_evicts_least_recently_used(self, rule_repr, population, mocker):
+        cached_matching = CachedMatching(rule_repr, max_cache_size=2)
+        (first, second, third) = _all_situations()[:3]
+        cached_matching(population, first)
+        cached_matching(population, second)
+        cached_matching(population, first)
+        cached_matching(population, third)
+        spy = mocker.spy(rule_repr, "does_match")
+        cached_matching(population, first)
+        assert spy.call_count == 0
+        cached_matching(population, second)
+        assert spy.call_count == NUM_CLASSIFIERS
+
+    def test_removed_classifiers_not_kept_alive(self, rule_repr, population):
+        cached_matching = CachedMatching(rule_repr)
+        for situation in _all_situations():
+            cached_matching(population, situation)
+        removed = list(population)[::2]
+        for classifier in removed:
+            population.remove(classifier)
+        cached_members = [
+            classifier for (_, matching) in cached_matching._cache.values()
+            for classifier in matching.values()
+        ]
+        assert len(cached_members) > 0
+        assert not any(member is classifier for member in cached_members
+                       for classifier in removed)
+        assert all(id(classifier) not in cached_matching._keys_by_member
+                   for classifier in removed)
@@ -1,9 +1,15 @@
+import copy
+import pickle
+
+import numpy as np
 import pytest
 
-from piecewise.dtype import Classifier
+from piecewise.dtype import (Classifier, Condition, Genotype,
+                             LinearPredictionClassifier, Rule)
 from piecewise.dtype.classifier import (ACTION_SET_SIZE_MIN, EXPERIENCE_MIN,
                                         NUMEROSITY_MIN, TIME_STAMP_MIN)
 from piecewise.error.classifier_error import AttrUpdateError
+from piecewise.fuzzy.classifier import FuzzyClassifier
 
 # make sure default numeric attr val is valid (prediction, error, fitness are
 # reals and can be anything, but time_stamp is int and has a minimum value)
@@ -111,6 +117,112 @@ class TestClassifier:
         classifier = make_classifier()
         diff_numeric_attr_classifier = make_classifier()
 
-        setattr(diff_numeric_attr_classifier, attr_to_alter,
-                ALT_NUMERIC_ATTR_VAL)
+        if attr_to_alter == "prediction":
+            # prediction is read-only, written through set_prediction()
+            diff_numeric_attr_classifier.set_prediction(ALT_NUMERIC_ATTR_VAL)
+        else:
+            setattr(diff_numeric_attr_classifier, attr_to_alter,
+                    ALT_NUMERIC_ATTR_VAL)
         assert classifier != diff_numeric_attr_classifier
+
+
+def _make_rule(alleles):
+    return Rule(Condition(Genotype(alleles)), action=0,
+                num_features=len(alleles))
+
+
+class TestClassifierClone:
+    def test_clone_resets_numerosity_and_experience(self):
+        classifier = Classifier(_make_rule([0, "#"]),
+                                prediction=10.0,
+                                error=1.0,
+                                fitness=0.5,
+                                time_stamp=3)
+        classifier.numerosity = 3
+        classifier.experience = 7
+        clone = classifier.clone()
+        assert clone.numerosity == NUMEROSITY_MIN
+        assert clone.experience == EXPERIENCE_MIN
+        clone.numerosity = classifier.numerosity
+        clone.experience = classifier.experience
+        assert clone == classifier
+
+    def test_clone_rule_is_independent(self):
+        classifier = Classifier(_make_rule([0, "#"]),
+                                prediction=10.0,
+                                error=1.0,
+                                fitness=0.5,
+                                time_stamp=3)
+        clone = classifier.clone()
+        clone.condition.genotype[0] = 1
+        clone.action = 1
+        assert list(classifier.condition.genotype) == [0, "#"]
+        assert classifier.action == 0
+
+    def test_linear_prediction_clone_is_independent(self):
+        classifier = LinearPredictionClassifier(_make_rule([0.5, 1.0]),
+                                                error=1.0,
+                                                fitness=0.5,
+                                                time_stamp=3,
+                                                x_nought=1.0,
+                                                delta_rls=1.0,
+                                                rng=np.random.RandomState(0))
+        clone = classifier.clone()
+        assert clone == classifier
+        clone.weight_vec[0] = 1.0
+        clone.cov_mat[0, 0] = 2.0
+        assert classifier.weight_vec[0] == 0.0
+        assert classifier.cov_mat[0, 0] == 1.0
+
+
+class TestClassifierMergeParams:
+    def test_linear_prediction_merge_params(self):
+        classifiers = []
+        for (time_stamp, weight, numerosity) in [(3, 1.0, 1), (5, 3.0, 3)]:
+            classifier = LinearPredictionClassifier(
+                _make_rule([0.5, 1.0]),
+                error=float(weight),
+                fitness=0.5,
+                time_stamp=time_stamp,
+                x_nought=1.0,
+                delta_rls=1.0,
+                rng=np.random.RandomState(0))
+            classifier.weight_vec[:] = [weight] * 3
+            classifier.numerosity = numerosity
+            classifier.experience = time_stamp
+            classifiers.append(classifier)
+        (keeper, other) = classifiers
+        keeper.merge_params([other])
+        assert keeper.weight_vec == pytest.approx([2.5] * 3)
+        assert keeper.error == pytest.approx(2.5)
+        assert keeper.fitness == pytest.approx(1.0)
+        assert keeper.experience == 5
+        assert keeper.time_stamp == 5
+        # numerosity is left for the population to update
+        assert keeper.numerosity == 1
+
+
+class TestClassifierSlots:
+    def test_no_instance_dicts(self):
+        rule = _make_rule([0, "#"])
+        classifiers = (Classifier(rule, 10.0, 1.0, 0.5, 3),
+                       FuzzyClassifier(rule, 10.0, 1.0, 0.5, 3))
+        for obj in (*classifiers, rule, rule.condition,
+                    rule.condition.genotype):
+            assert not hasattr(obj, "__dict__")
+            with pytest.raises(AttributeError):
+                obj.unknown_attr = 1
+
+    def test_pickle_and_deepcopy(self):
+        classifier = Classifier(_make_rule([0, "#"]),
+                                prediction=10.0,
+                                error=1.0,
+                                fitness=0.5,
+                                time_stamp=3)
+        classifier.numerosity = 2
+        classifier.condition.genotype.phenotype_cache["rule_repr"] = None
+        for copied in (pickle.loads(pickle.dumps(classifier)),
+                       copy.deepcopy(classifier)):
+            assert copied == classifier
+            assert copied.numerosity == 2
+            assert copied.condition.genotype.phenotype_cache == {}
@@ -1,6 +1,10 @@
+import copy
+import math
+
 import pytest
 
-from piecewise.dtype import ClassifierSet
+from piecewise.dtype import (Classifier, ClassifierSet, Condition, Genotype,
+                             Population, Rule)
 from piecewise.error.classifier_set_error import MemberNotFoundError
 
 
@@ -101,13 +105,13 @@ class TestClassifierSetBaseViaClassifierSet:
 class TestClassifierSet:
     def test_add_microclassifier(self, classifier_set, mock_microclassifier):
         classifier_set.add(mock_microclassifier)
-        assert classifier_set._members[-1] == mock_microclassifier
+        assert list(classifier_set)[-1] == mock_microclassifier
 
     def test_add_macroclassifier(self, classifier_set,
                                  make_mock_macroclassifier):
         mock_macroclassifier = make_mock_macroclassifier(numerosity=2)
         classifier_set.add(mock_macroclassifier)
-        assert classifier_set._members[-1] == mock_macroclassifier
+        assert list(classifier_set)[-1] == mock_macroclassifier
 
     def test_remove_microclassifier(self, classifier_set,
                                     mock_microclassifier):
@@ -129,3 +133,141 @@ class TestClassifierSet:
             classifier_set.remove(mock_microclassifier)
         assert classifier_set.num_micros == 0
         assert classifier_set.num_macros == 0
+
+
+@pytest.fixture
+def make_classifier():
+    def _make_classifier(error=1.0, fitness=0.1, time_stamp=0):
+        rule = Rule(condition=Condition(Genotype([0, 1])),
+                    action=0,
+                    num_features=2)
+        return Classifier(rule,
+                          prediction=10.0,
+                          error=error,
+                          fitness=fitness,
+                          time_stamp=time_stamp)
+
+    return _make_classifier
+
+
+class TestClassifierSetMembership:
+    def test_identity_membership(self, make_classifier):
+        classifier_set = ClassifierSet()
+        member = make_classifier()
+        equal_non_member = make_classifier()
+        classifier_set.add(member)
+        assert member in classifier_set
+        assert equal_non_member not in classifier_set
+        with pytest.raises(MemberNotFoundError):
+            classifier_set.remove(equal_non_member)
+
+    def test_value_membership(self, make_classifier):
+        classifier_set = ClassifierSet(compare_by_value=True)
+        member = make_classifier()
+        equal_non_member = make_classifier()
+        classifier_set.add(member)
+        assert equal_non_member in classifier_set
+        classifier_set.remove(equal_non_member)
+        assert classifier_set.num_macros == 0
+
+    def test_remove_preserves_order(self, make_classifier):
+        classifier_set = ClassifierSet()
+        members = [make_classifier() for _ in range(4)]
+        for member in members:
+            classifier_set.add(member)
+        classifier_set.remove(members[1])
+        assert all(
+            classifier_set_member is member for (classifier_set_member, member)
+            in zip(classifier_set, [members[0], members[2], members[3]]))
+
+    def test_membership_survives_deepcopy(self, make_classifier):
+        classifier_set = ClassifierSet()
+        classifier_set.add(make_classifier())
+        classifier_set_copy = copy.deepcopy(classifier_set)
+        (member_copy, ) = list(classifier_set_copy)
+        assert member_copy in classifier_set_copy
+        classifier_set_copy.remove(member_copy)
+        assert classifier_set_copy.num_macros == 0
+        assert classifier_set.num_macros == 1
+
+
+class TestClassifierSetAggregates:
+    @pytest.fixture
+    def classifiers(self, make_classifier):
+        classifiers = [
+            make_classifier(error=0.5, fitness=0.1, time_stamp=3),
+            make_classifier(error=0.25, fitness=0.2, time_stamp=5),
+            make_classifier(error=0.75, fitness=0.3, time_stamp=7)
+        ]
+        classifiers[1].numerosity = 2
+        return classifiers
+
+    @pytest.fixture
+    def populated_set(self, classifiers):
+        classifier_set = ClassifierSet()
+        for classifier in classifiers:
+            classifier_set.add(classifier)
+        return classifier_set
+
+    def test_empty_set(self, classifier_set):
+        assert classifier_set.num_micros == 0
+        assert classifier_set.time_stamp_sum == 0
+        assert classifier_set.fitness_sum == 0
+        assert classifier_set.min_error == math.inf
+
+    def test_aggregates(self, populated_set):
+        assert populated_set.num_micros == 4
+        assert populated_set.time_stamp_sum == 3 + 2 * 5 + 7
+        assert populated_set.fitness_sum == sum([0.1, 0.2, 0.3])
+        assert populated_set.min_error == 0.25
+
+    def test_add_after_read(self, populated_set, make_classifier):
+        assert populated_set.num_micros == 4
+        assert populated_set.min_error == 0.25
+        populated_set.add(make_classifier(error=0.125))
+        assert populated_set.num_micros == 5
+        assert populated_set.min_error == 0.125
+
+    def test_remove_after_read(self, populated_set, classifiers):
+        assert populated_set.min_error == 0.25
+        populated_set.remove(classifiers[1])
+        assert populated_set.num_micros == 2
+        assert populated_set.min_error == 0.5
+
+    def test_stale_after_member_updated(self, populated_set, classifiers):
+        assert populated_set.num_micros == 4
+        assert populated_set.fitness_sum == sum([0.1, 0.2, 0.3])
+        classifiers[0].numerosity += 1
+        classifiers[2].fitness = 0.5
+        assert populated_set.num_micros == 5
+        assert populated_set.fitness_sum == sum([0.1, 0.2, 0.5])
+
+    def test_independent_populations_keep_own_caches(self, make_classifier):
+        classifier_sets = []
+        for _ in range(2):
+            population = Population(max_micros=10)
+            classifier_set = ClassifierSet()
+            for fitness in (0.1, 0.2):
+                classifier = make_classifier(fitness=fitness)
+                population.add(classifier)
+                classifier_set.add(classifier)
+            assert classifier_set.fitness_sum == sum([0.1, 0.2])
+            classifier_sets.append(classifier_set)
+        (first_set, second_set) = classifier_sets
+        (first_member, _) = list(first_set)
+        (second_member, _) = list(second_set)
+        first_member.fitness = 0.5
+        # bypass the property: only visible if the sum is recalculated
+        second_member._fitness = 1.0
+        assert first_set.fitness_sum == sum([0.5, 0.2])
+        assert second_set.fitness_sum == sum([0.1, 0.2])
+        second_member.fitness = 1.0
+        assert second_set.fitness_sum == sum([1.0, 0.2])
+        assert first_set.fitness_sum == sum([0.5, 0.2])
+
+    def test_stale_after_member_added_to_population(self, populated_set,
+                                                    classifiers):
+        assert populated_set.fitness_sum == sum([0.1, 0.2, 0.3])
+        Population(max_micros=10).add(classifiers[0])
+        classifiers[0].fitness = 0.5
+        assert populated_set.fitness_sum == sum([0.5, 0.2, 0.3])
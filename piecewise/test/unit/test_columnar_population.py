@@ -0,0 +1,110 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from piecewise.dtype import (Classifier, ColumnarPopulation, Condition,
+                             Genotype, Rule)
+
+
+def _make_classifier(alleles, fitness=0.1):
+    rule = Rule(condition=Condition(Genotype(alleles)),
+                action=0,
+                num_features=len(alleles))
+    return Classifier(rule,
+                      prediction=10.0,
+                      error=1.0,
+                      fitness=fitness,
+                      time_stamp=3)
+
+
+@pytest.fixture
+def population():
+    return ColumnarPopulation(max_micros=2)
+
+
+class TestColumnarPopulation:
+    def test_add_makes_view(self, population):
+        classifier = _make_classifier([0, 1], fitness=0.25)
+        population.add(classifier)
+        row = population.row_of(classifier)
+        assert isinstance(classifier, Classifier)
+        assert type(classifier).__name__ == "Classifier"
+        assert classifier.fitness == 0.25
+        assert population.columns.fitness[row] == 0.25
+        assert population.columns.time_stamp[row] == 3
+
+    def test_view_reads_and_writes_columns(self, population):
+        classifier = _make_classifier([0, 1])
+        population.add(classifier)
+        row = population.row_of(classifier)
+        classifier.experience += 1
+        classifier.numerosity += 1
+        assert population.columns.experience[row] == 1
+        assert population.columns.numerosity[row] == 2
+        population.columns.fitness[row] = 0.5
+        assert classifier.fitness == 0.5
+        assert type(classifier.experience) is int
+        assert type(classifier.numerosity) is int
+
+    def test_vectorised_update_via_rows(self, population):
+        classifiers = [_make_classifier([0, 1]), _make_classifier([1, 0])]
+        for classifier in classifiers:
+            population.add(classifier)
+        rows = population.rows_of(classifiers)
+        population.columns.fitness[rows] *= 2
+        assert [classifier.fitness for classifier in classifiers] == [0.2, 0.2]
+        assert np.array_equal(population.rows, rows)
+
+    def test_remove_detaches(self, population):
+        classifier = _make_classifier([0, 1])
+        population.add(classifier)
+        classifier.fitness = 0.75
+        population.remove(classifier)
+        assert type(classifier) is Classifier
+        assert classifier.fitness == 0.75
+        classifier.fitness = 0.5
+        assert classifier.fitness == 0.5
+
+    def test_copy_of_view_is_detached(self, population):
+        classifier = _make_classifier([0, 1])
+        population.add(classifier)
+        classifier_copy = copy.deepcopy(classifier)
+        assert type(classifier_copy) is Classifier
+        classifier_copy.fitness = 0.5
+        assert classifier.fitness == 0.1
+
+    def test_clone_of_view_is_detached(self, population):
+        classifier = _make_classifier([0, 1])
+        population.add(classifier)
+        classifier.numerosity = 2
+        clone = classifier.clone()
+        assert type(clone) is Classifier
+        assert clone.numerosity == 1
+        clone.fitness = 0.5
+        assert classifier.fitness == 0.1
+
+    def test_grows_past_max_micros(self, population):
+        classifiers = [
+            _make_classifier([0, 1]),
+            _make_classifier([1, 0]),
+            _make_classifier([1, 1])
+        ]
+        for classifier in classifiers:
+            population.add(classifier)
+        assert population.columns.capacity >= 3
+        assert [classifier.fitness for classifier in classifiers] == \
+            [0.1, 0.1, 0.1]
+
+    def test_pickle_round_trip(self, population):
+        population.add(_make_classifier([0, 1], fitness=0.25))
+        population.add(_make_classifier([1, 0], fitness=0.5))
+        loaded_population = pickle.loads(pickle.dumps(population))
+        assert [classifier.fitness for classifier in loaded_population] == \
+            [0.25, 0.5]
+        rows = loaded_population.rows
+        assert list(loaded_population.columns.fitness[rows]) == [0.25, 0.5]
+        (first_classifier, _) = list(loaded_population)
+        loaded_population.remove(first_classifier)
+        assert loaded_population.num_macros == 1
@@ -0,0 +1,108 @@
+import copy
+
+import pytest
+
+from piecewise.dtype import (Condition, DataSpaceBuilder, Dimension,
+                             Genotype, calc_generalities)
+from piecewise.lcs import BufferedRNG, Hyperparams
+from piecewise.rule_repr import make_continuous_min_percentage_rule_repr
+
+
+@pytest.fixture
+def mock_rule_repr(mocker):
+    rule_repr = mocker.MagicMock()
+    rule_repr.map_genotype_to_phenotype.side_effect = \
+        lambda genotype: tuple(genotype)
+    return rule_repr
+
+
+@pytest.fixture
+def condition():
+    return Condition(Genotype([0, 1, 2]))
+
+
+class TestConditionPhenotypeCache:
+    def test_phenotype_is_cached(self, condition, mock_rule_repr):
+        first_phenotype = condition.phenotype(mock_rule_repr)
+        second_phenotype = condition.phenotype(mock_rule_repr)
+        assert first_phenotype is second_phenotype
+        assert mock_rule_repr.map_genotype_to_phenotype.call_count == 1
+
+    def test_phenotype_cached_per_rule_repr(self, condition, mocker):
+        first_rule_repr = mocker.MagicMock()
+        second_rule_repr = mocker.MagicMock()
+        condition.phenotype(first_rule_repr)
+        condition.phenotype(second_rule_repr)
+        condition.phenotype(first_rule_repr)
+        assert first_rule_repr.map_genotype_to_phenotype.call_count == 1
+        assert second_rule_repr.map_genotype_to_phenotype.call_count == 1
+
+    def test_cache_invalidated_by_setitem(self, condition, mock_rule_repr):
+        assert condition.phenotype(mock_rule_repr) == (0, 1, 2)
+        condition.genotype[0] += 5
+        assert condition.phenotype(mock_rule_repr) == (5, 1, 2)
+        assert mock_rule_repr.map_genotype_to_phenotype.call_count == 2
+
+    def test_cache_not_deepcopied(self, condition, mock_rule_repr):
+        condition.phenotype(mock_rule_repr)
+        condition_copy = copy.deepcopy(condition)
+        assert condition_copy.genotype.phenotype_cache == {}
+        assert condition_copy == condition
+
+
+@pytest.fixture
+def mock_generality_rule_repr(mocker):
+    rule_repr = mocker.MagicMock()
+    rule_repr.calc_generality.side_effect = \
+        lambda condition: condition.genotype.count("#") / len(
+            condition.genotype)
+    rule_repr.calc_generality_batch.side_effect = \
+        lambda conditions: [rule_repr.calc_generality(condition)
+                            for condition in conditions]
+    return rule_repr
+
+
+class TestConditionGeneralityCache:
+    def test_generality_is_cached(self, mock_generality_rule_repr):
+        condition = Condition(Genotype([0, "#"]))
+        assert condition.generality(mock_generality_rule_repr) == 0.5
+        assert condition.generality(mock_generality_rule_repr) == 0.5
+        assert mock_generality_rule_repr.calc_generality.call_count == 1
+
+    def test_cache_invalidated_by_setitem(self, mock_generality_rule_repr):
+        condition = Condition(Genotype([0, "#"]))
+        assert condition.generality(mock_generality_rule_repr) == 0.5
+        condition.genotype[0] = "#"
+        assert condition.generality(mock_generality_rule_repr) == 1.0
+
+    def test_batch_only_calcs_uncached(self, mock_generality_rule_repr):
+        conditions = [
+            Condition(Genotype(alleles))
+            for alleles in ([0, "#"], ["#", "#"], [0, 1])
+        ]
+        conditions[1].generality(mock_generality_rule_repr)
+        generalities = calc_generalities(conditions,
+                                         mock_generality_rule_repr)
+        assert generalities.tolist() == [0.5, 1.0, 0.0]
+        calc_generality_batch = mock_generality_rule_repr.calc_generality_batch
+        calc_generality_batch.assert_called_once_with(
+            [conditions[0], conditions[2]])
+        assert conditions[2].generality(mock_generality_rule_repr) == 0.0
+        assert mock_generality_rule_repr.calc_generality.call_count == 3
+
+    def test_interval_batch_matches_single(self, mocker):
+        builder = DataSpaceBuilder()
+        for (lower, upper) in ((0.0, 1.0), (-1.0, 3.0), (0.0, 1.0)):
+            builder.add_dim(Dimension(lower, upper))
+        env = mocker.MagicMock(obs_space=builder.create_space())
+        rng = BufferedRNG(seed=0)
+        rule_repr = make_continuous_min_percentage_rule_repr(
+            env, Hyperparams({"s_nought": 0.5, "mu": 0.5, "m": 0.2}), rng)
+        conditions = []
+        for _ in range(100):
+            condition = rule_repr.gen_covering_condition(rng.rand(3))
+            rule_repr.mutate_condition(condition)
+            conditions.append(condition)
+        assert rule_repr.calc_generality_batch(conditions).tolist() == [
+            rule_repr.calc_generality(condition) for condition in conditions
+        ]
@@ -0,0 +1,165 @@
+import numpy as np
+import pytest
+
+from piecewise.dtype import (Classifier, ColumnarPopulation, Condition,
+                             Genotype, Rule, scatter_params)
+from piecewise.lcs.component import (XCSBatchRouletteWheelDeletion,
+                                     XCSRouletteWheelDeletion,
+                                     XCSSumTreeRouletteWheelDeletion)
+from piecewise.lcs.hyperparams import register_hyperparams
+from piecewise.lcs.rng import seed_rng
+
+_NUM_CLASSIFIERS = 10
+
+
+@pytest.fixture(autouse=True)
+def hyperparams():
+    register_hyperparams({"theta_del": 20, "delta": 0.1})
+    seed_rng(0)
+
+
+@pytest.fixture
+def population():
+    rng = np.random.RandomState(0)
+    population = ColumnarPopulation(max_micros=_NUM_CLASSIFIERS)
+    for idx in range(_NUM_CLASSIFIERS):
+        rule = Rule(condition=Condition(Genotype([idx])),
+                    action=0,
+                    num_features=1)
+        classifier = Classifier(rule,
+                                prediction=0.0,
+                                error=0.0,
+                                fitness=float(rng.uniform(0, 1)),
+                                time_stamp=0)
+        classifier.experience = int(rng.randint(0, 40))
+        classifier.action_set_size = float(rng.uniform(1, 20))
+        population.add(classifier)
+    return population
+
+
+def _calc_mean_fitness(population):
+    return sum([
+        classifier.fitness * classifier.numerosity for classifier in population
+    ]) / population.num_micros
+
+
+def _calc_reference_votes(population, mean_fitness=None):
+    reference_deletion = XCSRouletteWheelDeletion()
+    if mean_fitness is None:
+        mean_fitness = _calc_mean_fitness(population)
+    return [
+        reference_deletion._calc_deletion_vote(classifier, mean_fitness)
+        for classifier in population
+    ]
+
+
+class TestXCSSumTreeRouletteWheelDeletion:
+    def test_votes_same_as_reference_with_zero_tol(self, population):
+        deletion = XCSSumTreeRouletteWheelDeletion(mean_fitness_drift_tol=0)
+        deletion._select_for_deletion(population)
+        votes = deletion._sum_tree.values[population.rows]
+        assert votes == pytest.approx(_calc_reference_votes(population))
+
+    def test_changed_rows_updated_without_rebuild(self, population):
+        deletion = XCSSumTreeRouletteWheelDeletion(mean_fitness_drift_tol=1.0)
+        deletion._select_for_deletion(population)
+        sum_tree = deletion._sum_tree
+        (first_classifier, *_) = list(population)
+        first_classifier.action_set_size = 100.0
+        deletion._select_for_deletion(population)
+        assert deletion._sum_tree is sum_tree
+        votes = deletion._sum_tree.values[population.rows]
+        assert votes == pytest.approx(_calc_reference_votes(population))
+
+    def test_unchanged_population_no_updates(self, population, mocker):
+        deletion = XCSSumTreeRouletteWheelDeletion(mean_fitness_drift_tol=1.0)
+        # grow the columns, leaving never used (NaN filled) rows
+        rule = Rule(condition=Condition(Genotype([_NUM_CLASSIFIERS])),
+                    action=0,
+                    num_features=1)
+        population.add(Classifier(rule, 0.0, 0.0, 0.5, 0))
+        assert not np.all(population.columns.is_row_used)
+        deletion._select_for_deletion(population)
+        update_spy = mocker.spy(deletion._sum_tree, "update")
+        deletion._select_for_deletion(population)
+        deletion._select_for_deletion(population)
+        assert update_spy.call_count == 0
+
+    def test_only_changed_rows_recalculated(self, population, mocker):
+        deletion = XCSSumTreeRouletteWheelDeletion(mean_fitness_drift_tol=1.0)
+        deletion._select_for_deletion(population)
+        (first_classifier, second_classifier, *_) = list(population)
+        first_classifier.experience += 1
+        second_classifier.action_set_size = 5.0
+        calc_votes_spy = mocker.spy(deletion, "_calc_deletion_votes")
+        deletion._select_for_deletion(population)
+        assert calc_votes_spy.call_count == 1
+        (_, rows) = calc_votes_spy.call_args[0]
+        assert sorted(rows.tolist()) == sorted(
+            population.rows_of([first_classifier, second_classifier]))
+
+    def test_fitness_sum_kept_up_to_date(self, population):
+        deletion = XCSSumTreeRouletteWheelDeletion(mean_fitness_drift_tol=1.0)
+        deletion._select_for_deletion(population)
+        sum_tree = deletion._sum_tree
+        (first_classifier, second_classifier, third_classifier,
+         *rest) = list(population)
+        first_classifier.fitness *= 1.5
+        population.duplicate(second_classifier)
+        population.remove(third_classifier)
+        # direct writes to the columns
+        scatter_params(rest[:3], {"fitness": np.array([0.1, 0.2, 0.3])})
+        deletion._select_for_deletion(population)
+        assert deletion._sum_tree is sum_tree
+        assert deletion._fitness_sum / population.num_micros == \
+            pytest.approx(_calc_mean_fitness(population))
+        votes = deletion._sum_tree.values[population.rows]
+        assert votes == pytest.approx(
+            _calc_reference_votes(population, deletion._ref_mean_fitness))
+        assert deletion._sum_tree.total == pytest.approx(np.sum(votes))
+
+    def test_default_tol_rebuilds_on_mean_fitness_change(self, population):
+        deletion = XCSSumTreeRouletteWheelDeletion()
+        deletion._select_for_deletion(population)
+        (first_classifier, *_) = list(population)
+        first_classifier.fitness *= 1.5
+        deletion._select_for_deletion(population)
+        votes = deletion._sum_tree.values[population.rows]
+        assert votes == pytest.approx(_calc_reference_votes(population))
+
+    def test_deletes_down_to_max_micros(self, population):
+        deletion = XCSSumTreeRouletteWheelDeletion()
+        (first_classifier, second_classifier, *_) = list(population)
+        population.duplicate(first_classifier, num_copies=2)
+        population.duplicate(second_classifier, num_copies=1)
+        deletion(population)
+        assert population.num_micros == population.max_micros
+
+
+class TestXCSBatchRouletteWheelDeletion:
+    def test_no_deletion_within_slack(self, population):
+        deletion = XCSBatchRouletteWheelDeletion(slack=3)
+        (first_classifier, *_) = list(population)
+        population.duplicate(first_classifier, num_copies=3)
+        deletion(population)
+        assert population.num_micros == population.max_micros + 3
+
+    def test_deletes_down_to_max_micros_past_slack(self, population):
+        deletion = XCSBatchRouletteWheelDeletion(slack=3)
+        (first_classifier, second_classifier, *_) = list(population)
+        population.duplicate(first_classifier, num_copies=3)
+        population.duplicate(second_classifier, num_copies=2)
+        deletion(population)
+        assert population.num_micros == population.max_micros
+
+    def test_victim_counts(self):
+        deletion = XCSBatchRouletteWheelDeletion(slack=0)
+        votes = np.array([1.0, 1e6, 1.0])
+        numerosities = np.array([2, 3, 4])
+        victim_counts = deletion._draw_victim_counts(votes,
+                                                     numerosities,
+                                                     num_deletions=5)
+        assert np.sum(victim_counts) == 5
+        assert np.all(victim_counts <= numerosities)
+        # heavily weighted macro has all its micros drawn first
+        assert victim_counts[1] == 3
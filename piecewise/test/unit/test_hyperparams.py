@@ -0,0 +1,94 @@
+import copy
+import pickle
+
+import pytest
+
+from piecewise.fuzzy import FuzzyXCSCreditAssignment
+from piecewise.lcs import Hyperparams
+from piecewise.lcs.component import XCSCreditAssignment
+from piecewise.lcs.hyperparams import register_hyperparams
+
+
+@pytest.fixture
+def hyperparams():
+    return Hyperparams({"beta": 0.5, "N": 400})
+
+
+@pytest.fixture
+def make_classifier(mocker):
+    def _make_classifier():
+        classifier = mocker.MagicMock()
+        classifier.experience = 10
+        classifier.get_prediction.return_value = 0.0
+        classifier.error = 0.0
+        classifier.action_set_size = 1.0
+        return classifier
+
+    return _make_classifier
+
+
+class TestHyperparams:
+    def test_attr_access(self, hyperparams):
+        assert hyperparams.beta == 0.5
+        assert hyperparams["N"] == 400
+        assert hyperparams.as_dict() == {"beta": 0.5, "N": 400}
+
+    def test_is_immutable(self, hyperparams):
+        with pytest.raises(AttributeError):
+            hyperparams.beta = 0.1
+        with pytest.raises(AttributeError):
+            del hyperparams.beta
+        assert hyperparams.beta == 0.5
+
+    def test_unknown_name(self, hyperparams):
+        with pytest.raises(AttributeError):
+            hyperparams.gamma
+
+    def test_pickle_and_deepcopy(self, hyperparams):
+        for copied in (pickle.loads(pickle.dumps(hyperparams)),
+                       copy.deepcopy(hyperparams)):
+            assert copied.as_dict() == hyperparams.as_dict()
+            with pytest.raises(AttributeError):
+                copied.beta = 0.1
+
+
+class TestBoundHyperparams:
+    def test_components_use_own_hyperparams(self, make_classifier, mocker):
+        register_hyperparams({"beta": 0.2})
+        action_set = mocker.MagicMock()
+        action_set.num_micros = 1
+        results = []
+        credit_assignments = (XCSCreditAssignment(Hyperparams({"beta": 0.5})),
+                              XCSCreditAssignment(Hyperparams({"beta": 0.25})),
+                              XCSCreditAssignment())
+        for credit_assignment in credit_assignments:
+            classifier = make_classifier()
+            action_set.__iter__.return_value = iter([classifier])
+            credit_assignment(action_set, payoff=100.0)
+            results.append(classifier.set_prediction.call_args[0][0])
+        assert results == [50.0, 25.0, 20.0]
+
+    def test_registry_fallback_reads_at_access_time(self, make_classifier,
+                                                    mocker):
+        register_hyperparams({"beta": 0.2})
+        credit_assignment = XCSCreditAssignment()
+        register_hyperparams({"beta": 0.5})
+        action_set = mocker.MagicMock()
+        action_set.num_micros = 1
+        classifier = make_classifier()
+        action_set.__iter__.return_value = iter([classifier])
+        credit_assignment(action_set, payoff=100.0)
+        assert classifier.set_prediction.call_args[0][0] == 50.0
+
+    def test_fuzzy_components_use_own_hyperparams(self, make_classifier,
+                                                  mocker):
+        register_hyperparams({"beta": 0.2})
+        action_set = mocker.MagicMock()
+        action_set.num_micros = 1
+        classifier = make_classifier()
+        classifier.calc_matching_degree.return_value = 1.0
+        action_set.__iter__.side_effect = lambda: iter([classifier])
+        credit_assignment = FuzzyXCSCreditAssignment(
+            rule_repr=None, hyperparams=Hyperparams({"beta": 0.5}))
+        credit_assignment(action_set, payoff=100.0, situation=None)
+        assert classifier.set_prediction.call_args[0][0] == 50.0
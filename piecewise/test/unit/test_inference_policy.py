@@ -0,0 +1,143 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from piecewise.dtype import (Classifier, ClassifierSet, Condition, Genotype,
+                             LinearPredictionClassifier, Population, Rule)
+from piecewise.lcs import InferencePolicy, export_inference_policy
+from piecewise.lcs.component import FitnessWeightedAvgPrediction
+from piecewise.lcs.component.action_selection import select_greedy_action
+from piecewise.rule_repr import DiscreteRuleRepr
+
+NUM_FEATURES = 4
+NUM_CLASSIFIERS = 40
+ENV_ACTION_SET = (0, 1)
+
+
+def _make_rule(alleles, action):
+    return Rule(Condition(Genotype(alleles)),
+                action,
+                num_features=len(alleles))
+
+
+def _all_situations():
+    return np.array(list(itertools.product(range(2), repeat=NUM_FEATURES)))
+
+
+@pytest.fixture
+def rule_repr():
+    return DiscreteRuleRepr()
+
+
+@pytest.fixture
+def lcs(rule_repr, mocker):
+    np_random = np.random.RandomState(0)
+    population = Population(max_micros=NUM_CLASSIFIERS)
+    alleles = ("#", 0, 1)
+    for _ in range(NUM_CLASSIFIERS):
+        rule = _make_rule([
+            alleles[idx] for idx in np_random.randint(3, size=NUM_FEATURES)
+        ], np_random.randint(2))
+        population.add(
+            Classifier(rule,
+                       prediction=np_random.choice([0.0, 500.0, 1000.0]),
+                       error=0.0,
+                       fitness=np_random.rand(),
+                       time_stamp=0))
+    lcs = mocker.MagicMock()
+    lcs.rule_repr = rule_repr
+    lcs.population = population
+    return lcs
+
+
+def _calc_expected_prediction_arrays(lcs, situations):
+    prediction = FitnessWeightedAvgPrediction(ENV_ACTION_SET)
+    prediction_arrays = []
+    for situation in situations:
+        match_set = ClassifierSet()
+        for classifier in lcs.population:
+            if lcs.rule_repr.does_match(classifier.condition, situation):
+                match_set.add(classifier)
+        prediction_arrays.append(prediction(match_set, situation))
+    return prediction_arrays
+
+
+class TestInferencePolicy:
+    def test_same_greedy_actions_as_lcs(self, lcs):
+        policy = export_inference_policy(lcs, fallback_action=0)
+        situations = _all_situations()
+        expected = [
+            select_greedy_action(prediction_array)
+            if len(prediction_array) != 0 else 0
+            for prediction_array in _calc_expected_prediction_arrays(
+                lcs, situations)
+        ]
+        assert policy.predict(situations) == expected
+
+    def test_same_values_as_lcs(self, lcs):
+        policy = export_inference_policy(lcs)
+        situations = _all_situations()
+        values = policy.predict_values(situations)
+        assert values.shape == (len(situations), len(policy.actions))
+        for (situation_values, prediction_array) in zip(
+                values, _calc_expected_prediction_arrays(lcs, situations)):
+            for (action, value) in zip(policy.actions, situation_values):
+                if action in prediction_array:
+                    assert value == prediction_array[action]
+                else:
+                    assert np.isnan(value)
+
+    def test_no_match_without_fallback_raises(self, lcs):
+        policy = export_inference_policy(lcs)
+        never_matching_policy = InferencePolicy(
+            policy.rule_repr, (np.zeros((1, NUM_FEATURES), dtype=np.int64),
+                               np.ones((1, NUM_FEATURES), dtype=bool)),
+            actions=(0, ),
+            classifier_action_idxs=[0],
+            fitnesses=[1.0],
+            prediction_params=([1.0], ))
+        with pytest.raises(ValueError):
+            never_matching_policy.predict([(1, ) * NUM_FEATURES])
+
+    def test_is_immutable(self, lcs):
+        policy = export_inference_policy(lcs)
+        with pytest.raises(ValueError):
+            policy._fitnesses[0] = 1.0
+
+    def test_save_and_load(self, lcs, tmp_path):
+        policy = export_inference_policy(lcs, fallback_action=1)
+        path = tmp_path / "policy.pkl"
+        policy.save(path)
+        loaded_policy = InferencePolicy.load(path)
+        situations = _all_situations()
+        assert loaded_policy.predict(situations) == policy.predict(situations)
+        with pytest.raises(ValueError):
+            loaded_policy._fitnesses[0] = 1.0
+
+    def test_linear_predictions(self, rule_repr, mocker):
+        population = Population(max_micros=2)
+        rng = np.random.RandomState(0)
+        for action in (0, 1):
+            classifier = LinearPredictionClassifier(
+                _make_rule(["#"] * NUM_FEATURES, action),
+                error=0.0,
+                fitness=1.0,
+                time_stamp=0,
+                x_nought=1.0,
+                delta_rls=1.0,
+                rng=rng)
+            classifier.weight_vec[:] = rng.rand(NUM_FEATURES + 1)
+            population.add(classifier)
+        lcs = mocker.MagicMock()
+        lcs.rule_repr = rule_repr
+        lcs.population = population
+        policy = export_inference_policy(lcs)
+        situations = _all_situations()
+        values = policy.predict_values(situations)
+        for (situation, situation_values) in zip(situations, values):
+            expected = [
+                classifier.get_prediction(situation)
+                for classifier in population
+            ]
+            assert list(situation_values) == expected
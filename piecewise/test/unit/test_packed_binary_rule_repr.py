@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from piecewise.dtype import Condition, Genotype
+from piecewise.rule_repr import (DiscreteRuleRepr, PackedBinaryRuleRepr,
+                                 PackedTernaryGenotype)
+
+# 70-mux and 135-mux sizes, to exercise multiple uint64 words
+NUM_BITS_CASES = [6, 70, 135]
+NUM_SAMPLES = 50
+
+
+def _gen_random_alleles(np_random, num_bits):
+    return [
+        "#" if np_random.rand() < 0.5 else int(np_random.randint(2))
+        for _ in range(num_bits)
+    ]
+
+
+def _gen_condition_pair(np_random, num_bits):
+    alleles = _gen_random_alleles(np_random, num_bits)
+    return (Condition(Genotype(alleles)),
+            Condition(PackedTernaryGenotype(alleles)))
+
+
+@pytest.fixture
+def np_random():
+    return np.random.RandomState(0)
+
+
+class TestPackedTernaryGenotype:
+    def test_sequence_semantics(self):
+        alleles = [0, "#", 1, 1, "#"]
+        genotype = PackedTernaryGenotype(alleles)
+        assert len(genotype) == len(alleles)
+        assert list(genotype) == alleles
+        assert genotype[-1] == "#"
+        assert genotype[1:3] == ("#", 1)
+        assert genotype.count("#") == 2
+        assert genotype.count(1) == 2
+        assert genotype.count(0) == 1
+
+    def test_setitem(self):
+        genotype = PackedTernaryGenotype([0, 0, 0])
+        genotype[0] = "#"
+        genotype[2] = 1
+        assert list(genotype) == ["#", 0, 1]
+        genotype[2] = 0
+        assert list(genotype) == ["#", 0, 0]
+
+    def test_eq(self):
+        assert PackedTernaryGenotype([0, "#"]) == \
+            PackedTernaryGenotype([0, "#"])
+        assert PackedTernaryGenotype([0, "#"]) != \
+            PackedTernaryGenotype([1, "#"])
+
+    def test_clone_is_independent(self):
+        genotype = PackedTernaryGenotype([0, "#", 1])
+        clone = genotype.clone()
+        clone[1] = 1
+        assert list(genotype) == [0, "#", 1]
+        assert list(clone) == [0, 1, 1]
+
+    def test_str_same_as_genotype(self):
+        alleles = [0, "#", 1]
+        assert str(PackedTernaryGenotype(alleles)) == str(Genotype(alleles))
+
+
+class TestPackedBinaryRuleRepr:
+    @pytest.mark.parametrize("num_bits", NUM_BITS_CASES)
+    def test_same_as_discrete_rule_repr(self, np_random, num_bits):
+        discrete_rule_repr = DiscreteRuleRepr()
+        packed_rule_repr = PackedBinaryRuleRepr()
+        for _ in range(NUM_SAMPLES):
+            (first_cond, first_packed_cond) = \
+                _gen_condition_pair(np_random, num_bits)
+            (second_cond, second_packed_cond) = \
+                _gen_condition_pair(np_random, num_bits)
+            situation = np_random.randint(2, size=num_bits)
+            assert packed_rule_repr.does_match(first_packed_cond,
+                                               situation) == \
+                discrete_rule_repr.does_match(first_cond, situation)
+            assert packed_rule_repr.calc_generality(first_packed_cond) == \
+                discrete_rule_repr.calc_generality(first_cond)
+            assert packed_rule_repr.check_condition_subsumption(
+                first_packed_cond, second_packed_cond) == \
+                discrete_rule_repr.check_condition_subsumption(
+                    first_cond, second_cond)
+
+    @pytest.mark.parametrize("num_bits", NUM_BITS_CASES)
+    def test_does_match_encoded(self, np_random, num_bits):
+        packed_rule_repr = PackedBinaryRuleRepr()
+        conditions = [
+            Condition(PackedTernaryGenotype(
+                _gen_random_alleles(np_random, num_bits)))
+            for _ in range(NUM_SAMPLES)
+        ]
+        encoded = [
+            packed_rule_repr.encode_condition(condition)
+            for condition in conditions
+        ]
+        encoded_conditions = tuple(
+            np.stack(elems) for elems in zip(*encoded))
+        for _ in range(NUM_SAMPLES):
+            situation = np_random.randint(2, size=num_bits)
+            expected = [
+                packed_rule_repr.does_match(condition, situation)
+                for condition in conditions
+            ]
+            actual = packed_rule_repr.does_match_encoded(
+                encoded_conditions, situation)
+            assert list(actual) == expected
+
+    def test_subsumption_self(self):
+        packed_rule_repr = PackedBinaryRuleRepr()
+        condition = Condition(PackedTernaryGenotype([0, "#", 1]))
+        assert packed_rule_repr.check_condition_subsumption(
+            condition, condition)
+
+    def test_subsumption_more_general(self):
+        packed_rule_repr = PackedBinaryRuleRepr()
+        general = Condition(PackedTernaryGenotype([0, "#", "#"]))
+        specific = Condition(PackedTernaryGenotype([0, 1, "#"]))
+        assert packed_rule_repr.check_condition_subsumption(
+            general, specific)
+        assert not packed_rule_repr.check_condition_subsumption(
+            specific, general)
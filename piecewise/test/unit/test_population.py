@@ -1,6 +1,10 @@
 import pytest
 
-from piecewise.dtype import Population
+from piecewise.dtype import (Classifier, ColumnarPopulation, Condition,
+                             Genotype, Population, Rule)
+from piecewise.dtype.classifier import ClassifierABC
+from piecewise.dtype.classifier_set.population_observer import \
+    IPopulationObserver
 from piecewise.error.classifier_set_error import MemberNotFoundError
 from piecewise.error.population_error import InvalidSizeError
 
@@ -143,6 +147,36 @@ class TestPopulation:
         assert population.num_micros == 4
         assert population.num_macros == 1
 
+    def test_replace_many(self, make_mock_microclassifier,
+                          make_mock_macroclassifier):
+        population = Population(max_micros=5)
+        replacees = [
+            make_mock_macroclassifier(numerosity=2),
+            make_mock_microclassifier()
+        ]
+        non_member = make_mock_microclassifier()
+        replacer = make_mock_microclassifier()
+        for classifier in (replacees + [replacer]):
+            population.insert(classifier)
+        replaced = population.replace_many(replacees + [non_member],
+                                           replacer,
+                                           operation_label="as_subsumption")
+        assert replaced == replacees
+        assert population.num_micros == 4
+        assert population.num_macros == 1
+        assert population.operations_record["as_subsumption"] == 3
+
+    def test_replace_many_fail_replacer_non_member(self, mocker):
+        population = Population(max_micros=1)
+        (replacee, replacer) = [
+            mocker.MagicMock(spec=ClassifierABC, numerosity=1)
+            for _ in range(2)
+        ]
+        population.insert(replacee)
+        with pytest.raises(MemberNotFoundError):
+            population.replace_many([replacee], replacer)
+        assert population.num_macros == 1
+
     def test_delete_fail_non_member(self, make_mock_microclassifier):
         population = Population(max_micros=1)
         mock_microclassifier = make_mock_microclassifier()
@@ -170,3 +204,86 @@ class TestPopulation:
         population.delete(mock_macroclassifier)
         assert population.num_micros == 1
         assert population.num_macros == 1
+
+
+class TestPopulationVersion:
+    def test_add_and_remove_bump_version(self, make_mock_microclassifier):
+        population = Population(max_micros=2)
+        first = make_mock_microclassifier()
+        second = make_mock_microclassifier()
+        assert population.version == 0
+        population.add(first)
+        population.add(second)
+        assert population.version == 2
+        population.remove(first)
+        assert population.version == 3
+
+    def test_numerosity_changes_do_not_bump_version(self,
+                                                    mock_microclassifier):
+        population = Population(max_micros=2)
+        population.add(mock_microclassifier)
+        version = population.version
+        population.duplicate(mock_microclassifier)
+        assert population.version == version
+
+    def test_members_added_since(self, make_mock_microclassifier):
+        population = Population(max_micros=3)
+        first = make_mock_microclassifier()
+        second = make_mock_microclassifier()
+        third = make_mock_microclassifier()
+        population.add(first)
+        version = population.version
+        population.add(second)
+        population.add(third)
+        population.remove(second)
+        assert population.members_added_since(version) == [third]
+        assert population.version_added(first) == version
+        assert population.version_added(second) is None
+
+    def test_notify_genotype_changed(self, mock_microclassifier, mocker):
+        population = Population(max_micros=1)
+        population.add(mock_microclassifier)
+        observer = mocker.MagicMock(spec=IPopulationObserver)
+        population.register_observer(observer)
+        population.notify_genotype_changed(mock_microclassifier)
+        observer.on_classifier_changed.assert_called_once_with(
+            mock_microclassifier)
+        assert population.last_genotype_change_version == population.version
+
+
+def _make_classifier(alleles, action, prediction, error, fitness,
+                     numerosity):
+    rule = Rule(Condition(Genotype(alleles)), action,
+                num_features=len(alleles))
+    classifier = Classifier(rule, prediction, error, fitness, time_stamp=0)
+    classifier.numerosity = numerosity
+    return classifier
+
+
+class TestPopulationCompaction:
+    @pytest.fixture(params=[Population, ColumnarPopulation])
+    def population(self, request):
+        population = request.param(max_micros=10)
+        population.add(_make_classifier([0, "#"], 0, 10.0, 1.0, 0.2, 1))
+        population.add(_make_classifier([1, "#"], 0, 5.0, 1.0, 0.1, 2))
+        population.add(_make_classifier([0, "#"], 1, 7.0, 1.0, 0.1, 1))
+        population.add(_make_classifier([0, "#"], 0, 40.0, 4.0, 0.3, 3))
+        return population
+
+    def test_merges_equal_rules(self, population):
+        (keeper, other, other_action, _) = list(population)
+        num_micros = population.num_micros
+        num_removed = population.compact()
+        assert num_removed == 1
+        assert list(population) == [keeper, other, other_action]
+        assert population.num_micros == num_micros
+        assert population.operations_record["compaction"] == 3
+        assert keeper.numerosity == 4
+        assert keeper.prediction == pytest.approx((10.0 + 3 * 40.0) / 4)
+        assert keeper.error == pytest.approx((1.0 + 3 * 4.0) / 4)
+        assert keeper.fitness == pytest.approx(0.5)
+
+    def test_nothing_to_merge(self, population):
+        population.compact()
+        assert population.compact() == 0
+        assert population.num_macros == 3
@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from piecewise.dtype import (ClassifierSet, Condition, Genotype,
+                             LinearPredictionClassifier, Rule)
+from piecewise.lcs.component import FitnessWeightedAvgPrediction
+from piecewise.lcs.component.action_selection import select_greedy_action
+from piecewise.lcs.component.prediction import PredictionArray
+
+ENV_ACTION_SET = (0, 1, 2)
+
+
+@pytest.fixture
+def make_match_set(mocker):
+    def _make_match_set(action_prediction_fitness_triples):
+        match_set = ClassifierSet()
+        for (action, prediction, fitness) in \
+                action_prediction_fitness_triples:
+            classifier = mocker.MagicMock()
+            classifier.action = action
+            classifier.get_prediction.return_value = prediction
+            classifier.fitness = fitness
+            classifier.numerosity = 1
+            match_set.add(classifier)
+        return match_set
+
+    return _make_match_set
+
+
+class TestFitnessWeightedAvgPrediction:
+    def test_weighted_avg_per_action(self, make_match_set):
+        match_set = make_match_set([(2, 10.0, 0.1), (0, 4.0, 0.5),
+                                    (2, 20.0, 0.3), (0, 1.0, 0.0)])
+        prediction_array = \
+            FitnessWeightedAvgPrediction(ENV_ACTION_SET)(match_set, None)
+        assert prediction_array[2] == (10.0 * 0.1 + 20.0 * 0.3) / (0.1 + 0.3)
+        assert prediction_array[0] == 4.0 * 0.5 / 0.5
+        assert prediction_array[1] == 0.0
+
+    def test_only_advocated_actions_are_keys(self, make_match_set):
+        match_set = make_match_set([(2, 10.0, 0.1), (0, 4.0, 0.5)])
+        prediction_array = \
+            FitnessWeightedAvgPrediction(ENV_ACTION_SET)(match_set, None)
+        assert len(prediction_array) == 2
+        # in order of first advocate
+        assert list(prediction_array) == [2, 0]
+        assert 1 not in prediction_array
+
+    def test_zero_fitness_sum_gives_zero_prediction(self, make_match_set):
+        match_set = make_match_set([(1, 10.0, 0.0)])
+        prediction_array = \
+            FitnessWeightedAvgPrediction(ENV_ACTION_SET)(match_set, None)
+        assert list(prediction_array) == [1]
+        assert prediction_array[1] == 0.0
+
+    def test_empty_match_set(self, make_match_set):
+        match_set = make_match_set([])
+        prediction_array = \
+            FitnessWeightedAvgPrediction(ENV_ACTION_SET)(match_set, None)
+        assert len(prediction_array) == 0
+
+    def test_predict_batch_same_as_per_situation(self, make_match_set):
+        match_set = make_match_set([(2, 10.0, 0.1), (0, 4.0, 0.5),
+                                    (2, 20.0, 0.3), (1, 1.0, 0.0)])
+        classifiers = list(match_set)
+        match_masks = np.array([[True, True, True, True],
+                                [False, True, True, False],
+                                [False, False, False, False]])
+        prediction = FitnessWeightedAvgPrediction(ENV_ACTION_SET)
+        prediction_arrays = prediction.predict_batch(classifiers, match_masks,
+                                                     [None] * 3)
+        for (match_mask, prediction_array) in zip(match_masks,
+                                                  prediction_arrays):
+            situation_match_set = ClassifierSet()
+            for (classifier, does_match) in zip(classifiers, match_mask):
+                if does_match:
+                    situation_match_set.add(classifier)
+            expected = prediction(situation_match_set, None)
+            assert list(prediction_array) == list(expected)
+            assert dict(prediction_array) == dict(expected)
+
+    def test_predict_batch_linear_same_as_per_situation(self, mocker):
+        np_random = np.random.RandomState(0)
+        num_features = 3
+        classifiers = []
+        for action in (0, 1, 2, 0, 2):
+            rule = Rule(Condition(Genotype(["#"] * num_features)),
+                        action,
+                        num_features=num_features)
+            classifier = LinearPredictionClassifier(rule,
+                                                    error=0.0,
+                                                    fitness=np_random.rand(),
+                                                    time_stamp=0,
+                                                    x_nought=2.0,
+                                                    delta_rls=1.0,
+                                                    rng=np_random)
+            classifier.weight_vec[:] = np_random.randn(num_features + 1)
+            classifiers.append(classifier)
+        situations = np_random.rand(4, num_features)
+        match_masks = np_random.rand(4, len(classifiers)) < 0.6
+        prediction = FitnessWeightedAvgPrediction(ENV_ACTION_SET)
+        spy = mocker.spy(LinearPredictionClassifier, "get_prediction")
+        prediction_arrays = prediction.predict_batch(classifiers, match_masks,
+                                                     situations)
+        assert spy.call_count == 0
+        for (situation, match_mask,
+             prediction_array) in zip(situations, match_masks,
+                                      prediction_arrays):
+            situation_match_set = ClassifierSet()
+            for (classifier, does_match) in zip(classifiers, match_mask):
+                if does_match:
+                    situation_match_set.add(classifier)
+            expected = prediction(situation_match_set, situation)
+            assert list(prediction_array) == list(expected)
+            assert dict(prediction_array) == dict(expected)
+
+
+class TestPredictionArray:
+    def test_lazy_reads(self):
+        prediction_array = PredictionArray(ENV_ACTION_SET)
+        assert prediction_array[1] == 0.0
+        assert len(prediction_array) == 0
+
+    def test_in_place_add_assigns(self):
+        prediction_array = PredictionArray(ENV_ACTION_SET)
+        prediction_array[1] += 5.0
+        assert prediction_array[1] == 5.0
+        assert list(prediction_array) == [1]
+
+    def test_greedy_selection_breaks_ties_by_assignment_order(self):
+        prediction_array = PredictionArray(ENV_ACTION_SET)
+        prediction_array[2] = 3.0
+        prediction_array[0] = 3.0
+        assert select_greedy_action(prediction_array) == 2
+        assert max(prediction_array.values()) == 3.0
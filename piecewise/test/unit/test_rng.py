@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from piecewise.dtype import Condition, Genotype
+from piecewise.fuzzy import FuzzyConjunctiveRuleRepr
+from piecewise.lcs import BufferedRNG, Hyperparams
+from piecewise.lcs.rng import get_rng, resolve_rng, seed_rng
+
+BLOCK_SIZE = 8
+
+
+@pytest.fixture
+def rng():
+    return BufferedRNG(seed=0, block_size=BLOCK_SIZE)
+
+
+class TestBufferedRNG:
+    def test_uniforms_come_from_generator_blocks(self, rng):
+        expected = np.random.default_rng(0).random(BLOCK_SIZE * 3)
+        draws = [rng.rand() for _ in range(BLOCK_SIZE * 3)]
+        assert draws == expected.tolist()
+
+    def test_same_seed_same_draws(self):
+        first = BufferedRNG(seed=1)
+        second = BufferedRNG(seed=1)
+        assert [first.randint(0, 5) for _ in range(100)] == \
+            [second.randint(0, 5) for _ in range(100)]
+
+    def test_draws_in_range(self, rng):
+        for _ in range(1000):
+            assert 2 <= rng.uniform(2, 3) < 3
+            assert 3 <= rng.randint(3, 7) < 7
+            assert 0 <= rng.randint(4) < 4
+            assert rng.choice([1, -1]) in (1, -1)
+
+    def test_all_choices_drawn(self, rng):
+        choices = ("a", "b", "c")
+        assert {rng.choice(choices) for _ in range(200)} == set(choices)
+
+    def test_sized_draws(self, rng):
+        assert rng.rand(5).shape == (5, )
+        assert rng.uniform(-1, 1, size=3).shape == (3, )
+        assert rng.randint(0, 2, size=4).shape == (4, )
+
+
+class TestResolveRNG:
+    def test_given_rng(self, rng):
+        assert resolve_rng(rng) is rng
+
+    def test_global_fallback(self):
+        seed_rng(0)
+        expected = get_rng().rand()
+        seed_rng(0)
+        assert resolve_rng(None).rand() == expected
+
+
+class TestFuzzyRuleReprRNG:
+    def test_uses_own_rng(self, mocker):
+        hyperparams = Hyperparams({"mu": 0.5, "m_nought": 2})
+        ling_vars = [mocker.MagicMock(membership_funcs=range(5))] * 10
+        mutated_alleles = []
+        for _ in range(2):
+            rule_repr = FuzzyConjunctiveRuleRepr(ling_vars,
+                                                 logical_and_strat=min,
+                                                 hyperparams=hyperparams,
+                                                 rng=BufferedRNG(seed=1))
+            condition = Condition(Genotype([2] * 10))
+            # draws from the global rng must not affect the rule repr's
+            seed_rng(len(mutated_alleles))
+            get_rng().rand()
+            rule_repr.mutate_condition(condition)
+            mutated_alleles.append(list(condition.genotype))
+        assert mutated_alleles[0] == mutated_alleles[1]
+        assert mutated_alleles[0] != [2] * 10
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from piecewise.dtype import Condition, Genotype, Rule
+from piecewise.dtype.classifier_set.rule_index import RuleIndex
+
+
+def _make_rule(alleles, action=0):
+    return Rule(condition=Condition(Genotype(alleles)),
+                action=action,
+                num_features=len(alleles))
+
+
+def _make_classifier(mocker, rule):
+    classifier = mocker.MagicMock()
+    classifier.rule = rule
+    return classifier
+
+
+@pytest.fixture
+def rule_index():
+    return RuleIndex()
+
+
+class TestRuleIndex:
+    def test_find_equal_discrete(self, rule_index, mocker):
+        classifier = _make_classifier(mocker, _make_rule([0, 1, "#"]))
+        rule_index.on_classifier_added(classifier)
+        assert rule_index.find_equal(_make_rule([0, 1, "#"])) is classifier
+        assert rule_index.find_equal(_make_rule([0, 1, 1])) is None
+        assert rule_index.find_equal(_make_rule([0, 1, "#"], action=1)) is \
+            None
+
+    def test_find_equal_within_float_tol(self, rule_index, mocker):
+        # first alleles straddle a bucket boundary at 1e-8 * 2**26
+        alleles = [np.float64(0.6712), np.float64(0.0)]
+        classifier = _make_classifier(mocker, _make_rule(alleles))
+        rule_index.on_classifier_added(classifier)
+        close_alleles = [np.float64(0.6709), np.float64(1e-9)]
+        assert rule_index.find_equal(_make_rule(close_alleles)) is classifier
+        far_alleles = [np.float64(0.6), np.float64(0.0)]
+        assert rule_index.find_equal(_make_rule(far_alleles)) is None
+
+    def test_find_equal_returns_earliest_added(self, rule_index, mocker):
+        first = _make_classifier(mocker,
+                                 _make_rule([np.float64(1.0)]))
+        second = _make_classifier(mocker,
+                                  _make_rule([np.float64(0.999)]))
+        rule_index.on_classifier_added(second)
+        rule_index.on_classifier_added(first)
+        assert rule_index.find_equal(_make_rule([np.float64(1.0)])) is second
+
+    def test_removed_classifier_not_found(self, rule_index, mocker):
+        classifier = _make_classifier(mocker, _make_rule([1, 0]))
+        rule_index.on_classifier_added(classifier)
+        rule_index.on_classifier_removed(classifier)
+        assert rule_index.find_equal(_make_rule([1, 0])) is None
@@ -0,0 +1,249 @@
+import sys
+
+import numpy as np
+import pytest
+
+from piecewise.dtype import (Classifier, ClassifierSet, ColumnarPopulation,
+                             Condition, DataSpaceBuilder, Dimension, Genotype,
+                             Population, Rule)
+from piecewise.lcs import Hyperparams
+from piecewise.lcs.component import NullSubsumption, XCSSubsumption
+from piecewise.lcs.component.subsumption import ISubsumptionStrategy
+from piecewise.rule_repr import (DiscreteRuleRepr, PackedBinaryRuleRepr,
+                                 PackedTernaryGenotype)
+from piecewise.rule_repr.interval.min_percentage_rule_repr import \
+    ContinuousMinPercentageRuleRepr
+
+NUM_FEATURES = 3
+NUM_CLASSIFIERS = 60
+NUM_SAMPLES = 20
+HYPERPARAMS = Hyperparams({"theta_sub": 20, "epsilon_nought": 0.01})
+
+
+def _gen_ternary_genotype(np_random, genotype_cls):
+    return genotype_cls([
+        "#" if np_random.rand() < 0.5 else int(np_random.randint(2))
+        for _ in range(NUM_FEATURES)
+    ])
+
+
+def _gen_interval_genotype(np_random):
+    # alleles on a coarse grid, so that intervals are often nested
+    alleles = []
+    for _ in range(NUM_FEATURES):
+        alleles.append(float(np_random.choice([0.0, 0.25, 0.5])))
+        alleles.append(float(np_random.choice([0.5, 1.0])))
+    return Genotype(alleles)
+
+
+def _make_interval_rule_repr():
+    builder = DataSpaceBuilder()
+    for _ in range(NUM_FEATURES):
+        builder.add_dim(Dimension(0.0, 1.0))
+    return ContinuousMinPercentageRuleRepr(builder.create_space())
+
+
+RULE_REPR_CASES = {
+    "discrete": (DiscreteRuleRepr,
+                 lambda np_random: _gen_ternary_genotype(np_random, Genotype)),
+    "packed_binary":
+    (PackedBinaryRuleRepr, lambda np_random: _gen_ternary_genotype(
+        np_random, PackedTernaryGenotype)),
+    "interval": (_make_interval_rule_repr, _gen_interval_genotype)
+}
+
+
+def _make_classifier(genotype):
+    rule = Rule(Condition(genotype), action=0, num_features=NUM_FEATURES)
+    return Classifier(rule, prediction=0.0, error=0.0, fitness=0.0,
+                      time_stamp=0)
+
+
+def _make_classifiers(np_random, gen_genotype):
+    classifiers = []
+    for _ in range(NUM_CLASSIFIERS):
+        classifier = _make_classifier(gen_genotype(np_random))
+        # about half are experienced and accurate enough to subsume
+        classifier.experience = int(np_random.choice([0, 30]))
+        classifier.error = float(np_random.choice([0.0, 0.5]))
+        classifiers.append(classifier)
+    return classifiers
+
+
+def _make_population(population_cls, classifiers):
+    population = population_cls(max_micros=len(classifiers))
+    for classifier in classifiers:
+        population.add(classifier)
+    return population
+
+
+def _count_python_calls(func, *args):
+    num_calls = 0
+
+    def _profile(frame, event, arg):
+        nonlocal num_calls
+        if event == "call":
+            num_calls += 1
+
+    sys.setprofile(_profile)
+    try:
+        func(*args)
+    finally:
+        sys.setprofile(None)
+    return num_calls
+
+
+@pytest.fixture(params=list(RULE_REPR_CASES.keys()))
+def rule_repr_case(request):
+    (make_rule_repr, gen_genotype) = RULE_REPR_CASES[request.param]
+    return (make_rule_repr(), gen_genotype)
+
+
+class TestVectorisedSubsumption:
+    def test_check_condition_subsumption_encoded(self, rule_repr_case):
+        (rule_repr, gen_genotype) = rule_repr_case
+        np_random = np.random.RandomState(0)
+        conditions = [
+            Condition(gen_genotype(np_random))
+            for _ in range(NUM_CLASSIFIERS)
+        ]
+        encoded_conditions = rule_repr.encode_conditions(conditions)
+        for condition in conditions[:NUM_SAMPLES]:
+            encoded_condition = rule_repr.encode_condition(condition)
+            assert list(
+                rule_repr.check_condition_subsumption_encoded(
+                    encoded_condition, encoded_conditions)) == [
+                        rule_repr.check_condition_subsumption(
+                            condition, other) for other in conditions
+                    ]
+            assert list(
+                rule_repr.check_condition_subsumption_encoded(
+                    encoded_conditions, encoded_condition)) == [
+                        rule_repr.check_condition_subsumption(
+                            other, condition) for other in conditions
+                    ]
+
+    def test_find_subsumptions_same_as_iterative(self, rule_repr_case):
+        (rule_repr, gen_genotype) = rule_repr_case
+        subsumption = XCSSubsumption(rule_repr, HYPERPARAMS)
+        np_random = np.random.RandomState(0)
+        num_subsumptions = 0
+        for _ in range(NUM_SAMPLES):
+            classifiers = _make_classifiers(np_random, gen_genotype)
+            (expected_subsumer, expected_subsumees) = \
+                subsumption._find_subsumptions_iteratively(classifiers)
+            (subsumer, subsumees) = \
+                subsumption.find_subsumptions(classifiers)
+            assert subsumer is expected_subsumer
+            assert len(subsumees) == len(expected_subsumees)
+            assert all(first is second
+                       for (first, second) in zip(subsumees,
+                                                  expected_subsumees))
+            num_subsumptions += len(subsumees)
+        assert num_subsumptions > 0
+
+    @pytest.mark.parametrize("population_cls",
+                             [Population, ColumnarPopulation])
+    def test_find_subsumptions_with_population_same_as_iterative(
+            self, rule_repr_case, population_cls):
+        (rule_repr, gen_genotype) = rule_repr_case
+        subsumption = XCSSubsumption(rule_repr, HYPERPARAMS)
+        np_random = np.random.RandomState(0)
+        for _ in range(NUM_SAMPLES):
+            classifiers = _make_classifiers(np_random, gen_genotype)
+            population = _make_population(population_cls, classifiers)
+            # action set in a different order to the population
+            action_set = ClassifierSet()
+            for idx in np_random.permutation(len(classifiers)):
+                action_set.add(classifiers[idx])
+            (expected_subsumer, expected_subsumees) = \
+                subsumption._find_subsumptions_iteratively(list(action_set))
+            (subsumer, subsumees) = \
+                subsumption.find_subsumptions(action_set, population)
+            assert subsumer is expected_subsumer
+            assert len(subsumees) == len(expected_subsumees)
+            assert all(first is second
+                       for (first, second) in zip(subsumees,
+                                                  expected_subsumees))
+
+    def test_find_subsumptions_python_cost_flat_in_set_size(self):
+        rule_repr = DiscreteRuleRepr()
+        subsumption = XCSSubsumption(rule_repr, HYPERPARAMS)
+        np_random = np.random.RandomState(0)
+        # fully general candidate first, so subsumes all the rest
+        classifiers = [_make_classifier(Genotype(["#"] * NUM_FEATURES))] + \
+            _make_classifiers(np_random, lambda np_random:
+                              _gen_ternary_genotype(np_random, Genotype))
+        for classifier in classifiers:
+            classifier.experience = 30
+            classifier.error = 0.0
+        population = _make_population(ColumnarPopulation, classifiers)
+        num_calls_per_size = []
+        for num_classifiers in (NUM_CLASSIFIERS // 6, NUM_CLASSIFIERS):
+            action_set = ClassifierSet()
+            for classifier in list(population)[:num_classifiers]:
+                action_set.add(classifier)
+            # first call binds to the population
+            subsumption.find_subsumptions(action_set, population)
+            num_calls_per_size.append(
+                _count_python_calls(subsumption.find_subsumptions,
+                                    action_set, population))
+        assert num_calls_per_size[0] == num_calls_per_size[1]
+
+    def test_find_subsumptions_no_candidates(self, rule_repr_case):
+        (rule_repr, gen_genotype) = rule_repr_case
+        subsumption = XCSSubsumption(rule_repr, HYPERPARAMS)
+        classifiers = _make_classifiers(np.random.RandomState(0),
+                                        gen_genotype)
+        for classifier in classifiers:
+            classifier.experience = 0
+        assert subsumption.find_subsumptions(classifiers) == (None, [])
+        assert subsumption.find_subsumptions([]) == (None, [])
+
+
+class _OriginalInterfaceSubsumption(ISubsumptionStrategy):
+    """Strategy only implementing the originally abstract methods, delegating
+    them to XCS subsumption."""
+    def __init__(self, rule_repr):
+        self._xcs_subsumption = XCSSubsumption(rule_repr, HYPERPARAMS)
+
+    def does_subsume(self, subsumer_classifier, subsumee_classifier):
+        return self._xcs_subsumption.does_subsume(subsumer_classifier,
+                                                  subsumee_classifier)
+
+    def could_subsume(self, classifier):
+        return self._xcs_subsumption.could_subsume(classifier)
+
+    def is_more_general(self, first_classifier, second_classifier):
+        return self._xcs_subsumption.is_more_general(first_classifier,
+                                                     second_classifier)
+
+
+class TestSubsumptionStrategyDefaults:
+    def test_default_find_subsumptions(self, rule_repr_case):
+        (rule_repr, gen_genotype) = rule_repr_case
+        subsumption = _OriginalInterfaceSubsumption(rule_repr)
+        xcs_subsumption = XCSSubsumption(rule_repr, HYPERPARAMS)
+        classifiers = _make_classifiers(np.random.RandomState(0),
+                                        gen_genotype)
+        (expected_subsumer, expected_subsumees) = \
+            xcs_subsumption.find_subsumptions(classifiers)
+        (subsumer, subsumees) = subsumption.find_subsumptions(classifiers)
+        assert subsumer is expected_subsumer
+        assert len(subsumees) == len(expected_subsumees)
+        assert all(first is second
+                   for (first, second) in zip(subsumees, expected_subsumees))
+
+    def test_default_calc_generalities(self, rule_repr_case):
+        (rule_repr, gen_genotype) = rule_repr_case
+        subsumption = XCSSubsumption(rule_repr, HYPERPARAMS)
+        classifiers = _make_classifiers(np.random.RandomState(0),
+                                        gen_genotype)
+        assert np.array_equal(
+            ISubsumptionStrategy.calc_generalities(subsumption, classifiers),
+            subsumption.calc_generalities(classifiers))
+
+    def test_null_subsumption_calc_generalities(self):
+        generalities = NullSubsumption().calc_generalities([])
+        assert isinstance(generalities, np.ndarray)
+        assert len(generalities) == 0
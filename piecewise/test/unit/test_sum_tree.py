@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from piecewise.util.sum_tree import SumTree
+
+
+@pytest.fixture
+def values():
+    return np.random.RandomState(0).uniform(0, 10, size=13)
+
+
+class TestSumTree:
+    def test_total(self, values):
+        sum_tree = SumTree(values)
+        assert sum_tree.total == pytest.approx(np.sum(values))
+
+    def test_find_matches_linear_scan(self, values):
+        sum_tree = SumTree(values)
+        cum_sums = np.cumsum(values)
+        for target in np.linspace(0, cum_sums[-1], num=100, endpoint=False):
+            expected_idx = int(np.flatnonzero(cum_sums > target)[0])
+            assert sum_tree.find(target) == expected_idx
+
+    def test_update(self, values):
+        sum_tree = SumTree(values)
+        sum_tree.update(4, 0.0)
+        sum_tree.update(7, 100.0)
+        values[4] = 0.0
+        values[7] = 100.0
+        assert sum_tree.total == pytest.approx(np.sum(values))
+        rebuilt_sum_tree = SumTree(values)
+        for target in np.linspace(0, np.sum(values), num=100, endpoint=False):
+            found_idx = sum_tree.find(target)
+            assert found_idx != 4
+            assert found_idx == rebuilt_sum_tree.find(target)
+
+    def test_find_skips_zero_values(self):
+        sum_tree = SumTree([1.0, 0.0, 2.0, 0.0])
+        assert sum_tree.find(0.5) == 0
+        assert sum_tree.find(1.0) == 2
+        assert sum_tree.find(sum_tree.total) == 2
@@ -0,0 +1,86 @@
+import pytest
+
+from piecewise.environment import EnvironmentStepTypes
+from piecewise.experiment.trainer import Trainer
+
+NUM_REMOVED_PER_COMPACTION = 2
+
+
+class _FixedLengthEpochEnv:
+    """Env whose epochs are terminal after a fixed number of steps."""
+    def __init__(self, step_type, epoch_length, mocker):
+        self._step_type = step_type
+        self._epoch_length = epoch_length
+        self._mocker = mocker
+        self._num_steps_in_epoch = 0
+
+    @property
+    def step_type(self):
+        return self._step_type
+
+    def reset(self):
+        self._num_steps_in_epoch = 0
+        return 0
+
+    def step(self, action):
+        self._num_steps_in_epoch += 1
+        return self._mocker.MagicMock(obs=self._num_steps_in_epoch)
+
+    def is_terminal(self):
+        return self._num_steps_in_epoch == self._epoch_length
+
+
+@pytest.fixture
+def lcs(mocker):
+    lcs = mocker.MagicMock()
+    lcs.population.compact.return_value = NUM_REMOVED_PER_COMPACTION
+    return lcs
+
+
+def _make_trainer(env, lcs, num_training_samples, compaction_freq):
+    return Trainer(env,
+                   lcs,
+                   num_training_samples,
+                   use_lcs_monitor=False,
+                   lcs_monitor_freq=None,
+                   use_loop_monitor=False,
+                   compaction_freq=compaction_freq)
+
+
+class TestTrainerCompaction:
+    def test_single_step_compacts_within_epoch(self, lcs, mocker):
+        # epoch longer than the whole training run, e.g. a big dataset
+        env = _FixedLengthEpochEnv(EnvironmentStepTypes.single_step,
+                                   epoch_length=100,
+                                   mocker=mocker)
+        trainer = _make_trainer(env, lcs, num_training_samples=10,
+                                compaction_freq=3)
+        trainer.train_lcs()
+        assert trainer.compaction_history == {
+            3: NUM_REMOVED_PER_COMPACTION,
+            6: NUM_REMOVED_PER_COMPACTION,
+            9: NUM_REMOVED_PER_COMPACTION
+        }
+        assert lcs.population.compact.call_count == 3
+
+    def test_multi_step_compacts_between_epochs(self, lcs, mocker):
+        env = _FixedLengthEpochEnv(EnvironmentStepTypes.multi_step,
+                                   epoch_length=4,
+                                   mocker=mocker)
+        trainer = _make_trainer(env, lcs, num_training_samples=10,
+                                compaction_freq=3)
+        trainer.train_lcs()
+        assert trainer.compaction_history == {
+            4: NUM_REMOVED_PER_COMPACTION,
+            8: NUM_REMOVED_PER_COMPACTION
+        }
+
+    def test_no_compaction_by_default(self, lcs, mocker):
+        env = _FixedLengthEpochEnv(EnvironmentStepTypes.single_step,
+                                   epoch_length=4,
+                                   mocker=mocker)
+        trainer = _make_trainer(env, lcs, num_training_samples=10,
+                                compaction_freq=None)
+        trainer.train_lcs()
+        assert trainer.compaction_history == {}
+        assert lcs.population.compact.call_count == 0
@@ -0,0 +1,113 @@
+import pytest
+
+from piecewise.dtype import Classifier, Condition, Genotype, Rule
+from piecewise.environment import EnvironmentStepTypes
+from piecewise.error.classifier_error import AttrUpdateError
+from piecewise.error.validation_error import ValidationLevelError
+from piecewise.lcs import Hyperparams, make_canonical_xcs
+from piecewise.lcs.component import NullDeletion
+from piecewise.rule_repr import DiscreteRuleRepr, PackedBinaryRuleRepr
+from piecewise.rule_repr.interval.interval import ContinuousInterval
+from piecewise.rule_repr.discrete.packed_binary_rule_repr import \
+    PackedTernaryGenotype
+from piecewise.validation import (ValidationLevels, get_validation_level,
+                                  set_validation_level)
+
+
+@pytest.fixture(autouse=True)
+def restore_validation_level():
+    yield
+    set_validation_level(ValidationLevels.strict)
+
+
+@pytest.fixture
+def over_full_population(mocker):
+    population = mocker.MagicMock()
+    population.num_micros = 2
+    population.max_micros = 1
+    return population
+
+
+@pytest.fixture
+def classifier():
+    rule = Rule(Condition(Genotype([0, "#"])), action=0, num_features=2)
+    return Classifier(rule, 10.0, 1.0, 0.5, 3)
+
+
+class TestValidationLevel:
+    def test_set_by_name(self):
+        set_validation_level("production")
+        assert get_validation_level() is ValidationLevels.production
+
+    def test_bad_name(self):
+        with pytest.raises(KeyError):
+            set_validation_level("lenient")
+
+    @pytest.mark.parametrize("validation_level", ["strict", "debug"])
+    def test_attr_values_checked(self, classifier, validation_level):
+        set_validation_level(validation_level)
+        with pytest.raises(AttrUpdateError):
+            classifier.numerosity = 0
+
+    def test_attr_values_not_checked_in_production(self, classifier):
+        set_validation_level("production")
+        classifier.numerosity = 0
+        classifier.experience += 1
+        assert classifier.numerosity == 0
+        assert classifier.experience == 1
+        set_validation_level("strict")
+        with pytest.raises(AttrUpdateError):
+            classifier.numerosity = 0
+
+    @pytest.mark.parametrize("validation_level", ["debug", "production"])
+    def test_consistency_not_checked(self, validation_level):
+        set_validation_level(validation_level)
+        genotype = PackedTernaryGenotype([0, 1])
+        genotype[0] = 2
+        rule_repr = PackedBinaryRuleRepr()
+        set_validation_level("strict")
+        # rule reprs read the level at construction
+        assert rule_repr.does_match(Condition(PackedTernaryGenotype(["#"])),
+                                    [2])
+
+    def test_consistency_checked_in_strict(self):
+        with pytest.raises(AssertionError):
+            PackedTernaryGenotype([0, 2])
+        with pytest.raises(AssertionError):
+            PackedBinaryRuleRepr().does_match(
+                Condition(PackedTernaryGenotype(["#"])), [2])
+
+    @pytest.mark.parametrize("validation_level", ["debug", "production"])
+    def test_interval_consistency_not_checked(self, validation_level,
+                                              over_full_population):
+        set_validation_level(validation_level)
+        interval = ContinuousInterval(0.0, 1.0)
+        assert interval.fraction_covered_by(ContinuousInterval(2.0, 0.0)) \
+            == -2.0
+        NullDeletion()(over_full_population)
+
+    def test_interval_consistency_checked_in_strict(self,
+                                                    over_full_population):
+        with pytest.raises(AssertionError):
+            ContinuousInterval(2.0, 0.0)
+        with pytest.raises(AssertionError):
+            NullDeletion()(over_full_population)
+
+
+class TestLCSValidationLevel:
+    def test_level_change_after_making_lcs_raises(self, mocker):
+        env = mocker.MagicMock()
+        env.action_set = {0, 1}
+        env.step_type = EnvironmentStepTypes.single_step
+        lcs = make_canonical_xcs(env,
+                                 DiscreteRuleRepr(),
+                                 hyperparams=Hyperparams({"N": 10}))
+        assert lcs.validation_level is ValidationLevels.strict
+        set_validation_level("production")
+        situation = [0, 1]
+        with pytest.raises(ValidationLevelError):
+            lcs.train_query(situation, time_step=0)
+        with pytest.raises(ValidationLevelError):
+            lcs.test_query(situation)
+        with pytest.raises(ValidationLevelError):
+            lcs.test_query_batch([situation])
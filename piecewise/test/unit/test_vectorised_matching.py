@@ -0,0 +1,206 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from piecewise.dtype import (Classifier, Condition, DataSpaceBuilder,
+                             Dimension, Genotype, Population, Rule)
+from piecewise.lcs.component import (IntervalGridIndexedMatching,
+                                     RuleReprMatching,
+                                     VectorisedRuleReprMatching)
+from piecewise.lcs.hyperparams import register_hyperparams
+from piecewise.lcs.rng import seed_rng
+from piecewise.rule_repr import DiscreteRuleRepr
+from piecewise.rule_repr.interval.min_percentage_rule_repr import \
+    ContinuousMinPercentageRuleRepr
+
+NUM_FEATURES = 6
+NUM_CLASSIFIERS = 200
+
+
+def _make_classifier(alleles, action=0):
+    return _make_classifier_from_condition(Condition(Genotype(alleles)),
+                                           action)
+
+
+def _make_classifier_from_condition(condition, action=0):
+    rule = Rule(condition, action, num_features=len(condition.genotype))
+    return Classifier(rule, prediction=0.0, error=0.0, fitness=0.0,
+                      time_stamp=0)
+
+
+@pytest.fixture
+def rule_repr():
+    return DiscreteRuleRepr()
+
+
+@pytest.fixture
+def population():
+    np_random = np.random.RandomState(0)
+    population = Population(max_micros=NUM_CLASSIFIERS)
+    all_alleles = list(itertools.product(["#", 0, 1], repeat=NUM_FEATURES))
+    for idx in np_random.permutation(len(all_alleles))[:NUM_CLASSIFIERS]:
+        population.add(_make_classifier(all_alleles[idx]))
+    return population
+
+
+def _all_situations():
+    return itertools.product(range(2), repeat=NUM_FEATURES)
+
+
+def _assert_same_match_sets(rule_repr, population):
+    vectorised_matching = VectorisedRuleReprMatching(rule_repr)
+    reference_matching = RuleReprMatching(rule_repr)
+    for situation in _all_situations():
+        expected = list(reference_matching(population, situation))
+        actual = list(vectorised_matching(population, situation))
+        assert len(expected) == len(actual)
+        assert all(first is second
+                   for (first, second) in zip(expected, actual))
+
+
+class TestVectorisedRuleReprMatching:
+    def test_same_match_sets_as_reference(self, rule_repr, population):
+        _assert_same_match_sets(rule_repr, population)
+
+    def test_stays_in_sync_with_population(self, rule_repr, population):
+        vectorised_matching = VectorisedRuleReprMatching(rule_repr)
+        reference_matching = RuleReprMatching(rule_repr)
+        situation = (0, 1, 0, 1, 1, 0)
+        # bind to population before mutating it
+        vectorised_matching(population, situation)
+
+        members = list(population)
+        for classifier in members[::3]:
+            population.remove(classifier)
+        new_classifier = _make_classifier([0] + ["#"] * (NUM_FEATURES - 1),
+                                          action=1)
+        population.add(new_classifier)
+        population.replace(members[1], new_classifier)
+
+        for situation in _all_situations():
+            expected = list(reference_matching(population, situation))
+            actual = list(vectorised_matching(population, situation))
+            assert all(first is second
+                       for (first, second) in zip(expected, actual))
+            assert len(expected) == len(actual)
+
+    def test_empty_population(self, rule_repr):
+        vectorised_matching = VectorisedRuleReprMatching(rule_repr)
+        population = Population(max_micros=1)
+        match_set = vectorised_matching(population, (0, ) * NUM_FEATURES)
+        assert match_set.num_macros == 0
+
+
+@pytest.fixture
+def interval_rule_repr():
+    builder = DataSpaceBuilder()
+    for _ in range(NUM_FEATURES):
+        builder.add_dim(Dimension(0.0, 1.0))
+    return ContinuousMinPercentageRuleRepr(builder.create_space())
+
+
+@pytest.fixture
+def interval_population(interval_rule_repr):
+    register_hyperparams({"s_nought": 0.5})
+    seed_rng(0)
+    np_random = np.random.RandomState(0)
+    population = Population(max_micros=NUM_CLASSIFIERS)
+    for _ in range(NUM_CLASSIFIERS):
+        condition = interval_rule_repr.gen_covering_condition(
+            np_random.rand(NUM_FEATURES))
+        population.add(_make_classifier_from_condition(condition))
+    return population
+
+
+class TestVectorisedIntervalMatching:
+    def test_same_match_sets_as_reference(self, interval_rule_repr,
+                                          interval_population):
+        vectorised_matching = VectorisedRuleReprMatching(interval_rule_repr)
+        reference_matching = RuleReprMatching(interval_rule_repr)
+        np_random = np.random.RandomState(1)
+        members = list(interval_population)
+        for (idx, situation) in enumerate(np_random.rand(50, NUM_FEATURES)):
+            if idx == 25:
+                # exercise incremental updates half way through
+                for classifier in members[::2]:
+                    interval_population.remove(classifier)
+            expected = list(reference_matching(interval_population,
+                                               situation))
+            actual = list(vectorised_matching(interval_population,
+                                              situation))
+            assert len(expected) == len(actual)
+            assert all(first is second
+                       for (first, second) in zip(expected, actual))
+
+
+class TestIntervalGridIndexedMatching:
+    @pytest.mark.parametrize("num_bins", [1, 4, 16])
+    def test_same_match_sets_as_reference(self, interval_rule_repr,
+                                          interval_population, num_bins):
+        indexed_matching = IntervalGridIndexedMatching(interval_rule_repr,
+                                                       num_bins=num_bins)
+        reference_matching = RuleReprMatching(interval_rule_repr)
+        np_random = np.random.RandomState(1)
+        members = list(interval_population)
+        # include points on and outside the edges of the situation space
+        situations = np.concatenate(
+            (np_random.rand(60, NUM_FEATURES),
+             np_random.choice([-0.5, 0.0, 0.5, 1.0, 1.5],
+                              size=(20, NUM_FEATURES))))
+        for (idx, situation) in enumerate(situations):
+            if idx == 30:
+                # exercise incremental updates half way through
+                for classifier in members[::2]:
+                    interval_population.remove(classifier)
+                for situation_to_cover in np_random.rand(10, NUM_FEATURES):
+                    condition = interval_rule_repr.gen_covering_condition(
+                        situation_to_cover)
+                    interval_population.add(
+                        _make_classifier_from_condition(condition))
+            expected = list(reference_matching(interval_population,
+                                               situation))
+            actual = list(indexed_matching(interval_population, situation))
+            assert len(expected) == len(actual)
+            assert all(first is second
+                       for (first, second) in zip(expected, actual))
+
+    def test_empty_population(self, interval_rule_repr):
+        indexed_matching = IntervalGridIndexedMatching(interval_rule_repr)
+        population = Population(max_micros=1)
+        match_set = indexed_matching(population, (0.5, ) * NUM_FEATURES)
+        assert match_set.num_macros == 0
+
+
+class TestMatchBatch:
+    def _assert_same_as_per_situation(self, matching, population,
+                                      situations):
+        (classifiers, match_masks) = matching.match_batch(population,
+                                                          situations)
+        assert all(first is second
+                   for (first, second) in zip(classifiers, population))
+        assert match_masks.shape == (len(situations), population.num_macros)
+        for (situation, match_mask) in zip(situations, match_masks):
+            expected = list(matching(population, situation))
+            actual = [
+                classifier
+                for (classifier, does_match) in zip(classifiers, match_mask)
+                if does_match
+            ]
+            assert all(first is second
+                       for (first, second) in zip(expected, actual))
+            assert len(expected) == len(actual)
+
+    def test_discrete(self, rule_repr, population):
+        situations = np.array(list(_all_situations()))
+        for matching in (RuleReprMatching(rule_repr),
+                         VectorisedRuleReprMatching(rule_repr)):
+            self._assert_same_as_per_situation(matching, population,
+                                               situations)
+
+    def test_interval(self, interval_rule_repr, interval_population):
+        situations = np.random.RandomState(1).rand(20, NUM_FEATURES)
+        for matching in (RuleReprMatching(interval_rule_repr),
+                         VectorisedRuleReprMatching(interval_rule_repr)):
+            self._assert_same_as_per_situation(matching, interval_population,
+                                               situations)
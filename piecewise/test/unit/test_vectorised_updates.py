@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from piecewise.dtype import (Classifier, ClassifierSet, ColumnarPopulation,
+                             Condition, Genotype, Population, Rule)
+from piecewise.lcs.component import (VectorisedXCSAccuracyFitnessUpdate,
+                                     VectorisedXCSCreditAssignment,
+                                     XCSAccuracyFitnessUpdate,
+                                     XCSCreditAssignment)
+from piecewise.lcs.hyperparams import register_hyperparams
+
+_NUM_CLASSIFIERS = 20
+_NUM_UPDATES = 30
+
+
+@pytest.fixture(autouse=True)
+def hyperparams():
+    register_hyperparams({
+        "beta": 0.2,
+        "epsilon_nought": 10.0,
+        "alpha": 0.1,
+        "nu": 5
+    })
+
+
+def _make_classifiers():
+    rng = np.random.RandomState(0)
+    classifiers = []
+    for idx in range(_NUM_CLASSIFIERS):
+        rule = Rule(condition=Condition(Genotype([idx])),
+                    action=0,
+                    num_features=1)
+        classifier = Classifier(rule,
+                                prediction=float(rng.uniform(0, 1000)),
+                                error=float(rng.uniform(0, 100)),
+                                fitness=float(rng.uniform(0, 1)),
+                                time_stamp=0)
+        classifier.numerosity = int(rng.randint(1, 5))
+        classifiers.append(classifier)
+    return classifiers
+
+
+def _make_action_set(population_cls):
+    population = population_cls(max_micros=100)
+    for classifier in _make_classifiers():
+        population.add(classifier)
+    action_set = ClassifierSet()
+    for classifier in population:
+        action_set.add(classifier)
+    # keep population alive alongside action set
+    return (population, action_set)
+
+
+def _run_updates(action_set, credit_assignment, fitness_update):
+    rng = np.random.RandomState(1)
+    for _ in range(_NUM_UPDATES):
+        payoff = float(rng.choice([0.0, 1000.0]))
+        credit_assignment(action_set, payoff)
+        fitness_update(action_set)
+
+
+@pytest.mark.parametrize("population_cls", [Population, ColumnarPopulation])
+class TestVectorisedUpdates:
+    def test_same_as_reference(self, population_cls):
+        (_, reference_action_set) = _make_action_set(Population)
+        _run_updates(reference_action_set, XCSCreditAssignment(),
+                     XCSAccuracyFitnessUpdate())
+        (_, action_set) = _make_action_set(population_cls)
+        _run_updates(action_set, VectorisedXCSCreditAssignment(),
+                     VectorisedXCSAccuracyFitnessUpdate())
+        for (reference_classifier, classifier) in zip(reference_action_set,
+                                                       action_set):
+            assert classifier == reference_classifier
+            assert type(classifier.experience) is int
@@ -0,0 +1,175 @@
+"""Benchmark of the memory used per macroclassifier for each rule repr.
+
+Reports bytes per macroclassifier for the slotted classifier, rule, condition
+and genotype clses ("after"), and for the same objs stored in instance dicts
+as they were before those clses declared __slots__ ("before").
+
+Run as: python -m piecewise.util.memory_benchmark [num_macros]
+"""
+import pickle
+import sys
+import tracemalloc
+
+from piecewise.dtype import (Condition, DataSpaceBuilder, Dimension,
+                             Genotype, Rule)
+from piecewise.dtype.classifier import ClassifierABC
+from piecewise.dtype.slots import get_attr_state
+from piecewise.lcs import BufferedRNG, Hyperparams
+from piecewise.lcs.component.covering import (
+    make_classifier, make_linear_prediction_classifier)
+from piecewise.rule_repr import (DiscreteRuleRepr, PackedBinaryRuleRepr,
+                                 make_continuous_min_percentage_rule_repr)
+
+_DEFAULT_NUM_MACROS = 5000
+_NUM_FEATURES = 20
+_SEED = 0
+_HYPERPARAMS = Hyperparams({
+    "p_wildcard": 0.33,
+    "m": 0.1,
+    "s_nought": 0.5,
+    "prediction_I": 1e-3,
+    "epsilon_I": 1e-3,
+    "fitness_I": 1e-3,
+    "x_nought": 10.0,
+    "delta_rls": 1000.0
+})
+_DTYPE_CLSES = (ClassifierABC, Rule, Condition, Genotype)
+
+# slotted cls -> equivalent dict-backed cls
+_dict_backed_clses = {}
+
+
+class _ObsSpaceEnv:
+    """Minimal env, just enough to make rule reprs that need an obs space."""
+    def __init__(self, obs_space):
+        self.obs_space = obs_space
+
+
+def _get_dict_backed_cls(cls):
+    try:
+        return _dict_backed_clses[cls]
+    except KeyError:
+        dict_backed_cls = type(cls.__name__, (), {})
+        _dict_backed_clses[cls] = dict_backed_cls
+        return dict_backed_cls
+
+
+def _rebuild(obj, dict_backed):
+    """Rebuilds the graph of dtype objs rooted at the given obj, as objs of
+    the same clses or of dict-backed equivalents, sharing all other attr
+    vals with the original."""
+    cls = type(obj)
+    new_obj = object.__new__(
+        _get_dict_backed_cls(cls) if dict_backed else cls)
+    for (attr_name, value) in get_attr_state(obj).items():
+        if isinstance(value, _DTYPE_CLSES):
+            value = _rebuild(value, dict_backed)
+        setattr(new_obj, attr_name, value)
+    return new_obj
+
+
+def _calc_traced_bytes(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        num_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return num_bytes
+
+
+def calc_bytes_per_macroclassifier(classifiers):
+    """Returns (before, after) tuple of the mean number of bytes used by each
+    of the given classifiers (including their rules, conditions, genotypes
+    and attr vals), when stored in instance dicts vs. in slots.
+
+    Total size is measured by unpickling a copy of the classifiers. The size
+    of the dtype objs themselves (excluding attr vals) is measured by
+    rebuilding them with each layout, and the difference between the two is
+    applied to the total to give the size before. This is a lower bound, as
+    the dict-backed objs are rebuilt via setattr, which lets the interpreter
+    defer making their instance dicts; objs whose dicts have been made (e.g.
+    by unpickling) take more space."""
+    classifiers = list(classifiers)
+    num_macros = len(classifiers)
+    assert num_macros > 0
+    data = pickle.dumps(classifiers)
+    total_after = _calc_traced_bytes(lambda: pickle.loads(data))
+    structure_after = _calc_traced_bytes(
+        lambda: [_rebuild(c, dict_backed=False) for c in classifiers])
+    structure_before = _calc_traced_bytes(
+        lambda: [_rebuild(c, dict_backed=True) for c in classifiers])
+    total_before = total_after - structure_after + structure_before
+    return (total_before / num_macros, total_after / num_macros)
+
+
+def _make_obs_space(is_real):
+    builder = DataSpaceBuilder()
+    for _ in range(_NUM_FEATURES):
+        builder.add_dim(
+            Dimension(0.0, 1.0) if is_real else Dimension(0, 1))
+    return builder.create_space()
+
+
+def _gen_covering_classifiers(rule_repr, classifier_factory, is_real, rng,
+                              num_macros):
+    classifiers = []
+    for time_step in range(num_macros):
+        if is_real:
+            situation = rng.rand(_NUM_FEATURES)
+        else:
+            situation = rng.randint(0, 2, size=_NUM_FEATURES)
+        condition = rule_repr.gen_covering_condition(situation)
+        rule = Rule(condition,
+                    action=rng.randint(0, 2),
+                    num_features=_NUM_FEATURES)
+        classifiers.append(classifier_factory(rule, time_step))
+    return classifiers
+
+
+def run_benchmark(num_macros=_DEFAULT_NUM_MACROS):
+    """Returns dict mapping (rule repr name, classifier type name) to a
+    (before, after) tuple of bytes per macroclassifier."""
+    rng = BufferedRNG(seed=_SEED)
+    real_env = _ObsSpaceEnv(_make_obs_space(is_real=True))
+    rule_reprs = {
+        "discrete": (DiscreteRuleRepr(_HYPERPARAMS, rng), False),
+        "packed_binary": (PackedBinaryRuleRepr(_HYPERPARAMS, rng), False),
+        "interval": (make_continuous_min_percentage_rule_repr(
+            real_env, _HYPERPARAMS, rng), True)
+    }
+    classifier_factories = {
+        "classifier":
+        lambda rule, time_step: make_classifier(rule, time_step,
+                                                _HYPERPARAMS),
+        "linear_prediction":
+        lambda rule, time_step: make_linear_prediction_classifier(
+            rule, time_step, _HYPERPARAMS, rng)
+    }
+    results = {}
+    for (rule_repr_name, (rule_repr, is_real)) in rule_reprs.items():
+        for (factory_name, factory) in classifier_factories.items():
+            classifiers = _gen_covering_classifiers(rule_repr, factory,
+                                                    is_real, rng, num_macros)
+            results[(rule_repr_name, factory_name)] = \
+                calc_bytes_per_macroclassifier(classifiers)
+    return results
+
+
+def main():
+    num_macros = int(sys.argv[1]) if len(sys.argv) > 1 else \
+        _DEFAULT_NUM_MACROS
+    print(f"Bytes per macroclassifier ({num_macros} macros, "
+          f"{_NUM_FEATURES} features)")
+    print(f"{'rule repr':<16}{'classifier':<20}{'before':>10}{'after':>10}"
+          f"{'saving':>10}")
+    for ((rule_repr_name, factory_name),
+         (before, after)) in run_benchmark(num_macros).items():
+        saving = (before - after) / before
+        print(f"{rule_repr_name:<16}{factory_name:<20}{before:>10.0f}"
+              f"{after:>10.0f}{saving:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Sum tree (Fenwick / binary indexed tree) over an array of non-negative
+values, supporting logarithmic time updates of single values and sampling of
+indices in proportion to their values."""
+import numpy as np
+
+
+def _lowest_set_bit(idxs):
+    return idxs & -idxs
+
+
+class SumTree:
+    def __init__(self, values):
+        self.build(values)
+
+    @property
+    def size(self):
+        return len(self._values)
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def total(self):
+        return self._total
+
+    def build(self, values):
+        """(Re)builds the tree from scratch over the given values in linear
+        time."""
+        self._values = np.array(values, dtype=np.float64)
+        assert np.all(self._values >= 0)
+        size = len(self._values)
+        # 1-indexed: node i holds the sum of values (i - lsb(i), i]
+        prefix_sums = np.concatenate(([0.0], np.cumsum(self._values)))
+        node_idxs = np.arange(1, size + 1)
+        self._tree = np.zeros(shape=(size + 1), dtype=np.float64)
+        self._tree[1:] = prefix_sums[node_idxs] - \
+            prefix_sums[node_idxs - _lowest_set_bit(node_idxs)]
+        self._total = prefix_sums[-1]
+        self._top_bit = 1 << (size.bit_length() - 1) if size > 0 else 0
+
+    def update(self, idx, value):
+        """Sets the value at the given (0-indexed) idx."""
+        assert value >= 0
+        delta = value - self._values[idx]
+        self._values[idx] = value
+        self._total += delta
+        node_idx = idx + 1
+        size = len(self._values)
+        while node_idx <= size:
+            self._tree[node_idx] += delta
+            node_idx += node_idx & -node_idx
+
+    def find(self, target):
+        """Returns the lowest idx whose prefix sum (inclusive) exceeds the
+        given target, i.e. samples idxs in proportion to their values when
+        target is uniform on [0, total).
+
+        Floating point error in the tree can make this land on a zero valued
+        idx when target is very close to total, in which case the nearest
+        preceding idx with a non-zero value is returned."""
+        node_idx = 0
+        remaining = target
+        step = self._top_bit
+        size = len(self._values)
+        while step > 0:
+            next_node_idx = node_idx + step
+            if next_node_idx <= size and \
+                    self._tree[next_node_idx] <= remaining:
+                node_idx = next_node_idx
+                remaining -= self._tree[next_node_idx]
+            step >>= 1
+        idx = min(node_idx, size - 1)
+        if self._values[idx] == 0:
+            (non_zero_idxs, ) = np.nonzero(self._values[:idx])
+            idx = non_zero_idxs[-1] if len(non_zero_idxs) > 0 else \
+                np.flatnonzero(self._values)[0]
+        return int(idx)
@@ -0,0 +1,76 @@
+"""Global validation level, controlling which runtime checks are made on the
+hot paths of an LCS.
+
+    strict: all checks are made (the default).
+    debug: classifier attr updates are checked (see check_attr_value), but
+        consistency checks (asserts) inside per-allele and per-classifier
+        loops of rule reprs and components are skipped.
+    production: no checks are made.
+
+Checks are swapped out rather than skipped at call time: classifier,
+genotype and interval clses have their checked methods replaced with plain
+ones as soon as the level is set (see register_checked_attr()), while rule
+reprs and components read the level once, at construction. So the level
+should be set before making the LCS, e.g. via setup_meta_params(); an LCS
+raises ValidationLevelError if it is queried after the level has been changed
+from the one it was made at, rather than running at mixed levels.
+"""
+from enum import Enum
+
+ValidationLevels = Enum("ValidationLevels", ["strict", "debug", "production"])
+
+_validation_level = ValidationLevels.strict
+# (cls, attr name, checked attr, unchecked attr, should check func)
+_checked_attrs = []
+
+
+def checks_attr_values(validation_level=None):
+    """Returns whether classifier attr updates are checked at the given
+    validation level (default: the current level)."""
+    if validation_level is None:
+        validation_level = _validation_level
+    return validation_level in (ValidationLevels.strict,
+                                ValidationLevels.debug)
+
+
+def checks_consistency(validation_level=None):
+    """Returns whether consistency checks are made on hot paths at the given
+    validation level (default: the current level)."""
+    if validation_level is None:
+        validation_level = _validation_level
+    return validation_level is ValidationLevels.strict
+
+
+def get_validation_level():
+    return _validation_level
+
+
+def set_validation_level(validation_level):
+    """Sets the global validation level, given either as a member of
+    ValidationLevels or its name."""
+    if not isinstance(validation_level, ValidationLevels):
+        validation_level = ValidationLevels[validation_level]
+    global _validation_level
+    _validation_level = validation_level
+    for checked_attr in _checked_attrs:
+        _apply_checked_attr(*checked_attr)
+
+
+def register_checked_attr(cls, attr_name, checked_attr, unchecked_attr,
+                          should_check):
+    """Registers checked and unchecked versions of an attr of a cls (e.g. a
+    method or property). The cls attr is set to the checked version if
+    should_check(current validation level) is true, else to the unchecked
+    version, now and whenever the level is set."""
+    checked_attr = (cls, attr_name, checked_attr, unchecked_attr,
+                    should_check)
+    _checked_attrs.append(checked_attr)
+    _apply_checked_attr(*checked_attr)
+
+
+def _apply_checked_attr(cls, attr_name, checked_attr, unchecked_attr,
+                        should_check):
+    if should_check(_validation_level):
+        setattr(cls, attr_name, checked_attr)
+    else:
+        setattr(cls, attr_name, unchecked_attr)